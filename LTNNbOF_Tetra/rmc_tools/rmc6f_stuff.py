@@ -111,6 +111,8 @@ class RMC6FReader(object):
         self.atomsCoord = []
         self.atomsCoordInt = []
         self.site_info_dict = {}
+        self.atomsSite = []
+        self.atomsCell = []
 
         self.unit_cell_info = []
         temp_val = self.scDim[0] + 1
@@ -135,6 +137,9 @@ class RMC6FReader(object):
 
             atom_index_temp = int(line.split()[-4])
 
+            self.atomsSite.append(atom_index_temp)
+            self.atomsCell.append([unit_x, unit_y, unit_z])
+
             label_temp = line_s.split()[-3] + "-"
             label_temp += (line_s.split()[-2] + "-")
             label_temp += (line_s.split()[-1] + "-")
@@ -168,6 +173,19 @@ class RMC6FReader(object):
 
         rmc6f_config.close()
 
+        # Integer lookup of atoms, 'atom_index[cx, cy, cz, site]' gives the
+        # index of atom (starting from 0) at given unit cell and site, and -1
+        # for vacancies. 'atomsSite' and 'atomsCell' go the other way round.
+        self.atomsSite = np.asarray(self.atomsSite, dtype=np.int32)
+        self.atomsCell = np.asarray(self.atomsCell, dtype=np.int32)
+        shape = [max(self.scDim[i], int(self.atomsCell[:, i].max()) + 1)
+                 for i in range(3)]
+        shape.append(int(self.atomsSite.max()) + 1)
+        self.atom_index = np.full(shape, -1, dtype=np.int32)
+        self.atom_index[self.atomsCell[:, 0], self.atomsCell[:, 1],
+                        self.atomsCell[:, 2], self.atomsSite] = \
+            np.arange(self.numAtoms, dtype=np.int32)
+
         # Configure header lines.
         self.atomsOfType = []
         if nta_line_exist and atp_line_exist and neat_line_exist:
@@ -9,12 +9,30 @@ RMCProfile environment, simply as,
 
 .. code-block:: sh
 
-    np_shells RMC6F_CONFIG
+    np_shells RMC6F_CONFIG [OPTIONS]
+
+or, for writing out a single shell saved with '-compact',
+
+.. code-block:: sh
+
+    np_shells SHELLS_NPZ -e SHELL_INDEX [-o RMC6F_OUT]
+
+Options:
+    -compact -- Save all shells in one `.npz` file, instead of an RMC6F
+    file for each shell.
+
+    -e [Shell index] -- Shell (starting from 0) to write out as RMC6F
+    configuration, from the `.npz` file given instead of RMC6F_CONFIG.
+
+    -o [RMC6F file] -- Output for '-e', X_np_shells_N_shell_I.rmc6f if
+    not given.
 
 Output:
     shell_X.rmc6f -- RMC6F configuration for generated shells.
 
     np_shell_gen.log -- Log information about shells generation.
+
+    X_np_shells_N.npz, X_np_shells_N.log -- Shells and log, with '-compact'.
 """
 #
 # -*- coding: utf-8 -*-
@@ -24,6 +42,7 @@ import readline
 import os
 import atexit
 from rmc_tools import rmc6f_stuff
+from rmc_tools import shell_stuff
 from rmc_tools import nano_stuff
 
 # Some metadata of current program.
@@ -31,6 +50,7 @@ version = "0.1"
 features = """
  - Subdivide particle into shells.
  - Support single particle only.
+ - Compact output of shells, with shells written out on demand.
 """
 
 history_path = os.path.expanduser("~/.pyhistory")
@@ -72,11 +92,28 @@ def main():
     print("=============Contact: zyroc1990@gmail.com=============")
     print("======================================================")
 
+    if rmc6fFN.endswith(".npz"):
+        if "-e" not in sys.argv:
+            print("\nIndex of shell to write out needs to be provided with '-e'.")
+            sys.exit()
+        shell_i = int(sys.argv[sys.argv.index("-e") + 1])
+        file_out = None
+        if "-o" in sys.argv:
+            file_out = os.path.join(sys.argv[1], sys.argv[sys.argv.index("-o") + 1])
+        file_out = shell_stuff.extract_shell(rmc6fFN, shell_i, file_name=file_out)
+
+        print("\n--------------------------------------------")
+        print("RMC6F config of shell output to file:")
+        print("--------------------------------------------")
+        print(file_out)
+        print("--------------------------------------------")
+        return
+
     rmc6f_config = rmc6f_stuff.RMC6FReader(rmc6fFN)
 
     nano_particle = nano_stuff.NanoStuff()
     nano_particle.cent_rad_config(rmc6f_config)
-    nano_particle.np_to_shells(rmc6f_config)
+    nano_particle.np_to_shells(rmc6f_config, compact="-compact" in sys.argv)
 
 
 if __name__ == '__main__':
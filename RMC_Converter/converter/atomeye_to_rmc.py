@@ -1,3 +1,4 @@
+from rmc_tools.rmc6f_stuff import open_config, config_stem, config_compression
 import numpy as np
 from numpy import linalg as la
 
@@ -52,7 +53,9 @@ def atomeye_to_rmc(ref_config, atomeye_config):
         if "Number density (Ang^-3):" in header[i]:
             header[i] = "Number density (Ang^-3):{0:10.6F}\n".format(num_rho)
 
-    rmc_out = open(atomeye_config.fileName.split(".cfg")[0] + ".rmc6f", "w")
+    # Compressed the same way as the atomeye configuration, if it is.
+    rmc_out = open_config(config_stem(atomeye_config.fileName) + ".rmc6f" +
+                          config_compression(atomeye_config.fileName), "w")
     for item in header:
         rmc_out.write(item)
     for i in range(atomeye_config.atom_num):
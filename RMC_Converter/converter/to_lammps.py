@@ -1,4 +1,5 @@
 from math import gcd
+from rmc_tools.rmc6f_stuff import open_config, config_stem, config_compression
 import numpy as np
 import sys
 import os
@@ -63,7 +64,10 @@ def to_lammps(rmc6f_config):
         line_temp = line_temp.replace(",", " ")
         atomic_charge = [float(x) for x in line_temp.split()]
 
-    lammps_out = open(rmc6f_config.fileName.split(".")[0] + ".lmp", "w")
+    # Compressed the same way as the RMC6F configuration, if it is.
+    lammps_fn = config_stem(rmc6f_config.fileName) + ".lmp" + \
+        config_compression(rmc6f_config.fileName)
+    lammps_out = open_config(lammps_fn, "w")
     lammps_out.write(" #")
     for i in range(rmc6f_config.numTypeAtom):
         lammps_out.write(" " + rmc6f_config.atomTypes[i] + str(gcd_divided[i]))
@@ -98,5 +102,5 @@ def to_lammps(rmc6f_config):
 
     print("\n=================================")
     print("LAMMPS config output to: ")
-    print(rmc6f_config.fileName.split(".")[0] + ".lmp")
+    print(lammps_fn)
     print("=================================")
@@ -7,6 +7,7 @@
 # Yuanpeng Zhang @ 06/24/19 Monday
 # NIST & ORNL
 #
+from rmc_tools.rmc6f_stuff import open_config, read_ahead
 import timeit
 import sys
 
@@ -24,7 +25,7 @@ class AtomeyeReader(object):
 
         self.atom_coords = []
         self.vectors = [[0 * i * j for i in range(3)] for j in range(3)]
-        atomeye_config = open(self.fileName, "r")
+        atomeye_config = open_config(self.fileName, "r")
         if self.gen_from == "lammps":
             for i in range(self.header_num):
                 line = atomeye_config.readline()
@@ -49,11 +50,14 @@ class AtomeyeReader(object):
                 if "H0(3,3)" in line:
                     self.vectors[2][2] = float(line.split("=")[1].split("A")[0])
 
+            # Atom lines decompressed (if needed) in background thread.
+            lines = read_ahead(atomeye_config)
             for i in range(self.atom_num):
                 for j in range(2):
-                    atomeye_config.readline()
-                line = atomeye_config.readline()
+                    next(lines)
+                line = next(lines)
                 self.atom_coords.append([float(x) for x in line.split()[0:3]])
+            lines.close()
             for i in range(self.atom_num):
                 for j in range(3):
                     if self.atom_coords[i][j] < 0:
@@ -63,6 +67,7 @@ class AtomeyeReader(object):
         else:
             print("Only atomeye config dumped from LAMMPS is supported!")
             sys.exit()
+        atomeye_config.close()
 
         stop = timeit.default_timer()
 
@@ -123,7 +123,7 @@ if __name__ == '__main__':
 
     try:
         input_fn = sys.argv[len(sys.argv) - 1]
-        input_ext = input_fn.split(".")[1]
+        input_ext = os.path.basename(input_fn).split(".")[1]
         if input_ext == "rmc6f":
             o_pos = sys.argv.index("-o")
             to_config = sys.argv[o_pos + 1]
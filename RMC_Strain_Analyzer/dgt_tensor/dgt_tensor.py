@@ -10,184 +10,268 @@
 # NIST & ORNL
 #
 import numpy as np
-from numpy.linalg import inv
 import timeit
 import datetime
-from rmc_tools import rmc6f_stuff
-from math import ceil
+import glob
+import io
+import json
+import multiprocessing
+import sys
+from contextlib import redirect_stdout
+from rmc_tools.neigh_stuff import NeighList
+from rmc_tools.rmc6f_stuff import DIST_BLOCK, RMC6FReader, file_key
 import os
 
-
-def dgt_tensor(ref_config, rmc6f_config):
-
-    r_cut = float(input("\nPlease input cutoff for neighbour analysis: "))
-
-    start = timeit.default_timer()
-
-    print("\nFiguring out neighbours of atoms...")
-
-    atoms_neigh = []
-    neigh_dist = []
-
-    for i in range(ref_config.numAtoms):
-        atoms_neigh.append({})
-        neigh_dist.append([])
-
-    total = int((ref_config.numAtoms - 1) * ref_config.numAtoms / 2)
-    processed = 0
-    print("Progress: ")
-    for i in range(ref_config.numAtoms):
-        for j in range(ref_config.numAtoms - (i + 1)):
-            dist_temp = rmc6f_stuff.dist_calc_coord(ref_config.atomsCoordInt[i],
-                                                    ref_config.atomsCoordInt[i + 1 + j],
-                                                    ref_config.vectors)
-            if dist_temp < r_cut:
-                dist_in_neigh = False
-                for item in neigh_dist[i]:
-                    if abs(dist_temp - item) < 1E-3:
-                        dist_in_neigh = True
-                        atoms_neigh[i][item].append(i + 1 + j)
-                        break
-                if not dist_in_neigh:
-                    neigh_dist[i].append(dist_temp)
-                    atoms_neigh[i][dist_temp] = [i + 1 + j]
-                dist_in_neigh = False
-                for item in neigh_dist[i + 1 + j]:
-                    if abs(dist_temp - item) < 1E-3:
-                        dist_in_neigh = True
-                        atoms_neigh[i + 1 + j][item].append(i)
-                        break
-                if not dist_in_neigh:
-                    neigh_dist[i + 1 + j].append(dist_temp)
-                    atoms_neigh[i + 1 + j][dist_temp] = [i]
-            processed += 1
-            if processed % (int(total * 0.01)) == 0 and processed != total:
-                if processed % (int(total * 0.01) * 5) == 0:
-                    print(str(ceil(processed * 100.0 / total)) + "%", end='', flush=True)
-                else:
-                    print(".", end='', flush=True)
-                if processed % (int(total * 0.01) * 20) == 0:
-                    print("")
-
-    if (ceil(processed * 100.0 / total) == 100) and \
-            (processed % (int(total * 0.01) * 5) == 0):
-        print("100%")
-
-    stop = timeit.default_timer()
-
-    print("\n--------------------------------------------")
-    print("Neighbours of atoms successfully configured.")
-    print("Time taken:{0:11.3F} s".format(stop - start))
-    print("--------------------------------------------")
-
-    start = timeit.default_timer()
-
-    print("\nCalculating the deformation gradient tensor...")
-
-    total = sum(len(x) for x in atoms_neigh)
-
-    processed = 0
-    print("Progress: ")
-    dgt_out = []
-    for i in range(ref_config.numAtoms):
-        d_mat = np.zeros([3, 3])
-        a_mat = np.zeros([3, 3])
-        for k in atoms_neigh[i]:
-            for item in atoms_neigh[i][k]:
-                vec_x_frac = []
-                for j in range(3):
-                    vec_temp = rmc6f_config.atomsCoord[item][j] - rmc6f_config.atomsCoord[i][j]
-                    if vec_temp > 0.5:
-                        vec_temp -= 1.0
-                    elif vec_temp < -0.5:
-                        vec_temp += 1.0
-                    vec_x_frac.append(vec_temp)
-                vec_xx_frac = []
-                for j in range(3):
-                    vec_temp = ref_config.atomsCoord[item][j] - ref_config.atomsCoord[i][j]
-                    if vec_temp > 0.5:
-                        vec_temp -= 1.0
-                    elif vec_temp < -0.5:
-                        vec_temp += 1.0
-                    vec_xx_frac.append(vec_temp)
-
-                vec_x_cart = [sum(vec_x_frac[ii] * ref_config.vectors[ii][iii] for ii
-                                  in range(3)) for iii in range(3)]
-                vec_xx_cart = [sum(vec_xx_frac[ii] * ref_config.vectors[ii][iii] for ii
-                                   in range(3)) for iii in range(3)]
-
-                r_temp = (k - min(neigh_dist[i])) / r_cut
-                if r_temp <= 0.5:
-                    w_temp = 1.0 - 6.0 * r_temp**2 + 6.0 * r_temp**3
-                elif r_temp < 1.0:
-                    w_temp = 2.0 - 6.0 * r_temp + 6.0 * r_temp**2 - 2.0 * r_temp**3
-                else:
-                    w_temp = 0
-                d_temp = np.zeros([3, 3])
-                a_temp = np.zeros([3, 3])
-                for ii in range(3):
-                    for jj in range(3):
-                        d_temp[ii][jj] = vec_xx_cart[ii] * vec_xx_cart[jj] * w_temp
-                        a_temp[ii][jj] = vec_x_cart[ii] * vec_xx_cart[jj] * w_temp
-
-                d_mat += d_temp
-                a_mat += a_temp
-
-            processed += 1
-            if processed % (int(total * 0.01)) == 0 and processed != total:
-                if processed % (int(total * 0.01) * 5) == 0:
-                    print(str(ceil(processed * 100.0 / total)) + "%", end='', flush=True)
-                else:
-                    print(".", end='', flush=True)
-                if processed % (int(total * 0.01) * 20) == 0:
-                    print("")
-
-        dgt_out.append(np.matmul(a_mat, inv(d_mat)))
-
-    if (ceil(processed * 100.0 / total) == 100) and \
-            (processed % (int(total * 0.01) * 5) == 0):
-        print("100%")
-
-    epsilon_out = []
-    omega_out = []
-    for i in range(ref_config.numAtoms):
-        epsilon_out.append(np.zeros([3, 3]))
-        omega_out.append(np.zeros([3, 3]))
-
-        epsilon_out[i][0][0] = dgt_out[i][0][0]
-        epsilon_out[i][0][1] = (dgt_out[i][0][1] + dgt_out[i][1][0]) / 2.0
-        epsilon_out[i][0][2] = (dgt_out[i][0][2] + dgt_out[i][2][0]) / 2.0
-        epsilon_out[i][1][0] = epsilon_out[i][0][1]
-        epsilon_out[i][1][1] = dgt_out[i][1][1]
-        epsilon_out[i][1][2] = (dgt_out[i][1][2] + dgt_out[i][2][1]) / 2.0
-        epsilon_out[i][2][0] = epsilon_out[i][0][2]
-        epsilon_out[i][2][1] = epsilon_out[i][1][2]
-        epsilon_out[i][2][2] = dgt_out[i][2][2]
-
-        omega_out[i][0][0] = 0
-        omega_out[i][0][1] = (dgt_out[i][0][1] - dgt_out[i][1][0]) / 2.0
-        omega_out[i][0][2] = (dgt_out[i][0][2] - dgt_out[i][2][0]) / 2.0
-        omega_out[i][1][0] = -omega_out[i][0][1]
-        omega_out[i][1][1] = 0
-        omega_out[i][1][2] = (dgt_out[i][1][2] - dgt_out[i][2][1]) / 2.0
-        omega_out[i][2][0] = -omega_out[i][0][2]
-        omega_out[i][2][1] = -omega_out[i][1][2]
-        omega_out[i][2][2] = 0
-
-    strain_invar1 = []
-    strain_invar2 = []
-    for i in range(ref_config.numAtoms):
-        strain_invar1.append(sum([epsilon_out[i][j][j] for j in range(3)]))
-        sum_temp = 0
-        for j in range(3):
-            for k in range(3):
-                sum_temp += (epsilon_out[i][j][k] * epsilon_out[i][j][k] -
-                             epsilon_out[i][j][j] * epsilon_out[i][k][k])
-        strain_invar2.append(sum_temp / 2.0)
+# Reference neighbours, in worker process of the batch mode.
+_dgt = {}
+
+
+def min_image_frac(coords, atom_i, atom_j):
+    '''
+    Fractional displacement from atoms to their neighbours, nearest image
+
+    :param coords: Fractional coordinates of atoms.
+    :type coords: numpy.array, (N, 3)
+    :param atom_i: Index of atoms.
+    :type atom_i: numpy.array, (P,)
+    :param atom_j: Index of neighbours.
+    :type atom_j: numpy.array, (P,)
+
+    :return: Displacement from `atom_i` to `atom_j`, with each component \
+             taken into [-0.5, 0.5].
+    :rtype: numpy.array, (P, 3)
+    '''
+    coords = np.asarray(coords, dtype=np.float64)
+    vec_frac = coords[atom_j] - coords[atom_i]
+    vec_frac = np.where(vec_frac > 0.5, vec_frac - 1.0, vec_frac)
+
+    return np.where(vec_frac < -0.5, vec_frac + 1.0, vec_frac)
+
+
+def dgt_weight(r_temp):
+    '''
+    Weight of neighbours for the deformation gradient tensor
+
+    :param r_temp: Distance of the shell of each neighbour from the nearest \
+                   shell, in units of the cutoff.
+    :type r_temp: numpy.array
+
+    :return: Cubic spline weight, going from 1 at 0 down to 0 at 1 and beyond.
+    :rtype: numpy.array
+    '''
+    r_temp = np.asarray(r_temp, dtype=np.float64)
+    w_temp = np.zeros(r_temp.shape)
+
+    inner = r_temp <= 0.5
+    r_in = r_temp[inner]
+    w_temp[inner] = 1.0 - 6.0 * r_in**2 + 6.0 * r_in**3
+
+    outer = (r_temp > 0.5) & (r_temp < 1.0)
+    r_out = r_temp[outer]
+    w_temp[outer] = 2.0 - 6.0 * r_out + 6.0 * r_out**2 - 2.0 * r_out**3
+
+    return w_temp
+
+
+def neigh_cache_file(ref_file, r_cut):
+    '''
+    Cache file of reference neighbours, next to the reference configuration
+
+    :param ref_file: Reference RMC6F configuration file.
+    :type ref_file: str
+    :param r_cut: Cutoff for neighbours.
+    :type r_cut: float
+
+    :return: Cache file, `<ref_file>.neigh_<r_cut>.npz`.
+    :rtype: str
+    '''
+    return ref_file + ".neigh_{0:g}.npz".format(r_cut)
+
+
+def _load_ref_neigh(ref_file, r_cut):
+    '''
+    Load reference neighbours from the cache, if still valid
+
+    :param ref_file: Reference RMC6F configuration file.
+    :type ref_file: str
+    :param r_cut: Cutoff for neighbours.
+    :type r_cut: float
+
+    :return: Reference neighbours (see `ref_neigh`), or None if no valid cache.
+    :rtype: dict
+    '''
+    cache_file = neigh_cache_file(ref_file, r_cut)
+    if not os.path.exists(cache_file):
+        return None
+    with np.load(cache_file) as neigh_in:
+        if json.loads(str(neigh_in["key"])) != file_key(ref_file) or \
+                float(neigh_in["r_cut"]) != r_cut:
+            return None
+        ref_nb = {x: neigh_in[x] for x in neigh_in.files if x != "key"}
+    ref_nb["r_cut"] = float(ref_nb["r_cut"])
+    ref_nb["num_atoms"] = int(ref_nb["num_atoms"])
+    print("\nReference neighbours loaded from cache: " + cache_file)
+
+    return ref_nb
+
+
+def ref_neigh(ref_config, r_cut, cache=False):
+    '''
+    Neighbours of atoms in the reference configuration, with their weights
+
+    Everything the deformation gradient tensor needs from the reference \
+    configuration - neighbour list, weights, displacement vectors to \
+    neighbours and the `D` matrix of each atom - is worked out here once, \
+    and can be applied to any number of fitted configurations with \
+    `dgt_calc`. With `cache=True`, it is saved to `neigh_cache_file` and \
+    loaded from there, as long as the reference file (see \
+    `rmc6f_stuff.file_key`) and the cutoff are the same.
+
+    :param ref_config: Reference RMC6F configuration.
+    :type ref_config: RMC6FReader
+    :param r_cut: Cutoff for neighbours.
+    :type r_cut: float
+    :param cache: Whether to use the cache file.
+    :type cache: bool
+
+    :return: Cutoff (`r_cut`), number of atoms (`num_atoms`), lattice \
+             vectors (`vectors`), CSR style neighbour list (`offsets`, \
+             `indices`, see `NeighList`), and for each pair the weight \
+             (`weights`) and displacement vector (`vec_ref`), and `D` \
+             matrix of each atom (`d_mat`).
+    :rtype: dict
+    '''
+    if cache:
+        ref_nb = _load_ref_neigh(ref_config.fileName, r_cut)
+        if ref_nb is not None:
+            return ref_nb
+
+    # Neighbours with linked-cell grid, in O(N). Neighbours of each atom come
+    # in ascending order, as in looping over all pairs.
+    neigh_list = NeighList(ref_config, r_cut)
+
+    # Neighbours of each atom grouped into shells of the same distance, with
+    # the weight of each neighbour going down with the distance of its shell
+    # from the nearest shell.
+    pair_i, pair_j = neigh_list.pairs()
+    shell_index, shell_dist = neigh_list.dist_shells(1E-3)
+    nearest = np.zeros(ref_config.numAtoms)
+    nearest[pair_i[shell_index == 0]] = shell_dist[shell_index == 0]
+    weights = dgt_weight((shell_dist - nearest[pair_i]) / r_cut)
+
+    # Displacement vectors to neighbours (fractional coordinates taken to
+    # the nearest image, then to Cartesian with the reference lattice
+    # vectors), used for the fitted configuration as well.
+    vectors = np.asarray(ref_config.vectors, dtype=np.float64)
+    vec_ref = np.zeros([len(pair_i), 3])
+    d_mat = np.zeros([ref_config.numAtoms, 3, 3])
+    block = max(DIST_BLOCK // 9, 1)
+    for start_p in range(0, len(pair_i), block):
+        atom_i = pair_i[start_p:start_p + block]
+        atom_j = pair_j[start_p:start_p + block]
+        vec_xx_cart = np.matmul(min_image_frac(ref_config.atomsCoordArr, atom_i, atom_j), vectors)
+        w_temp = weights[start_p:start_p + block]
+        vec_ref[start_p:start_p + block] = vec_xx_cart
+
+        np.add.at(d_mat, atom_i, np.einsum("p,pi,pj->pij", w_temp, vec_xx_cart, vec_xx_cart))
+
+    ref_nb = {"r_cut": r_cut, "num_atoms": ref_config.numAtoms,
+              "vectors": vectors, "offsets": neigh_list.offsets,
+              "indices": neigh_list.indices, "weights": weights,
+              "vec_ref": vec_ref, "d_mat": d_mat}
+
+    if cache:
+        cache_file = neigh_cache_file(ref_config.fileName, r_cut)
+        cache_tmp = cache_file + ".tmp" + str(os.getpid()) + ".npz"
+        try:
+            np.savez_compressed(cache_tmp, key=np.array(json.dumps(file_key(ref_config.fileName))),
+                                **ref_nb)
+            os.replace(cache_tmp, cache_file)
+            print("\nReference neighbours saved to cache: " + cache_file)
+        except OSError as err:
+            if os.path.exists(cache_tmp):
+                os.remove(cache_tmp)
+            print("\nWarning: cache not written - " + str(err))
+
+    return ref_nb
+
+
+def dgt_calc(ref_nb, rmc6f_config):
+    '''
+    Deformation gradient tensor of all atoms, with strain and rotation
+
+    :param ref_nb: Reference neighbours, from `ref_neigh`.
+    :type ref_nb: dict
+    :param rmc6f_config: Fitted RMC6F configuration, with atoms in the same \
+                         order as the reference configuration.
+    :type rmc6f_config: RMC6FReader
+
+    :return: Deformation gradient tensor (`dgt`), strain tensor \
+             (`epsilon`) and rotation tensor (`omega`), all (N, 3, 3), and \
+             the two strain invariants (`invar1` and `invar2`, (N,)).
+    :rtype: dict
+    '''
+    num_atoms = ref_nb["num_atoms"]
+    if rmc6f_config.numAtoms != num_atoms:
+        print("\nNumber of atoms in " + rmc6f_config.fileName)
+        print("differs from that in the reference configuration!")
+        sys.exit()
+    offsets = ref_nb["offsets"]
+    pair_i = np.repeat(np.arange(num_atoms), np.diff(offsets))
+    pair_j = ref_nb["indices"]
+    weights = ref_nb["weights"]
+
+    a_mat = np.zeros([num_atoms, 3, 3])
+    block = max(DIST_BLOCK // 9, 1)
+    for start_p in range(0, len(pair_i), block):
+        atom_i = pair_i[start_p:start_p + block]
+        atom_j = pair_j[start_p:start_p + block]
+        vec_x_cart = np.matmul(min_image_frac(rmc6f_config.atomsCoordArr, atom_i, atom_j),
+                               ref_nb["vectors"])
+        vec_xx_cart = ref_nb["vec_ref"][start_p:start_p + block]
+        w_temp = weights[start_p:start_p + block]
+
+        np.add.at(a_mat, atom_i, np.einsum("p,pi,pj->pij", w_temp, vec_x_cart, vec_xx_cart))
+
+    # F = A D^-1 for all atoms at once, i.e. D^T F^T = A^T.
+    dgt_out = np.swapaxes(np.linalg.solve(np.swapaxes(ref_nb["d_mat"], 1, 2),
+                                          np.swapaxes(a_mat, 1, 2)), 1, 2)
+
+    # Strain (symmetric) and rotation (antisymmetric) parts of the tensor.
+    dgt_trans = np.swapaxes(dgt_out, 1, 2)
+    epsilon_out = (dgt_out + dgt_trans) / 2.0
+    omega_out = (dgt_out - dgt_trans) / 2.0
+
+    strain_invar1 = np.trace(epsilon_out, axis1=1, axis2=2)
+    strain_invar2 = (np.sum(epsilon_out * epsilon_out, axis=(1, 2)) - strain_invar1 ** 2) / 2.0
+
+    return {"dgt": dgt_out, "epsilon": epsilon_out, "omega": omega_out,
+            "invar1": strain_invar1, "invar2": strain_invar2}
+
+
+def write_dgt(rmc6f_config, dgt_result, out_dir=""):
+    '''
+    Write out deformation gradient tensor, strain, rotation and invariants
+
+    :param rmc6f_config: Fitted RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param dgt_result: Result of `dgt_calc`.
+    :type dgt_result: dict
+    :param out_dir: Output directory, current directory if empty.
+    :type out_dir: str
+
+    :return: Base name of output files.
+    :rtype: str
+    '''
+    dgt_out = dgt_result["dgt"]
+    epsilon_out = dgt_result["epsilon"]
+    omega_out = dgt_result["omega"]
+    strain_invar1 = dgt_result["invar1"]
+    strain_invar2 = dgt_result["invar2"]
 
     base_name = os.path.basename(rmc6f_config.fileName)
     base_name = str(base_name.split(".rmc6f")[0])
-    dgt_out_file = open(base_name + "_dgt.out", "w")
+    dgt_out_file = open(os.path.join(out_dir, base_name + "_dgt.out"), "w")
     now = datetime.datetime.now()
     dgt_out_file.write("=================================================================\n")
     dgt_out_file.write("Deformation gradient tensor for RMC6F config" +
@@ -211,7 +295,7 @@ def dgt_tensor(ref_config, rmc6f_config):
 
     dgt_out_file.close()
 
-    strain_out_file = open(base_name + "_strain.out", "w")
+    strain_out_file = open(os.path.join(out_dir, base_name + "_strain.out"), "w")
     now = datetime.datetime.now()
     strain_out_file.write("=================================================================\n")
     strain_out_file.write("Strain tensor for RMC6F config" +
@@ -236,7 +320,7 @@ def dgt_tensor(ref_config, rmc6f_config):
 
     strain_out_file.close()
 
-    rot_out_file = open(base_name + "_rot.out", "w")
+    rot_out_file = open(os.path.join(out_dir, base_name + "_rot.out"), "w")
     now = datetime.datetime.now()
     rot_out_file.write("=================================================================\n")
     rot_out_file.write("Rotation tensor for RMC6F config" +
@@ -261,7 +345,7 @@ def dgt_tensor(ref_config, rmc6f_config):
 
     rot_out_file.close()
 
-    strain_invar_file = open(base_name + "_strain_invar.out", "w")
+    strain_invar_file = open(os.path.join(out_dir, base_name + "_strain_invar.out"), "w")
     now = datetime.datetime.now()
     strain_invar_file.write("=================================================================\n")
     strain_invar_file.write("Strain invariant for RMC6F config" +
@@ -279,6 +363,22 @@ def dgt_tensor(ref_config, rmc6f_config):
 
     strain_invar_file.close()
 
+    return base_name
+
+
+def dgt_tensor(ref_config, rmc6f_config, cache=False):
+
+    r_cut = float(input("\nPlease input cutoff for neighbour analysis: "))
+
+    ref_nb = ref_neigh(ref_config, r_cut, cache=cache)
+
+    start = timeit.default_timer()
+
+    print("\nCalculating the deformation gradient tensor...")
+
+    dgt_result = dgt_calc(ref_nb, rmc6f_config)
+    base_name = write_dgt(rmc6f_config, dgt_result)
+
     stop = timeit.default_timer()
 
     print("\n----------------------------------------------------")
@@ -292,3 +392,125 @@ def dgt_tensor(ref_config, rmc6f_config):
     print("Rotation tensor: " + base_name + "_rot.out")
     print("Strain invariants: " + base_name + "_strain_invar.out")
     print("----------------------------------------------------")
+
+
+def _init_dgt(ref_nb, cache):
+    '''
+    Set up worker process of the batch mode
+
+    :param ref_nb: Reference neighbours, from `ref_neigh`.
+    :type ref_nb: dict
+    :param cache: Whether to use the binary sidecar cache of `RMC6FReader`.
+    :type cache: bool
+    '''
+    _dgt["ref_nb"] = ref_nb
+    _dgt["cache"] = cache
+
+
+def _dgt_config(file_name):
+    '''
+    Deformation gradient tensor of a fitted configuration, in worker process
+
+    Output files go next to the fitted configuration, and screen output is \
+    kept back.
+
+    :param file_name: Fitted RMC6F configuration file.
+    :type file_name: str
+
+    :return: Configuration, mean of the two strain invariants, time taken \
+             and status (`done`, or the last lines of screen output or the \
+             error if failed).
+    :rtype: dict
+    '''
+    start = timeit.default_timer()
+
+    summary = {"config": file_name, "invar1": np.nan, "invar2": np.nan}
+    screen = io.StringIO()
+    try:
+        with redirect_stdout(screen):
+            rmc6f_config = RMC6FReader(file_name, columnar=True,
+                                       cache=_dgt["cache"])
+            dgt_result = dgt_calc(_dgt["ref_nb"], rmc6f_config)
+            write_dgt(rmc6f_config, dgt_result,
+                      out_dir=os.path.dirname(file_name))
+        summary["invar1"] = float(np.mean(dgt_result["invar1"]))
+        summary["invar2"] = float(np.mean(dgt_result["invar2"]))
+        summary["status"] = "done"
+    except (SystemExit, Exception) as err:
+        lines = [x for x in screen.getvalue().splitlines() if x.strip()]
+        if isinstance(err, SystemExit) and lines:
+            summary["status"] = "failed - " + " ".join(lines[-2:])
+        else:
+            summary["status"] = "failed - " + repr(err)
+    summary["time"] = timeit.default_timer() - start
+
+    return summary
+
+
+def dgt_batch(ref_config, file_names, r_cut, processes=None, cache=False):
+    '''
+    Deformation gradient tensor of many fitted configurations, in parallel
+
+    Reference neighbours are worked out (or loaded from the cache) once, and \
+    then applied to each fitted configuration in worker processes. Output \
+    files of each configuration go next to it.
+
+    :param ref_config: Reference RMC6F configuration.
+    :type ref_config: RMC6FReader
+    :param file_names: Glob pattern or full path of fitted RMC6F files.
+    :type file_names: str or list
+    :param r_cut: Cutoff for neighbours.
+    :type r_cut: float
+    :param processes: Number of worker processes, number of CPUs if None.
+    :type processes: int
+    :param cache: Whether to use the cache file of reference neighbours and \
+                  the binary sidecar cache of `RMC6FReader`.
+    :type cache: bool
+
+    :return: Summary of each configuration, see `_dgt_config`.
+    :rtype: list
+    '''
+    if isinstance(file_names, str):
+        file_names = sorted(glob.glob(file_names))
+    if len(file_names) == 0:
+        print("No fitted RMC6F configuration found!")
+        sys.exit()
+
+    ref_nb = ref_neigh(ref_config, r_cut, cache=cache)
+
+    start = timeit.default_timer()
+
+    print("\nCalculating the deformation gradient tensor for {0:d} configurations...".format(
+        len(file_names)))
+
+    if processes == 1:
+        _init_dgt(ref_nb, cache)
+        summaries = [_dgt_config(x) for x in file_names]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_dgt,
+                                  initargs=(ref_nb, cache)) as pool:
+            summaries = pool.map(_dgt_config, file_names, chunksize=1)
+
+    stop = timeit.default_timer()
+
+    print("\n{0:>5s}{1:>12s}{2:>12s}{3:>10s}  {4:s}".format("No.", "Mean_Invar1", "Mean_Invar2",
+                                                            "Time", "Config / Status"))
+    for i, item in enumerate(summaries):
+        print("{0:5d}{1:12.6F}{2:12.6F}{3:10.3F}  {4:s}".format(i + 1, item["invar1"], item["invar2"],
+                                                             item["time"], item["config"]))
+        if item["status"] != "done":
+            print(" " * 41 + item["status"])
+
+    num_failed = len([x for x in summaries if x["status"] != "done"])
+    print("\n----------------------------------------------------")
+    print("Deformation gradient tensor successfully calculated.")
+    print("Configurations done: {0:d}, failed: {1:d}".format(len(file_names) - num_failed,
+                                                              num_failed))
+    print("Time taken:{0:11.3F} s".format(stop - start))
+    print("----------------------------------------------------")
+    print("Output files (_dgt.out, _strain.out, _rot.out and")
+    print("_strain_invar.out) are next to each configuration.")
+    print("----------------------------------------------------")
+
+    return summaries
+
@@ -46,7 +46,29 @@ The full list of [OPTIONS] is presented below,
 
     -r  [Reference RMC6F config file] If 'dgt' analysis is selected,
         one needs to provide the reference RMC6F configuration for
-        computing the deformation gradient tensor.
+        computing the deformation gradient tensor. The input given with
+        '-i' can then be a glob pattern (in quotes) for many fitted
+        configurations, done in parallel with the reference neighbours
+        worked out once ('-p' for the number of processes), and output
+        files going next to each configuration.
+
+-c  Use binary sidecar cache for input RMC6F configurations. The parsed
+    configuration is saved to the '<config>.cache' directory on the first run
+    and loaded from there on later runs, as long as the RMC6F file is not
+    changed. For 'dgt' analysis, neighbours of the reference configuration
+    (with their weights) are cached as well, to '<reference>.neigh_<cutoff>.npz',
+    and reused as long as the reference file and the cutoff are the same.
+
+-b  [Number of bootstrap resamples] If 'rms' analysis is selected, estimate
+    the error of microstrain by resampling valid cells, over a pool of
+    processes, instead of the interactive analysis. The input given with
+    '-i' can then be a glob pattern (in quotes) for an ensemble of fitted
+    configurations sharing the same atoms.
+
+    -p  [Number of processes] Number of worker processes, number of CPUs
+        if not given.
+
+    -s  [Random seed] Random seed for the bootstrap resampling.
 
 -v  Show version information.
 
@@ -72,12 +94,15 @@ where we execute the 'rmc_strain.py' script.
 
 Then the program will ask the minimum number of cells in each shell. We may want
 to figure out an estimation based on the total number of cells information
-printed out in the log file (see list above).
+printed out in the log file (see list above). Valid cells are sorted by the
+distance of their center to the center of the analysis sphere and cut, going
+outwards, into shells of this number of cells, with cells left at the end
+going to the last shell.
 
 b) If 'dgt' type of analysis is selected, the program will ask for the cutoff
 (in angstrom) for the local deformation analysis. Usually, 10 angstrom should be
-good enough. This analysis will take a while since figuring out all neighbors
-for all atoms is time consuming.
+good enough. Neighbours of all atoms are figured out with a linked-cell grid,
+taking time in proportion to the number of atoms.
 
 The output is described as follows, assuming the input fitted RMC6F
 configuration is with the name of 'ceriaNano_NP.rmc6f'.
@@ -90,6 +115,8 @@ ceriaNano_NP_#.log -- Overall microstrain result
 
 ceriaNano_NP_#_shells.log -- Microstrain for various shells.
 
+ceriaNano_NP_boot_#.log -- Bootstrap and ensemble microstrain, with '-b'.
+
 ------------------------------------------------------------
 
 where '#' represents the smallest integer that is not already existing in the
@@ -118,6 +145,7 @@ https://doi.org/10.1107/S1600576719000372.
 from rms_strain import rms_strain_calc
 from dgt_tensor import dgt_tensor
 from rmc_tools import rmc6f_stuff
+import glob
 import sys
 import readline
 import os
@@ -162,7 +190,17 @@ def doc():
 
             -r  [Reference RMC6F config file] If 'dgt' analysis is selected,
                 one needs to provide the reference RMC6F configuration for
-                computing the deformation gradient tensor.
+                computing the deformation gradient tensor. '-i' can be a glob
+                pattern for many fitted configurations.
+
+        -c  Use binary sidecar cache for input RMC6F configurations.
+
+        -b  [Number of bootstrap resamples] Bootstrap error of microstrain,
+            with '-i' being possibly a glob pattern for an ensemble.
+
+            -p  [Number of processes] Number of worker processes.
+
+            -s  [Random seed] Random seed for the bootstrap resampling.
 
         -v  Show version information.
 
@@ -206,6 +244,8 @@ if __name__ == '__main__':
         print("Only 'rms' and 'dgt' analyses are supported.")
         sys.exit()
 
+    use_cache = "-c" in sys.argv
+
     # wk_dir = os.path.dirname(os.path.abspath(__file__))
     wk_dir = sys.argv[1]
     print(wk_dir)
@@ -213,16 +253,39 @@ if __name__ == '__main__':
         if "-r" in sys.argv:
             ref_config_pos = int(sys.argv.index("-r"))
             file_temp = os.path.join(wk_dir, sys.argv[ref_config_pos + 1])
-            ref_config = rmc6f_stuff.RMC6FReader(file_temp)
+            ref_config = rmc6f_stuff.RMC6FReader(file_temp, cache=use_cache, lazy=True)
         else:
             print(doc.__doc__)
             sys.exit()
 
     file_name = os.path.join(wk_dir, file_name)
 
-    rmc6f_config = rmc6f_stuff.RMC6FReader(file_name)
+    processes = None
+    if "-p" in sys.argv:
+        processes = int(sys.argv[sys.argv.index("-p") + 1])
+
+    if strain_analysis_type == "rms" and "-b" in sys.argv:
+        num_boot = int(sys.argv[sys.argv.index("-b") + 1])
+        seed = None
+        if "-s" in sys.argv:
+            seed = int(sys.argv[sys.argv.index("-s") + 1])
+        rms_strain_calc.rms_strain_boot(file_name, num_boot, processes=processes,
+                                        seed=seed, cache=use_cache)
+        sys.exit()
+
+    if strain_analysis_type == "dgt":
+        fitted_files = sorted(glob.glob(file_name))
+        if len(fitted_files) > 1:
+            r_cut = float(input("\nPlease input cutoff for neighbour analysis: "))
+            dgt_tensor.dgt_batch(ref_config, fitted_files, r_cut, processes=processes,
+                                 cache=use_cache)
+            sys.exit()
+        elif len(fitted_files) == 1:
+            file_name = fitted_files[0]
+
+    rmc6f_config = rmc6f_stuff.RMC6FReader(file_name, cache=use_cache)
 
     if strain_analysis_type == "rms":
         rms_strain_calc.rms_strain_calc(rmc6f_config)
     elif strain_analysis_type == "dgt":
-        dgt_tensor.dgt_tensor(ref_config, rmc6f_config)
+        dgt_tensor.dgt_tensor(ref_config, rmc6f_config, cache=use_cache)
@@ -13,176 +13,450 @@ from numpy import linalg as la
 import timeit
 import os
 import datetime
+import multiprocessing
 import sys
 from rmc_tools import nano_stuff, rmc6f_stuff
+from rmc_tools.ensemble_stuff import RMC6FEnsemble
+from rmc_tools.shell_stuff import PopulationShells
 from random import random
 
-
-def rms_strain_calc(rmc6f_config):
+# Number of bootstrap resamples in each task sent to worker processes.
+BOOT_TASK = 64
+# Upper limit of cell parameters drawn at a time in bootstrap resampling.
+BOOT_BLOCK = 1 << 22
+
+# Per-cell lattice parameters of all configurations, in worker process.
+_boot = {}
+
+
+class CellTable(object):
+    """Table of unit cells in RMC6F configuration
+
+    Given RMC6F configuration (instance of `RMC6FReader`) as input, when \
+    declaring instance to this class, it will figure out the unique unit \
+    cells, their neighbours and their completeness, all on integer cell \
+    index arrays, i.e. in O(N) for N atoms. Cells are in the order they first \
+    show up in the atom list. Several instance variables will be made \
+    available, as detailed below,
+
+    +------------------------+---------------------------------+--------+
+    | Variable name          | Property                        | Type   |
+    +========================+=================================+========+
+    | self.numCells          | Number of cells                 | int    |
+    +------------------------+---------------------------------+--------+
+    | self.cellIndex         | Unit cell index, (M, 3)         | int64  |
+    +------------------------+---------------------------------+--------+
+    | self.cellAtoms         | Atom at each site of cells,     | int64  |
+    |                        | `[cell, site]`, -1 for vacancies|        |
+    +------------------------+---------------------------------+--------+
+    | self.cellSites         | Sites present in each cell, in  | list   |
+    |                        | the order of the atom list      |        |
+    +------------------------+---------------------------------+--------+
+    | self.cellNeigh         | Neighbouring cells along -a, +a,| int64  |
+    |                        | -b, +b, -c and +c, (M, 6), -1   |        |
+    |                        | if not present                  |        |
+    +------------------------+---------------------------------+--------+
+    | self.cellFull          | Whether no atom is missing from | bool   |
+    |                        | the cell                        |        |
+    +------------------------+---------------------------------+--------+
+    | self.cellValid         | Whether the cell and all its    | bool   |
+    |                        | six neighbours are present and  |        |
+    |                        | full                            |        |
+    +------------------------+---------------------------------+--------+
+
+    Arguments:
+        rmc6f_config {Object} -- Instance of `RMC6FReader` class
+    """
+
+    def __init__(self, rmc6f_config):
+
+        atoms_cell = np.asarray(rmc6f_config.atomsCell, dtype=np.int64)
+        atoms_site = np.asarray(rmc6f_config.atomsSite, dtype=np.int64)
+        num_atoms = len(atoms_site)
+        sc_dim = np.asarray(rmc6f_config.scDim, dtype=np.int64)
+
+        # Dense grid over the supercell, holding the index of each cell.
+        if num_atoms > 0:
+            dims = np.maximum(sc_dim, atoms_cell.max(axis=0) + 1)
+        else:
+            dims = sc_dim
+        cell_key = (atoms_cell[:, 0] * dims[1] + atoms_cell[:, 1]) * \
+            dims[2] + atoms_cell[:, 2]
+        uniq_key, first, cell_of_atom = np.unique(cell_key, return_index=True,
+                                                  return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        cell_of_atom = rank[cell_of_atom.reshape(-1)]
+
+        self.numCells = len(uniq_key)
+        self.cellIndex = atoms_cell[first[order]]
+        grid = np.full(dims, -1, dtype=np.int64)
+        grid[tuple(self.cellIndex.T)] = np.arange(self.numCells)
+
+        # Atom at each site - the last one wins if a site shows up twice.
+        num_sites = int(atoms_site.max()) + 1 if num_atoms > 0 else 0
+        self.cellAtoms = np.full([self.numCells, num_sites], -1,
+                                 dtype=np.int64)
+        self.cellAtoms[cell_of_atom, atoms_site] = np.arange(num_atoms)
+        self.cellSites = [[] for _ in range(self.numCells)]
+        seen = np.zeros([self.numCells, num_sites], dtype=bool)
+        for cell_i, site in zip(cell_of_atom.tolist(), atoms_site.tolist()):
+            if not seen[cell_i, site]:
+                seen[cell_i, site] = True
+                self.cellSites[cell_i].append(site)
+
+        # Assuming that we do have at least one full unit cell.
+        site_count = seen.sum(axis=1)
+        max_site_count = site_count.max() if self.numCells > 0 else 0
+        self.cellFull = site_count == max_site_count
+
+        # Neighbouring cells, wrapping around at the supercell boundary.
+        self.cellNeigh = np.full([self.numCells, 6], -1, dtype=np.int64)
+        for axis in range(3):
+            cell_ax = self.cellIndex[:, axis]
+            minus = np.where(cell_ax == 0, sc_dim[axis] - 1, cell_ax - 1)
+            plus = np.where(cell_ax == sc_dim[axis] - 1, 0, cell_ax + 1)
+            for j, neigh_ax in enumerate([minus, plus]):
+                neigh = self.cellIndex.copy()
+                neigh[:, axis] = neigh_ax
+                inside = np.all((neigh >= 0) & (neigh < dims), axis=1)
+                self.cellNeigh[inside, 2 * axis + j] = \
+                    grid[tuple(neigh[inside].T)]
+
+        # A cell is included in calculating the unit cell parameter, if,
+        # 1. The cell is full, i.e. no atoms missing.
+        # 2. All neighbours are present, namely, up, down, left, right,
+        #    forward and backward.
+        # 3. The neighbouring cells are also full.
+        neigh_there = self.cellNeigh >= 0
+        neigh_full = np.where(neigh_there, self.cellFull[self.cellNeigh],
+                              False)
+        self.cellValid = self.cellFull & np.all(neigh_full, axis=1)
+
+
+def cell_lattice(cells, rmc6f_config, cell_list):
+    '''
+    Lattice parameters of cells, from site-matched atoms in neighbouring cells
+
+    For each site of a cell, the atom at the same site of the neighbouring \
+    cells along -a, +a, -b, +b, -c and +c gives six steps between cells. The \
+    isotropic cell parameter is the mean of the lengths of the steps along \
+    the axes (fractional step times length of the supercell vector along the \
+    axis), as in the original per atom loop. The cell vectors are the mean \
+    steps along each axis (in Cartesian space), giving cell lengths and angles.
+    All cells in `cell_list` are done in one go.
+
+    :param cells: Unit cells of the configuration.
+    :type cells: CellTable
+    :param rmc6f_config: RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param cell_list: Index of cells, which should be valid cells, i.e. with \
+                      all six neighbours present.
+    :type cell_list: numpy.array, (V,)
+
+    :return: Isotropic cell parameter (`iso`, (V,)), cell lengths \
+             (`length`, (V, 3), a, b and c) and angles (`angle`, (V, 3), \
+             alpha, beta and gamma in degree) of each cell.
+    :rtype: dict
+    '''
+    coords = np.asarray(rmc6f_config.atomsCoordArr, dtype=np.float64)
+    vectors = np.asarray(rmc6f_config.vectors, dtype=np.float64)
+    axis_len = la.norm(vectors, axis=1)
+
+    atoms = cells.cellAtoms[cell_list]
+    coords_cell = coords[atoms]
+    num_sites = np.sum(atoms >= 0, axis=1)
+
+    iso = np.zeros(len(cell_list))
+    cell_vec = np.zeros([len(cell_list), 3, 3])
+    for axis in range(3):
+        for j, sign in enumerate([-1.0, 1.0]):
+            neigh = cells.cellAtoms[cells.cellNeigh[cell_list, 2 * axis + j]]
+            there = (atoms >= 0) & (neigh >= 0)
+            step = coords[neigh] - coords_cell
+            step -= np.round(step)
+            step[~there] = 0.0
+            iso += np.sum(np.abs(step[:, :, axis]), axis=1) * axis_len[axis]
+            cell_vec[:, axis] += sign * np.sum(step, axis=1)
+    iso /= num_sites * 6.0
+    cell_vec /= 2.0 * num_sites[:, None, None]
+    cell_vec = np.matmul(cell_vec, vectors)
+
+    length = la.norm(cell_vec, axis=2)
+    angle = np.zeros([len(cell_list), 3])
+    for i in range(3):
+        vec_1 = cell_vec[:, (i + 1) % 3]
+        vec_2 = cell_vec[:, (i + 2) % 3]
+        cos_t = np.sum(vec_1 * vec_2, axis=1) / \
+            (length[:, (i + 1) % 3] * length[:, (i + 2) % 3])
+        angle[:, i] = np.degrees(np.arccos(np.clip(cos_t, -1.0, 1.0)))
+
+    return {"iso": iso, "length": length, "angle": angle}
+
+
+def cell_center(cells, rmc6f_config, cell_list):
+    '''
+    Center of cells, as the mean position of atoms in each cell
+
+    :param cells: Unit cells of the configuration.
+    :type cells: CellTable
+    :param rmc6f_config: RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param cell_list: Index of cells.
+    :type cell_list: numpy.array, (V,)
+
+    :return: Fractional coordinates of the center of each cell, taking atoms \
+             across the periodic boundary to the same side as the first atom \
+             of the cell.
+    :rtype: numpy.array, (V, 3)
+    '''
+    coords = np.asarray(rmc6f_config.atomsCoordArr, dtype=np.float64)
+
+    atoms = cells.cellAtoms[cell_list]
+    there = atoms >= 0
+    first = atoms[np.arange(len(cell_list)), np.argmax(there, axis=1)]
+    step = coords[atoms] - coords[first][:, None, :]
+    step -= np.round(step)
+    step[~there] = 0.0
+    cent = coords[first] + np.sum(step, axis=1) / np.sum(there, axis=1)[:, None]
+
+    return cent - np.floor(cent)
+
+
+def micro_strain_calc(latt_para):
+    '''
+    Microstrain from cell parameters of cells
+
+    :param latt_para: Cell parameter of each cell.
+    :type latt_para: numpy.array
+
+    :return: Microstrain and its error.
+    :rtype: tuple
+    '''
+    latt_para = np.asarray(latt_para, dtype=np.float64)
+    a_bar = np.mean(latt_para)
+    micro_strain = np.sqrt(np.mean((latt_para / a_bar - 1) ** 2))
+
+    # Refer to the following discussion about the calculation
+    # of variance of microstrain (which by itself is a variance).
+    # In this case, we are calculating the variance of variance.
+    ms_s_err = np.sqrt(2 * micro_strain ** 4 / np.float64(len(latt_para) - 1))
+
+    return micro_strain, ms_s_err
+
+
+def _init_boot(cell_para):
+    '''
+    Set up worker process for bootstrap resampling
+
+    :param cell_para: Isotropic parameter and a, b and c lengths of valid \
+                      cells, for each configuration.
+    :type cell_para: numpy.array, (configurations, cells, 4)
+    '''
+    _boot["cell_para"] = cell_para
+
+
+def _boot_resample(task):
+    '''
+    Microstrain of bootstrap resamples of valid cells, in worker process
+
+    :param task: Index of configuration, number of resamples and seed.
+    :type task: tuple
+
+    :return: Microstrain from isotropic parameter and a, b and c lengths, \
+             for each resample.
+    :rtype: numpy.array, (resamples, 4)
+    '''
+    frame_i, num_boot, seed = task
+    cell_para = _boot["cell_para"][frame_i]
+    num_cells = len(cell_para)
+    rng = np.random.default_rng(seed)
+
+    boot_ms = np.zeros([num_boot, cell_para.shape[1]])
+    block = max(BOOT_BLOCK // cell_para.size, 1)
+    for start in range(0, num_boot, block):
+        stop = min(start + block, num_boot)
+        sample = cell_para[rng.integers(0, num_cells,
+                                        size=(stop - start, num_cells))]
+        a_bar = np.mean(sample, axis=1, keepdims=True)
+        boot_ms[start:stop] = np.sqrt(np.mean((sample / a_bar - 1) ** 2,
+                                              axis=1))
+
+    return boot_ms
+
+
+def rms_strain_boot(file_names, num_boot, processes=None, seed=None,
+                    ci=95.0, cache=False):
+    '''
+    Microstrain with bootstrap and ensemble error
+
+    The configurations should come from independent fits of the same \
+    starting configuration (i.e. share the same atoms, as for \
+    `RMC6FEnsemble`), so that the unit cells are only figured out once. \
+    Per-cell lattice parameters of each configuration are worked out once \
+    as well, and valid cells are then resampled with replacement `num_boot` \
+    times for each configuration, over a pool of worker processes.
+
+    :param file_names: Glob pattern or full path of RMC6F files.
+    :type file_names: str or list
+    :param num_boot: Number of bootstrap resamples for each configuration.
+    :type num_boot: int
+    :param processes: Number of worker processes, number of CPUs if None.
+    :type processes: int
+    :param seed: Random seed, a fresh one (printed in the log) if None.
+    :type seed: int
+    :param ci: Confidence level of percentile intervals, in percent.
+    :type ci: float
+    :param cache: Whether to use the binary sidecar cache of `RMC6FReader`.
+    :type cache: bool
+
+    :return: Microstrain from isotropic parameter and a, b and c lengths, \
+             of each configuration (`frame_ms`, (configurations, 4)) and \
+             of each resample (`boot_ms`, (configurations, resamples, 4)).
+    :rtype: dict
+
+    Output:
+        CONFIG_boot_#.log -- Bootstrap and ensemble microstrain summary.
+    '''
+    ensemble = RMC6FEnsemble(file_names, processes=processes, cache=cache)
 
     start = timeit.default_timer()
 
-    print("\nCalculating micro strain...")
+    print("\nCalculating micro strain with bootstrap error...")
 
-    print("\nFirst, figuring out unique cells existing...")
+    cells = CellTable(ensemble.topology)
+    valid_cells = np.flatnonzero(cells.cellValid)
+    if len(valid_cells) == 0:
+        print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+        print("!!!!!!!!!!!No valid cells found!!!!!!!!!!!")
+        print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+        ensemble.close()
+        sys.exit()
 
-    # Figure out unique cell list.
-    cells = []
-    cell_num = 0
+    num_frames = ensemble.numFrames
+    cell_para = np.zeros([num_frames, len(valid_cells), 4])
+    for frame_i in range(num_frames):
+        latt = cell_lattice(cells, ensemble.frame(frame_i), valid_cells)
+        cell_para[frame_i, :, 0] = latt["iso"]
+        cell_para[frame_i, :, 1:] = latt["length"]
+    file_names = ensemble.fileNames
+    ensemble.close()
 
-    for i in range(rmc6f_config.numAtoms):
-        cell_temp = [int(x) for x in rmc6f_config.atomsLine[i].split()[7:]]
-        ref_temp = int(rmc6f_config.atomsLine[i].split()[6])
-        atom_i = i
-        if i == 0:
-            cell_exist = False
-        else:
-            cell_exist = False
-            index = 0
-            for item in cells:
-                if cell_temp[0] == item[0][0] and \
-                        cell_temp[1] == item[0][1] and \
-                        cell_temp[2] == item[0][2]:
-                    cell_exist = True
-                    break
-                index += 1
-
-        if not cell_exist:
-            cells.append([cell_temp, {}])
-            cells[cell_num][1][ref_temp] = atom_i
-            cell_num += 1
-        else:
-            cells[index][1][ref_temp] = atom_i
-
-    # Store cell string for later search purpose. For example, cell '1 2 3' will
-    # be stored as '123'.
-    cells_string = []
-    for item in cells:
-        str_temp = str(item[0][0]) + "," + str(item[0][1]) + "," + str(item[0][2])
-        cells_string.append(str_temp)
-
-    # Configure number of atoms in one unit cell, assuming that we do have
-    # at least one full unit cell.
-    max_ref_num = 0
-    for item in cells:
-        if len(item[1]) > max_ref_num:
-            max_ref_num = len(item[1])
-    for i in range(len(cells)):
-        if len(cells[i][1]) < max_ref_num:
-            cells[i].append([0])
-        else:
-            cells[i].append([1])
+    print("Lattice parameters of cells successfully calculated.")
 
-    print("Unique cells successfully configured.")
+    frame_ms = np.array([[micro_strain_calc(cell_para[i, :, j])[0]
+                          for j in range(4)] for i in range(num_frames)])
 
-    print("\nNow, figuring out neighbours of cells...")
+    # Tasks of fixed size, each with its own seed, so that resamples do not
+    # depend on the number of processes.
+    seed_seq = np.random.SeedSequence(seed)
+    tasks = [(frame_i, min(BOOT_TASK, num_boot - i))
+             for frame_i in range(num_frames)
+             for i in range(0, num_boot, BOOT_TASK)]
+    tasks = [x + (y,) for x, y in zip(tasks, seed_seq.spawn(len(tasks)))]
 
-    # Figure out neighbouring cells.
-    for i in range(len(cells)):
-        cells[i].append([])
+    if processes == 1:
+        _init_boot(cell_para)
+        boot_ms = [_boot_resample(x) for x in tasks]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_boot,
+                                  initargs=(cell_para,)) as pool:
+            boot_ms = pool.map(_boot_resample, tasks)
+    if len(boot_ms) > 0:
+        boot_ms = np.concatenate(boot_ms).reshape([num_frames, num_boot, 4])
+    else:
+        boot_ms = np.zeros([num_frames, 0, 4])
 
-        if cells[i][0][0] == 0:
-            a_min_1 = rmc6f_config.scDim[0] - 1
-        else:
-            a_min_1 = cells[i][0][0] - 1
-        str_temp = str(a_min_1) + "," + str(cells[i][0][1]) + "," + str(cells[i][0][2])
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
+    pct = [50.0 - ci / 2.0, 50.0 + ci / 2.0]
 
-        if cells[i][0][0] == rmc6f_config.scDim[0] - 1:
-            a_plus_1 = 0
-        else:
-            a_plus_1 = cells[i][0][0] + 1
-        str_temp = str(a_plus_1) + "," + str(cells[i][0][1]) + "," + str(cells[i][0][2])
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
+    file_exist = True
+    i = 1
+    while file_exist:
+        file_check = file_names[0].split(os.sep)[-1].split(".")[0] + "_boot_" + str(i) + ".log"
+        if not os.path.exists(file_check):
+            file_exist = False
+            file_use = file_check
+        i += 1
 
-        if cells[i][0][1] == 0:
-            b_min_1 = rmc6f_config.scDim[1] - 1
+    now = datetime.datetime.now()
+    log_file = open(file_use, "w")
+    log_file.write("=====================================================================\n")
+    log_file.write("Log file for bootstrap and ensemble microstrain analysis.\n")
+    log_file.write("=====================================================================\n")
+    log_file.write("Time stamp: " + str(now)[:19] + "\n")
+    log_file.write("=====================================================================\n")
+    log_file.write("Number of configurations: {0:10d}\n".format(num_frames))
+    log_file.write("Total number of cells:    {0:10d}\n".format(cells.numCells))
+    log_file.write("Number of valid cells:    {0:10d}\n".format(len(valid_cells)))
+    log_file.write("Bootstrap resamples:      {0:10d}\n".format(num_boot))
+    log_file.write("Random seed: " + str(seed_seq.entropy) + "\n")
+    log_file.write("Percentile interval: {0:.1F}%\n".format(ci))
+    log_file.write("=====================================================================\n")
+    log_file.write("{0:>6s}{1:>7s}{2:>12s}{3:>12s}{4:>12s}{5:>12s}{6:>12s}\n".format(
+        "Config", "Axis", "MS", "Boot_mean", "Boot_std", "Low", "High"))
+    log_file.write("=====================================================================\n")
+    for frame_i in range(num_frames):
+        for j, axis in enumerate(["iso", "a", "b", "c"]):
+            if num_boot > 0:
+                boot_t = boot_ms[frame_i, :, j]
+                stat_t = [np.mean(boot_t), np.std(boot_t)] + list(np.percentile(boot_t, pct))
+            else:
+                stat_t = [np.nan] * 4
+            log_file.write("{0:6d}{1:>7s}{2:12.6F}{3:12.6F}{4:12.6F}{5:12.6F}{6:12.6F}\n".format(
+                frame_i + 1, axis, frame_ms[frame_i, j], *stat_t))
+    log_file.write("=====================================================================\n")
+    log_file.write("Over all configurations (resamples of all configurations pooled):\n")
+    log_file.write("{0:>7s}{1:>12s}{2:>12s}{3:>12s}{4:>12s}{5:>12s}{6:>12s}\n".format(
+        "Axis", "MS_mean", "MS_std", "Boot_mean", "Boot_std", "Low", "High"))
+    ensemble_ms = []
+    for j, axis in enumerate(["iso", "a", "b", "c"]):
+        ms_std = np.std(frame_ms[:, j], ddof=1) if num_frames > 1 else 0.0
+        if num_boot > 0:
+            boot_t = boot_ms[:, :, j].reshape(-1)
+            stat_t = [np.mean(boot_t), np.std(boot_t)] + list(np.percentile(boot_t, pct))
         else:
-            b_min_1 = cells[i][0][1] - 1
-        str_temp = str(cells[i][0][0]) + "," + str(b_min_1) + "," + str(cells[i][0][2])
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
+            stat_t = [np.nan] * 4
+        ensemble_ms.append([np.mean(frame_ms[:, j]), ms_std] + stat_t)
+        log_file.write("{0:>7s}{1:12.6F}{2:12.6F}{3:12.6F}{4:12.6F}{5:12.6F}{6:12.6F}\n".format(
+            axis, *ensemble_ms[j]))
+    log_file.write("=====================================================================")
 
-        if cells[i][0][1] == rmc6f_config.scDim[1] - 1:
-            b_plus_1 = 0
-        else:
-            b_plus_1 = cells[i][0][1] + 1
-        str_temp = str(cells[i][0][0]) + "," + str(b_plus_1) + "," + str(cells[i][0][2])
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
+    log_file.close()
 
-        if cells[i][0][2] == 0:
-            c_min_1 = rmc6f_config.scDim[2] - 1
-        else:
-            c_min_1 = cells[i][0][2] - 1
-        str_temp = str(cells[i][0][0]) + "," + str(cells[i][0][1]) + "," + str(c_min_1)
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
+    stop = timeit.default_timer()
 
-        if cells[i][0][2] == rmc6f_config.scDim[2] - 1:
-            c_plus_1 = 0
-        else:
-            c_plus_1 = cells[i][0][2] + 1
-        str_temp = str(cells[i][0][0]) + "," + str(cells[i][0][1]) + "," + str(c_plus_1)
-        if str_temp in cells_string:
-            cells[i][3].append(cells_string.index(str_temp))
-
-    print("Neighbours of cells successfully configured.")
-
-    print("\nChecking completeness of cells...")
-
-    # Checking whether a cell should be included in calculating the unit cell
-    # parameter. There are three criteria here:
-    # 1. The cell should be full, i.e. no atoms missing.
-    # 2. All neighbours should be present, namely, up, down, left, right, forward and backward.
-    # 3. The neighbouring cells should also be full.
-    for i in range(len(cells)):
-        cell_full = (cells[i][2][0] == 1)
-        cell_neigh_full = (len(cells[i][3]) == 6)
-        cell_neighs_full = True
-        for item in cells[i][3]:
-            if cells[item][2][0] == 0:
-                cell_neighs_full = False
-                break
-        if cell_full and cell_neigh_full and cell_neighs_full:
-            cells[i].append([1])
-        else:
-            cells[i].append([0])
+    print("\n------------------------------------------")
+    print("Microstrain = {0:8.6F} +/- {1:<8.6F}".format(ensemble_ms[0][0], ensemble_ms[0][3]))
+    print("{0:.1F}% interval: {1:8.6F} - {2:<8.6F}".format(ci, ensemble_ms[0][4],
+                                                          ensemble_ms[0][5]))
+    print("Time taken:{0:11.3F} s".format(stop - start))
+    print("------------------------------------------")
+    print("Log information can be found here:")
+    print("------------------------------------------")
+    print(file_use)
+    print("------------------------------------------")
 
-    print("Cells completeness successfully configured.")
+    return {"frame_ms": frame_ms, "boot_ms": boot_ms}
+
+
+def rms_strain_calc(rmc6f_config):
+
+    start = timeit.default_timer()
+
+    print("\nCalculating micro strain...")
+
+    print("\nFirst, figuring out unique cells, their neighbours and completeness...")
+
+    cells = CellTable(rmc6f_config)
+
+    print("Unique cells successfully configured.")
 
     print("\nCalculating cell parameters...")
 
     # Calculating the cell parameter.
-    a_list = []
-    valid_cell_num = 0
-    for item in cells:
-        if item[4][0] == 1:
-            a_temp = 0.0
-            valid_cell_num += 1
-            for k in item[1]:
-                atom_1 = item[1][k]
-                for i in range(6):
-                    atom_2 = cells[item[3][i]][1][k]
-                    if i < 2:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][0] -
-                                    rmc6f_config.atomsCoord[atom_2][0])
-                    elif i < 4:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][1] -
-                                    rmc6f_config.atomsCoord[atom_2][1])
-                    else:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][2] -
-                                    rmc6f_config.atomsCoord[atom_2][2])
-                    if vec_t > 0.5:
-                        vec_t = 1 - vec_t
-                    latt_a = np.asarray(rmc6f_config.vectors[0])
-                    a_temp += (vec_t * la.norm(latt_a))
-                    # if (vec_t * la.norm(latt_a) - 5.41046) > 1E-8:
-                    #     print(item, k, i)
-
-            a_list.append(a_temp/(float(len(item[1])) * 6.0))
+    valid_cells = np.flatnonzero(cells.cellValid)
+    valid_cell_num = len(valid_cells)
 
     if valid_cell_num == 0:
         print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
@@ -190,16 +464,17 @@ def rms_strain_calc(rmc6f_config):
         print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
         sys.exit()
 
+    latt = cell_lattice(cells, rmc6f_config, valid_cells)
+    a_list = latt["iso"]
+
     print("Lattice parameters of cells successfully calculated.")
 
     # Calculate the micro strain.
-    a_bar = sum(a_list) / len(a_list)
-
-    sum_t = 0
-    for item in a_list:
-        sum_t += (item / a_bar - 1)**2
-    micro_strain = np.sqrt(sum_t / float(len(a_list)))
-    ms_s_err = np.sqrt(2 * micro_strain**4 / (float(len(a_list) - 1)))
+    micro_strain, ms_s_err = micro_strain_calc(a_list)
+    axis_ms = [micro_strain_calc(latt["length"][:, i]) for i in range(3)]
+    latt_mean = np.mean(latt["length"], axis=0)
+    angle_mean = np.mean(latt["angle"], axis=0)
+    angle_std = np.std(latt["angle"], axis=0)
 
     file_exist = True
     i = 1
@@ -217,9 +492,20 @@ def rms_strain_calc(rmc6f_config):
     log_file.write("==================================\n")
     log_file.write("Time stamp: " + str(now)[:19] + "\n")
     log_file.write("==================================\n")
-    log_file.write("Total number of cells: {0:10d}\n".format(len(cells)))
+    log_file.write("Total number of cells: {0:10d}\n".format(cells.numCells))
     log_file.write("Number of valid cells: {0:10d}\n".format(valid_cell_num))
     log_file.write("Microstrain: {0:8.6F} +/- {1:<8.6F}\n".format(micro_strain, ms_s_err))
+    log_file.write("==================================\n")
+    for i, axis in enumerate(["a", "b", "c"]):
+        log_file.write("Microstrain ({0:s}): {1:8.6F} +/- {2:<8.6F}\n".format(axis, axis_ms[i][0],
+                                                                            axis_ms[i][1]))
+    log_file.write("==================================\n")
+    log_file.write("Mean cell lengths (angstrom):\n")
+    log_file.write("{0:10.6F}{1:10.6F}{2:10.6F}\n".format(*latt_mean))
+    log_file.write("Mean cell angles (degree):\n")
+    log_file.write("{0:10.4F}{1:10.4F}{2:10.4F}\n".format(*angle_mean))
+    log_file.write("Std of cell angles (degree):\n")
+    log_file.write("{0:10.4F}{1:10.4F}{2:10.4F}\n".format(*angle_std))
     log_file.write("==================================")
 
     log_file.close()
@@ -228,6 +514,9 @@ def rms_strain_calc(rmc6f_config):
 
     print("\n------------------------------------------")
     print("Microstrain = {0:8.6F} +/- {1:<8.6F}".format(micro_strain, ms_s_err))
+    for i, axis in enumerate(["a", "b", "c"]):
+        print("Microstrain ({0:s}) = {1:8.6F} +/- {2:<8.6F}".format(axis, axis_ms[i][0],
+                                                                 axis_ms[i][1]))
     print("Time taken:{0:11.3F} s".format(stop - start))
     print("------------------------------------------")
     print("Log information can be found here:")
@@ -241,11 +530,6 @@ def rms_strain_calc(rmc6f_config):
 
     print("\nAnalyzing microstrain for shells...")
 
-    for i in range(len(cells)):
-        cells[i].append([0])
-
-    cell_shell = []
-
     nano_particle = nano_stuff.NanoStuff()
     test_bulk = input("\nIs this for bulk ([n]/y)?")
     if test_bulk.upper() == "Y":
@@ -265,125 +549,67 @@ def rms_strain_calc(rmc6f_config):
 
     start = timeit.default_timer()
 
-    low_lim = 0
-    hi_lim = 0
+    # Distance of valid cells to the center, sorted once and then cut into
+    # shells of (about) the same number of cells, going outwards.
+    cell_cent = cell_center(cells, rmc6f_config, valid_cells)
+    dist = rmc6f_stuff.DistCalc(rmc6f_config.vectors).one_to_many(nano_particle.centPosInt,
+                                                                  2.0 * cell_cent - 1.0)
+    cell_shells = PopulationShells(dist, np.ones(valid_cell_num, dtype=bool))
+
+    cell_shell = []
     low_lim_out = []
     hi_lim_out = []
-    check_step = 0.5
-    shell_processed = 0
-    cells_configured = 0
+    hi_lim = 0.0
     enough_left = True
-
     while (hi_lim < nano_particle.NPRadius) and enough_left:
-        cell_shell.append([])
-        cell_num = 0
-        while cell_num < min_num_in_shell:
-            hi_lim += check_step
-            list_temp = []
-            burst = False
-            for ii in range(len(cells)):
-                if cells[ii][4][0] == 1:
-                    dist_temp = rmc6f_stuff.dist_calc_coord(nano_particle.centPosInt,
-                                                            rmc6f_config.atomsCoordInt[cells[ii][1][1]],
-                                                            rmc6f_config.vectors)
-                    if (low_lim <= dist_temp < hi_lim) and cells[ii][5][0] == 0:
-                        list_temp.append(ii)
-            space_left = min_num_in_shell - cell_num
-            to_eat = len(list_temp)
-            if space_left < int(0.1 * float(min_num_in_shell)) and \
-                    to_eat > int(0.15 * float(min_num_in_shell)):
-                burst = True
-            if not burst:
-                cell_shell[shell_processed].extend(list_temp)
-                cells_configured += len(list_temp)
-                for item in list_temp:
-                    cells[item][5][0] = 1
-                cell_num += len(list_temp)
-            else:
-                hi_lim -= check_step
-                break
-
+        shell, low_lim, hi_lim = cell_shells.next_shell(min_num_in_shell)
+        cell_shell.append(shell)
         low_lim_out.append(low_lim)
         hi_lim_out.append(hi_lim)
 
-        shell_processed += 1
-        low_lim = hi_lim
-
-        cells_left = len(a_list) - cells_configured
-        if cells_left < 2 * min_num_in_shell:
+        if cell_shells.focusLeft < 2 * min_num_in_shell:
             enough_left = False
+    shell_processed = len(cell_shell)
+
+    cell_shell.append(cell_shells.atoms_left())
+    low_lim_out.append(cell_shells.lowLim)
+    if len(cell_shell[-1]) > 0:
+        hi_lim_out.append(float(np.nextafter(np.max(dist), np.inf)))
+    else:
+        hi_lim_out.append(cell_shells.lowLim)
 
-    cell_shell.append([])
-
-    for i in range(len(cells)):
-        if cells[i][4][0] == 1 and cells[i][5][0] == 0:
-            cell_shell[shell_processed].append(i)
-    hi_lim_out[shell_processed - 1] = nano_particle.NPRadius
-
-    shell_ms = []
-    for shell in cell_shell:
-        a_list = []
-        for item in shell:
-            a_temp = 0.0
-            for k in cells[item][1]:
-                atom_1 = cells[item][1][k]
-                for i in range(6):
-                    atom_2 = cells[cells[item][3][i]][1][k]
-                    if i < 2:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][0] -
-                                    rmc6f_config.atomsCoord[atom_2][0])
-                    elif i < 4:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][1] -
-                                    rmc6f_config.atomsCoord[atom_2][1])
-                    else:
-                        vec_t = abs(rmc6f_config.atomsCoord[atom_1][2] -
-                                    rmc6f_config.atomsCoord[atom_2][2])
-                    if vec_t > 0.5:
-                        vec_t = 1 - vec_t
-                    latt_a = np.asarray(rmc6f_config.vectors[0])
-                    a_temp += (vec_t * la.norm(latt_a))
-
-            a_list.append(a_temp / (float(len(cells[item][1])) * 6.0))
-
-        # Calculate the micro strain.
-        a_bar = sum(a_list) / len(a_list)
-
-        # Refer to the following discussion about the calculation
-        # of variance of microstrain (which by itself is a variance).
-        # In this case, we are calculating the variance of variance.
-        sum_t = 0
-        for item in a_list:
-            sum_t += (item / a_bar - 1) ** 2
-        micro_strain = np.sqrt(sum_t / float(len(a_list)))
-        ms_s_err = np.sqrt(2 * micro_strain ** 4 / (float(len(a_list) - 1)))
-        shell_ms.append([micro_strain, ms_s_err])
+    # Per-cell lattice parameters, isotropic and a, b and c lengths.
+    cell_para = np.column_stack([latt["iso"], latt["length"]])
+    shell_ms = [[micro_strain_calc(cell_para[shell, j]) for j in range(4)]
+                for shell in cell_shell]
 
     now = datetime.datetime.now()
     file_use = file_use.split(".")[0] + "_shells.log"
     log_file = open(file_use, "w")
-    log_file.write("=====================================================\n")
+    log_file.write("============================================================================================\n")
     log_file.write("Log file for nanoparticle shell microstrain analysis.\n")
-    log_file.write("=====================================================\n")
+    log_file.write("============================================================================================\n")
     log_file.write("Time stamp: " + str(now)[:19] + "\n")
-    log_file.write("=====================================================\n")
+    log_file.write("============================================================================================\n")
     log_file.write("Analysis sphere center location (fractional): \n")
     log_file.write("{0:16.13F},{1:16.13F},{2:16.13F}\n".format((nano_particle.centPosInt[0] + 1.0) / 2.0,
                                                                (nano_particle.centPosInt[1] + 1.0) / 2.0,
                                                                (nano_particle.centPosInt[2] + 1.0) / 2.0))
-    log_file.write("=====================================================\n")
+    log_file.write("============================================================================================\n")
     log_file.write("Analysis sphere radius: {0:15.6F} angstrom.\n".format(nano_particle.NPRadius))
-    log_file.write("=====================================================\n")
-    log_file.write("{0:>10s}{1:>12s}{2:>10s}{3:>10s}\n".format("Shell", "# of cells", "MS", "Err"))
-    log_file.write("=====================================================\n")
+    log_file.write("============================================================================================\n")
+    log_file.write("{0:>10s}{1:>12s}{2:>10s}{3:>10s}{4:>10s}{5:>10s}{6:>10s}{7:>10s}{8:>10s}\n".format(
+        "Shell", "# of cells", "Low", "High", "MS", "Err", "MS_a", "MS_b", "MS_c"))
+    log_file.write("============================================================================================\n")
     if test_bulk.upper() == "Y":
-        for i in range(len(cell_shell) - 1):
-            log_file.write("{0:10d}{1:12d}{2:10.6f}{3:10.6f}\n".format(i + 1, len(cell_shell[i]),
-                                                                       shell_ms[i][0], shell_ms[i][1]))
+        num_shells_out = len(cell_shell) - 1
     else:
-        for i in range(len(cell_shell)):
-            log_file.write("{0:10d}{1:12d}{2:10.6f}{3:10.6f}\n".format(i + 1, len(cell_shell[i]),
-                                                                       shell_ms[i][0], shell_ms[i][1]))
-    log_file.write("=====================================================")
+        num_shells_out = len(cell_shell)
+    for i in range(num_shells_out):
+        log_file.write("{0:10d}{1:12d}{2:10.3f}{3:10.3f}{4:10.6f}{5:10.6f}{6:10.6f}{7:10.6f}{8:10.6f}\n".format(
+            i + 1, len(cell_shell[i]), low_lim_out[i], hi_lim_out[i], shell_ms[i][0][0], shell_ms[i][0][1],
+            shell_ms[i][1][0], shell_ms[i][2][0], shell_ms[i][3][0]))
+    log_file.write("============================================================================================")
 
     log_file.close()
 
@@ -0,0 +1,112 @@
+"""
+Check of RMC6F sidecar cache
+============================
+
+Python script checking the binary sidecar cache of `rmc_tools.rmc6f_stuff.
+RMC6FReader` against plain parsing of the example configuration, with `rmc_tools`
+available (installed, or the repository root on `PYTHONPATH`), simply as,
+
+.. code-block:: sh
+
+    python check_cache.py
+
+Checked:
+    - Arrays loaded from the cache are the same as parsed from the RMC6F file.
+
+    - The cache is used (memory mapped) when the RMC6F file is unchanged.
+
+    - The cache is not used, and gets rewritten, once the content or the
+      modification time of the RMC6F file (i.e. `file_key`) changes.
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader, CACHE_ARRAYS, CACHE_EXT
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+
+example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "LTNNbOF_Tetra", "Example", "LTNNbOF_Test_LiNi.rmc6f")
+
+
+def check(passed, what):
+    if not passed:
+        print("\nCheck failed: " + what)
+        sys.exit(1)
+    print("Check passed: " + what)
+
+
+def same_arrays(config_1, config_2):
+    return all(np.array_equal(getattr(config_1, item), getattr(config_2, item))
+               for item in CACHE_ARRAYS) and \
+        config_1.atomsEleTypes == config_2.atomsEleTypes
+
+
+def main():
+
+    wk_dir = tempfile.mkdtemp()
+    try:
+        rmc6f_fn = os.path.join(wk_dir, os.path.basename(example))
+        shutil.copy(example, rmc6f_fn)
+        cache_dir = rmc6f_fn + CACHE_EXT
+
+        plain = RMC6FReader(rmc6f_fn, columnar=True)
+        first = RMC6FReader(rmc6f_fn, cache=True)
+        check(os.path.isdir(cache_dir), "cache written on first read")
+        check(not isinstance(first.atomsCoordArr, np.memmap),
+              "first read parsed from RMC6F file")
+        check(same_arrays(first, plain), "first read same as plain parsing")
+
+        second = RMC6FReader(rmc6f_fn, cache=True)
+        check(isinstance(second.atomsCoordArr, np.memmap),
+              "second read loaded from cache")
+        check(same_arrays(second, plain), "cache same as plain parsing")
+        check(second.atomsEle == plain.atomsEle and
+              second.atomsCoord == plain.atomsCoord,
+              "list views from cache same as plain parsing")
+        del second
+
+        # Change a coordinate of the last atom, keeping the file size and the
+        # modification time, so that only the content hash tells.
+        f_stat = os.stat(rmc6f_fn)
+        with open(rmc6f_fn, "r") as f_in:
+            lines = f_in.readlines()
+        line_s = lines[-1].split()
+        old_coord = line_s[3]
+        new_coord = ("0." + "9" * (len(old_coord) - 2))[:len(old_coord)]
+        if new_coord == old_coord:
+            new_coord = new_coord[:-1] + "8"
+        lines[-1] = lines[-1].replace(old_coord, new_coord, 1)
+        with open(rmc6f_fn, "w") as f_out:
+            f_out.writelines(lines)
+        os.utime(rmc6f_fn, ns=(f_stat.st_atime_ns, f_stat.st_mtime_ns))
+        check(os.path.getsize(rmc6f_fn) == f_stat.st_size,
+              "content changed with file size kept")
+
+        changed = RMC6FReader(rmc6f_fn, cache=True)
+        check(not isinstance(changed.atomsCoordArr, np.memmap),
+              "cache not used after content change")
+        check(changed.atomsCoordArr[-1][0] == float(new_coord),
+              "changed content read in")
+        check(same_arrays(RMC6FReader(rmc6f_fn, cache=True),
+                          RMC6FReader(rmc6f_fn, columnar=True)),
+              "cache rewritten after content change")
+
+        # Only the modification time changed.
+        os.utime(rmc6f_fn, ns=(f_stat.st_atime_ns, f_stat.st_mtime_ns + 10**9))
+        touched = RMC6FReader(rmc6f_fn, cache=True)
+        check(not isinstance(touched.atomsCoordArr, np.memmap),
+              "cache not used after modification time change")
+    finally:
+        shutil.rmtree(wk_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
+
+    print("\n======================================================")
+    print("==================All checks passed!==================")
+    print("======================================================")
@@ -0,0 +1,127 @@
+"""
+Check of RMC6F ensemble
+=======================
+
+Python script checking `rmc_tools.ensemble_stuff.RMC6FEnsemble` on
+configurations made from the example configuration, with `rmc_tools` available
+(installed, or the repository root on `PYTHONPATH`), simply as,
+
+.. code-block:: sh
+
+    python check_ensemble.py [START_METHOD]
+
+where START_METHOD ('fork', 'spawn' or 'forkserver') is the multiprocessing
+start method, the default one of the platform if not given.
+
+Checked:
+    - Coordinates written by pool workers straight into the memory mapped file
+      are the same as the RMC6F files read in one by one.
+
+    - Analyses mapped over the ensemble in workers give the same results as
+      run on each configuration in turn, and workers leave the coordinates
+      file in place.
+
+    - A configuration with a different topology is rejected, with the
+      temporary coordinates file removed.
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader, RMC6FWriter
+from rmc_tools.ensemble_stuff import RMC6FEnsemble
+import glob
+import multiprocessing
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+
+example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "LTNNbOF_Tetra", "Example", "LTNNbOF_Test_LiNi.rmc6f")
+num_configs = 6
+
+
+def check(passed, what):
+    if not passed:
+        print("\nCheck failed: " + what)
+        sys.exit(1)
+    print("Check passed: " + what)
+
+
+def mean_coord(rmc6f_config):
+    """
+    Analysis mapped over the ensemble, with screen output to be suppressed.
+    """
+    print("Analysing " + rmc6f_config.fileName)
+
+    return np.asarray(rmc6f_config.atomsCoordArr).mean(axis=0).tolist(), \
+        rmc6f_config.atomsEle[:3]
+
+
+def make_configs(wk_dir):
+    """
+    Configurations with atoms shifted differently, and one with an atom less.
+    """
+    rmc6f_config = RMC6FReader(example, columnar=True)
+    rmc6f_writer = RMC6FWriter(rmc6f_config, decimals=8)
+    rng = np.random.default_rng(1)
+    for i in range(num_configs):
+        coords = np.mod(rmc6f_config.atomsCoordArr +
+                        rng.normal(0.0, 0.002, rmc6f_config.atomsCoordArr.shape), 1.0)
+        rmc6f_writer.write(os.path.join(wk_dir, "fit_" + str(i) + ".rmc6f"),
+                           coords=coords)
+    odd_one = os.path.join(wk_dir, "odd", "fit_odd.rmc6f")
+    os.mkdir(os.path.dirname(odd_one))
+    rmc6f_writer.write(odd_one, index=np.arange(rmc6f_config.numAtoms - 1))
+
+    return os.path.join(wk_dir, "fit_*.rmc6f"), odd_one
+
+
+def main():
+
+    wk_dir = tempfile.mkdtemp()
+    try:
+        pattern, odd_one = make_configs(wk_dir)
+
+        ensemble = RMC6FEnsemble(pattern, processes=2)
+        traj_file = ensemble.trajFile
+        check(ensemble.numFrames == num_configs and ensemble.frameLoaded.all(),
+              "all configurations read in by workers")
+        singles = [RMC6FReader(item, columnar=True) for item in ensemble.fileNames]
+        check(all(np.array_equal(ensemble.atomsCoordArr[i], item.atomsCoordArr)
+                  for i, item in enumerate(singles)),
+              "coordinates written by workers same as read in one by one")
+
+        results = ensemble.map(mean_coord)
+        check(results == [mean_coord(item) for item in singles],
+              "analysis in workers same as run in turn")
+        check(os.path.exists(traj_file),
+              "coordinates file left in place by workers")
+        ensemble.close()
+        check(not os.path.exists(traj_file),
+              "temporary file removed by close()")
+
+        temp_before = set(glob.glob(os.path.join(tempfile.gettempdir(), "*.npy")))
+        try:
+            RMC6FEnsemble(sorted(glob.glob(pattern)) + [odd_one], processes=2)
+            exited = False
+        except SystemExit:
+            exited = True
+        check(exited, "configuration with different topology rejected")
+        temp_after = set(glob.glob(os.path.join(tempfile.gettempdir(), "*.npy")))
+        check(len(temp_after - temp_before) == 0,
+              "temporary file removed on different topology")
+    finally:
+        shutil.rmtree(wk_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        multiprocessing.set_start_method(sys.argv[1])
+
+    main()
+
+    print("\n======================================================")
+    print("==================All checks passed!==================")
+    print("======================================================")
@@ -0,0 +1,133 @@
+"""
+Check of neighbour list
+=======================
+
+Python script checking `rmc_tools.neigh_stuff.NeighList` against brute force
+distances of all pairs of atoms with `rmc_tools.rmc6f_stuff.dist_calc_coord`,
+for the example configuration and a sheared copy of it, with `rmc_tools`
+available (installed, or the repository root on `PYTHONPATH`), simply as,
+
+.. code-block:: sh
+
+    python check_neigh.py
+
+Checked, for cutoffs giving several, two and a single bin along each axis:
+    - Same neighbours and distances of each atom as brute force.
+
+    - Displacement vectors (`with_vec=True`) as long as the distances.
+
+    - Only the element pairs asked for with `ele_pairs`.
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader, dist_calc_coord
+from rmc_tools.neigh_stuff import NeighList
+import numpy as np
+import os
+import shutil
+import sys
+import tempfile
+
+example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "LTNNbOF_Tetra", "Example", "LTNNbOF_Test_LiNi.rmc6f")
+r_cuts = [2.5, 4.0, 5.5, 7.0]
+
+
+def check(passed, what):
+    if not passed:
+        print("\nCheck failed: " + what)
+        sys.exit(1)
+    print("Check passed: " + what)
+
+
+def sheared(wk_dir):
+    """
+    Copy of the example configuration with sheared lattice vectors.
+    """
+    with open(example, "r") as f_in:
+        lines = f_in.readlines()
+    line_i = [i for i, line in enumerate(lines)
+              if "Lattice vectors (Ang):" in line][0]
+    vec = np.array([[float(x) for x in lines[line_i + 1 + i].split()]
+                    for i in range(3)])
+    vec[1] += 0.15 * vec[0]
+    vec[2] += 0.1 * vec[0] - 0.1 * vec[1]
+    for i in range(3):
+        lines[line_i + 1 + i] = "{0:12.6F}{1:12.6F}{2:12.6F}\n".format(*vec[i])
+    rmc6f_fn = os.path.join(wk_dir, "sheared.rmc6f")
+    with open(rmc6f_fn, "w") as f_out:
+        f_out.writelines(lines)
+
+    return rmc6f_fn
+
+
+def brute_force(rmc6f_config):
+    """
+    Distances of all pairs of atoms, one pair at a time.
+    """
+    coords_int = 2.0 * np.asarray(rmc6f_config.atomsCoordArr) - 1.0
+    num_atoms = rmc6f_config.numAtoms
+    dist = np.full([num_atoms, num_atoms], np.inf)
+    for i in range(num_atoms):
+        for j in range(i + 1, num_atoms):
+            dist[i, j] = dist_calc_coord(coords_int[i], coords_int[j],
+                                         rmc6f_config.vectors)
+            dist[j, i] = dist[i, j]
+
+    return dist
+
+
+def check_config(rmc6f_config, name):
+
+    dist = brute_force(rmc6f_config)
+    ele_code = np.asarray(rmc6f_config.atomsEleCode)
+    ele_types = rmc6f_config.atomsEleTypes
+    for r_cut in r_cuts:
+        what = " ({0:s}, cutoff {1:.1F})".format(name, r_cut)
+
+        neigh_list = NeighList(rmc6f_config, r_cut, with_vec=True)
+        same = True
+        for i in range(rmc6f_config.numAtoms):
+            index, dist_i = neigh_list.neighbours(i)
+            expected = np.flatnonzero(dist[i] < r_cut)
+            order = np.argsort(index)
+            same = same and np.array_equal(index[order], expected) and \
+                np.allclose(dist_i[order], dist[i][expected], rtol=0.0,
+                            atol=1E-10)
+        check(same, "neighbours same as brute force" + what)
+        check(np.allclose(np.linalg.norm(neigh_list.vecs, axis=1),
+                          neigh_list.distances, rtol=0.0, atol=1E-10),
+              "displacement vectors as long as distances" + what)
+
+        ele_pair = (ele_types[0], ele_types[-1])
+        pair_list = NeighList(rmc6f_config, r_cut, ele_pairs=[ele_pair])
+        pair_i, pair_j = pair_list.pairs()
+        codes = {ele_types.index(item) for item in ele_pair}
+        keep = np.isin(ele_code[:, None], list(codes)) & \
+            np.isin(ele_code[None, :], list(codes)) & (dist < r_cut)
+        if ele_pair[0] != ele_pair[1]:
+            keep &= ele_code[:, None] != ele_code[None, :]
+        expected_i, expected_j = np.nonzero(keep)
+        order = np.lexsort((pair_j, pair_i))
+        check(np.array_equal(pair_i[order], expected_i) and
+              np.array_equal(pair_j[order], expected_j),
+              "only {0:s}-{1:s} pairs with ele_pairs".format(*ele_pair) + what)
+
+
+def main():
+
+    wk_dir = tempfile.mkdtemp()
+    try:
+        check_config(RMC6FReader(example, columnar=True), "example")
+        check_config(RMC6FReader(sheared(wk_dir), columnar=True), "sheared")
+    finally:
+        shutil.rmtree(wk_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
+
+    print("\n======================================================")
+    print("==================All checks passed!==================")
+    print("======================================================")
@@ -0,0 +1,125 @@
+"""
+Check of RMC6F trajectory
+=========================
+
+Python script checking `rmc_tools.traj_stuff.RMC6FTrajectory` on frames made
+from the example configuration, with `rmc_tools` available (installed, or the
+repository root on `PYTHONPATH`), simply as,
+
+.. code-block:: sh
+
+    python check_traj.py
+
+Checked:
+    - Frames, read in on demand into the memory mapped coordinates, are the
+      same as the RMC6F files read in one by one.
+
+    - The temporary coordinates file is removed by `close()`, and also when
+      leaving without `close()` - on a frame with a different topology, on
+      garbage collection and on `sys.exit()`.
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader, RMC6FWriter
+from rmc_tools.traj_stuff import RMC6FTrajectory
+import gc
+import numpy as np
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+example = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "LTNNbOF_Tetra", "Example", "LTNNbOF_Test_LiNi.rmc6f")
+num_frames = 4
+
+
+def check(passed, what):
+    if not passed:
+        print("\nCheck failed: " + what)
+        sys.exit(1)
+    print("Check passed: " + what)
+
+
+def make_frames(wk_dir):
+    """
+    Frames with atoms shifted a bit more in each, and one with an atom less.
+    """
+    rmc6f_config = RMC6FReader(example, columnar=True)
+    rmc6f_writer = RMC6FWriter(rmc6f_config, decimals=8)
+    file_names = []
+    for i in range(num_frames):
+        file_names.append(os.path.join(wk_dir, "frame_" + str(i) + ".rmc6f"))
+        coords = np.mod(rmc6f_config.atomsCoordArr + 0.001 * i, 1.0)
+        rmc6f_writer.write(file_names[-1], coords=coords)
+    odd_one = os.path.join(wk_dir, "odd_one.rmc6f")
+    rmc6f_writer.write(odd_one, index=np.arange(rmc6f_config.numAtoms - 1))
+
+    return file_names, odd_one
+
+
+def main():
+
+    wk_dir = tempfile.mkdtemp()
+    try:
+        file_names, odd_one = make_frames(wk_dir)
+
+        traj = RMC6FTrajectory(file_names)
+        traj_file = traj.trajFile
+        check(os.path.exists(traj_file), "temporary coordinates file created")
+        check(traj.frameLoaded.tolist() == [True] + [False] * (num_frames - 1),
+              "only the first frame read in on setting up")
+        for i in range(num_frames - 1, -1, -1):
+            frame = traj[i]
+            single = RMC6FReader(file_names[i], columnar=True)
+            check(np.array_equal(traj.coords(i), single.atomsCoordArr) and
+                  frame.atomsCoord == single.atomsCoord and
+                  frame.atomsEle == single.atomsEle,
+                  "frame " + str(i) + " same as read in on its own")
+        check(traj.frameLoaded.all(), "all frames read in")
+        traj.close()
+        check(not os.path.exists(traj_file),
+              "temporary file removed by close()")
+
+        traj = RMC6FTrajectory(file_names[:1] + [odd_one])
+        traj_file = traj.trajFile
+        try:
+            traj.load_all()
+            exited = False
+        except SystemExit:
+            exited = True
+        check(exited, "frame with different topology rejected")
+        check(not os.path.exists(traj_file),
+              "temporary file removed on different topology")
+
+        traj = RMC6FTrajectory(file_names)
+        traj_file = traj.trajFile
+        del traj
+        gc.collect()
+        check(not os.path.exists(traj_file),
+              "temporary file removed on garbage collection")
+
+        leave = "import sys\n" \
+                "from rmc_tools.traj_stuff import RMC6FTrajectory\n" \
+                "traj = RMC6FTrajectory([sys.argv[1]])\n" \
+                "print('TRAJ_FILE ' + traj.trajFile)\n" \
+                "sys.exit()\n"
+        out = subprocess.run([sys.executable, "-c", leave, file_names[0]],
+                             stdout=subprocess.PIPE, universal_newlines=True,
+                             check=True).stdout
+        traj_file = [line.split()[1] for line in out.splitlines()
+                     if line.startswith("TRAJ_FILE")][0]
+        check(not os.path.exists(traj_file),
+              "temporary file removed on sys.exit() without close()")
+    finally:
+        shutil.rmtree(wk_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
+
+    print("\n======================================================")
+    print("==================All checks passed!==================")
+    print("======================================================")
@@ -0,0 +1,314 @@
+"""
+Batch shell generation
+======================
+
+This modules holds stuff relevant to dividing many RMC6F configurations into
+shells without any interaction, driven by a job file and spread over a pool of
+processes. It can be run as,
+
+.. code-block:: sh
+
+    python -m rmc_tools.batch_stuff JOB_FILE [-p NUM_PROCESSES]
+
+The job file (JSON, or YAML if PyYAML is installed) looks like,
+
+.. code-block:: json
+
+    {
+        "processes": 4,
+        "defaults": {"type": "nano", "div_scheme": 1, "shell_thickness": 5.0,
+                     "compact": true},
+        "jobs": [
+            {"config": "fits/*/ceriaNano_NP.rmc6f"},
+            {"config": "ceriaB.rmc6f", "type": "bulk", "num_shells": 4,
+             "seed": 1}
+        ]
+    }
+
+where each job takes the entries in `defaults` unless given otherwise, and
+`config` can be a glob pattern (relative to the job file) giving one job for
+each configuration found. Entries of a job are,
+
++--------------------+-----------------------------------------+------+------+
+| Entry              | Meaning                                 | nano | bulk |
++====================+=========================================+======+======+
+| config             | RMC6F configuration (or glob pattern)   | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+| type               | `nano` or `bulk`                        | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+| div_scheme         | 1->by thickness, 2->by number of atoms, | yes  | yes  |
+|                    | 3->by exact number of atoms             |      |      |
++--------------------+-----------------------------------------+------+------+
+| shell_thickness    | Shell thickness, for scheme 1           | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+| num_shells         | Number of shells                        |      | yes  |
++--------------------+-----------------------------------------+------+------+
+| focus              | Element to focus on, for schemes 2, 3   | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+| min_num_in_shell   | Minimum number of focused atoms in      | yes  | yes  |
+|                    | shell, for schemes 2, 3                 |      |      |
++--------------------+-----------------------------------------+------+------+
+| surf_layer_thkness | Surface layer thickness, schemes 2, 3   | yes  |      |
++--------------------+-----------------------------------------+------+------+
+| percentile         | Percentile of distances for the radius  | yes  |      |
++--------------------+-----------------------------------------+------+------+
+| periodic           | Periodic center of particle             | yes  |      |
++--------------------+-----------------------------------------+------+------+
+| seed               | Random seed for the center              |      | yes  |
++--------------------+-----------------------------------------+------+------+
+| compact            | Save shells in one `.npz` file          | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+| write              | Whether to write out shells at all      | yes  | yes  |
++--------------------+-----------------------------------------+------+------+
+
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader
+from rmc_tools.bulk_stuff import BulkStuff
+from rmc_tools.nano_stuff import NanoStuff
+from contextlib import redirect_stdout
+import glob
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import timeit
+
+
+def read_jobs(job_file):
+    '''
+    Read in jobs from job file
+
+    :param job_file: Job file, JSON or YAML (`.yml` or `.yaml`).
+    :type job_file: str
+
+    :return: Jobs, one for each configuration, with defaults filled in, and \
+             number of processes asked for in the job file (None if not).
+    :rtype: tuple
+    '''
+    if os.path.splitext(job_file)[1] in [".yml", ".yaml"]:
+        try:
+            import yaml
+        except ImportError:
+            print("PyYAML is needed for YAML job files!")
+            print("Please install it, or use a JSON job file instead.")
+            sys.exit()
+        with open(job_file, "r") as f_in:
+            job_info = yaml.safe_load(f_in)
+    else:
+        with open(job_file, "r") as f_in:
+            job_info = json.load(f_in)
+
+    job_dir = os.path.dirname(os.path.abspath(job_file))
+    defaults = job_info.get("defaults", {})
+    jobs = []
+    for item in job_info.get("jobs", []):
+        job = dict(defaults)
+        job.update(item)
+        if "config" not in job:
+            print("Job without RMC6F configuration in " + job_file + "!")
+            sys.exit()
+        pattern = os.path.join(job_dir, job["config"])
+        configs = sorted(glob.glob(pattern))
+        if len(configs) == 0:
+            print("No RMC6F configuration found for " + pattern + "!")
+            sys.exit()
+        for config in configs:
+            job_temp = dict(job)
+            job_temp["config"] = config
+            jobs.append(job_temp)
+
+    return jobs, job_info.get("processes")
+
+
+def run_job(job):
+    '''
+    Divide an RMC6F configuration into shells, as given by a job
+
+    :param job: Job, see the module doc for the entries.
+    :type job: dict
+
+    :return: Summary of the job - configuration, type, scheme, number of \
+             shells, number of atoms in each shell, radius (nano), output and \
+             time taken.
+    :rtype: dict
+    '''
+    start = timeit.default_timer()
+
+    rmc6f_config = RMC6FReader(job["config"], columnar=True)
+    summary = {"config": job["config"], "type": job.get("type", "nano"),
+               "div_scheme": job["div_scheme"], "radius": None,
+               "output": None}
+
+    if summary["type"] == "nano":
+        shell_maker = NanoStuff()
+        shell_maker.cent_rad_config(rmc6f_config,
+                                    percentile=job.get("percentile"),
+                                    periodic=job.get("periodic", False))
+        shells = shell_maker.divide_shells(
+            rmc6f_config, job["div_scheme"],
+            shell_thickness=job.get("shell_thickness"),
+            focus=job.get("focus"),
+            min_num_in_shell=job.get("min_num_in_shell"),
+            surf_layer_thkness=job.get("surf_layer_thkness"))
+        summary["radius"] = shell_maker.NPRadius
+    elif summary["type"] == "bulk":
+        if "seed" in job:
+            random.seed(job["seed"])
+        shell_maker = BulkStuff()
+        shells = shell_maker.divide_shells(
+            rmc6f_config, job["div_scheme"], job.get("num_shells"),
+            shell_thickness=job.get("shell_thickness"),
+            focus=job.get("focus"),
+            min_num_in_shell=job.get("min_num_in_shell"))
+    else:
+        print("Job type should be 'nano' or 'bulk'!")
+        sys.exit()
+
+    if job.get("write", True):
+        summary["output"] = shell_maker.write_shells(
+            rmc6f_config, shells, compact=job.get("compact", False))
+
+    summary["num_shells"] = shells["num_shells"]
+    summary["num_atoms"] = [len(x) for x in shells["shell_atoms"]]
+    summary["cent_pos"] = list(shell_maker.centPos)
+    summary["time"] = timeit.default_timer() - start
+
+    return summary
+
+
+def _run_job_quiet(job):
+    '''
+    Run a job in worker process, with screen output kept back
+
+    :param job: Job, see the module doc for the entries.
+    :type job: dict
+
+    :return: Summary of the job (see `run_job`), with `status` being `done`, \
+             or the last lines of screen output (or the error) if failed.
+    :rtype: dict
+    '''
+    screen = io.StringIO()
+    try:
+        with redirect_stdout(screen):
+            summary = run_job(job)
+        summary["status"] = "done"
+    except (SystemExit, Exception) as err:
+        lines = [x for x in screen.getvalue().splitlines() if x.strip()]
+        summary = {"config": job["config"], "type": job.get("type", "nano"),
+                   "div_scheme": job.get("div_scheme"), "num_shells": 0,
+                   "num_atoms": [], "radius": None, "output": None,
+                   "cent_pos": None,
+                   "time": 0.0}
+        if isinstance(err, SystemExit) and lines:
+            summary["status"] = "failed - " + " ".join(lines[-3:])
+        else:
+            summary["status"] = "failed - " + repr(err)
+
+    return summary
+
+
+def summary_table(summaries):
+    '''
+    Summary table of jobs
+
+    :param summaries: Summary of each job, as returned by `_run_job_quiet`.
+    :type summaries: list
+
+    :return: Lines of the table.
+    :rtype: list
+    '''
+    lines = []
+    lines.append("{0:>5s}  {1:<5s}{2:>7s}{3:>7s}{4:>10s}{5:>10s}{6:>10s}"
+                 "{7:>10s}  {8:s}".format("Job", "Type", "Scheme", "Shells",
+                                          "Radius", "Min_N", "Max_N",
+                                          "Time", "Config / Output / Status"))
+    for i, item in enumerate(summaries):
+        num_atoms = item["num_atoms"] if item["num_atoms"] else [0]
+        radius = "-" if item["radius"] is None else \
+            "{0:.2F}".format(item["radius"])
+        lines.append("{0:5d}  {1:<5s}{2:>7s}{3:7d}{4:>10s}{5:10d}{6:10d}"
+                     "{7:10.3F}  {8:s}".format(i + 1, item["type"],
+                                               str(item["div_scheme"]),
+                                               item["num_shells"], radius,
+                                               min(num_atoms), max(num_atoms),
+                                               item["time"], item["config"]))
+        if item["output"] is not None:
+            lines.append(" " * 68 + item["output"])
+        if item["status"] != "done":
+            lines.append(" " * 68 + item["status"])
+
+    return lines
+
+
+def run_batch(job_file, processes=None):
+    '''
+    Run all jobs in a job file over a pool of processes
+
+    :param job_file: Job file, see the module doc.
+    :type job_file: str
+    :param processes: Number of worker processes - taken from the job file, \
+                      or number of CPUs, if None.
+    :type processes: int
+
+    :return: Summary of each job, in the order of jobs.
+    :rtype: list
+
+    Output:
+        JOB_FILE_summary.txt -- Summary table of all jobs.
+    '''
+    start = timeit.default_timer()
+
+    jobs, processes_file = read_jobs(job_file)
+    if processes is None:
+        processes = processes_file
+
+    print("\nRunning {0:d} shell generation jobs...".format(len(jobs)))
+
+    if processes == 1:
+        summaries = [_run_job_quiet(x) for x in jobs]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            summaries = pool.map(_run_job_quiet, jobs, chunksize=1)
+
+    lines = summary_table(summaries)
+    summary_file = os.path.splitext(job_file)[0] + "_summary.txt"
+    with open(summary_file, "w") as f_out:
+        f_out.write("\n".join(lines) + "\n")
+
+    stop = timeit.default_timer()
+
+    print("")
+    for line in lines:
+        print(line)
+    print("\n--------------------------------------------")
+    num_failed = len([x for x in summaries if x["status"] != "done"])
+    print("Jobs done: {0:d}, failed: {1:d}".format(len(jobs) - num_failed,
+                                                  num_failed))
+    print("Summary table output to: " + summary_file)
+    print("Time taken:{0:11.3F} s".format(stop - start))
+    print("--------------------------------------------")
+
+    return summaries
+
+
+def main():
+
+    if len(sys.argv) < 2:
+        print("Job file needs to be provided.")
+        print("Usage: python -m rmc_tools.batch_stuff JOB_FILE [-p NUM_PROCESSES]")
+        sys.exit()
+
+    processes = None
+    if "-p" in sys.argv:
+        processes = int(sys.argv[sys.argv.index("-p") + 1])
+
+    run_batch(sys.argv[1], processes=processes)
+
+
+if __name__ == '__main__':
+    main()
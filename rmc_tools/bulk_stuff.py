@@ -8,11 +8,138 @@ This modules holds stuff relevant to processing bulk RMC6F configurations.
 #
 # -*- coding: utf-8 -*-
 #
-from rmc_tools.rmc6f_stuff import dist_calc_coord
+from rmc_tools.rmc6f_stuff import dist_calc_coord, RMC6FWriter, DistCalc, \
+    DIST_BLOCK, config_stem
+from rmc_tools import shell_stuff
+import multiprocessing
+import numpy as np
 import os
+import sys
 import timeit
 import datetime
 
+# Coordinates and shell setup of current worker process, for sampling shells
+# around many centers.
+_sample = {}
+
+
+def _init_sample(coords_int, vectors, ele_code, num_types, edges):
+    '''
+    Set up worker process for sampling shells
+
+    :param coords_int: RMC internal coordinates of atoms.
+    :type coords_int: numpy.array, (N, 3)
+    :param vectors: Lattice vectors - x, y and z, respectively.
+    :type vectors: 2D list
+    :param ele_code: Element code of atoms.
+    :type ele_code: numpy.array, (N,)
+    :param num_types: Number of element codes.
+    :type num_types: int
+    :param edges: Shell limits, (shells + 1,).
+    :type edges: numpy.array
+    '''
+    _sample["coords_int"] = coords_int
+    _sample["dist_calc"] = DistCalc(vectors)
+    _sample["ele_code"] = np.asarray(ele_code, dtype=np.int64)
+    _sample["num_types"] = num_types
+    _sample["edges"] = edges
+
+
+def _sample_cents(cents_int):
+    '''
+    Count atoms of each element in each shell, for a batch of centers
+
+    :param cents_int: RMC internal coordinates of centers.
+    :type cents_int: numpy.array, (K, 3)
+
+    :return: Number of atoms of each element in each shell around each center.
+    :rtype: numpy.array, (K, shells, elements)
+    '''
+    coords_int = _sample["coords_int"]
+    edges = _sample["edges"]
+    num_shells = len(edges) - 1
+    num_types = _sample["num_types"]
+
+    counts = np.zeros([len(cents_int), num_shells, num_types], dtype=np.int64)
+    block = max(DIST_BLOCK // max(len(coords_int), 1), 1)
+    for i in range(0, len(cents_int), block):
+        dist = _sample["dist_calc"].many_to_many(cents_int[i:i + block],
+                                                 coords_int)
+        shell_id = np.digitize(dist, edges) - 1
+        keep = (shell_id >= 0) & (shell_id < num_shells)
+        cent_id, atom_id = np.nonzero(keep)
+        flat = (cent_id * num_shells + shell_id[keep]) * num_types + \
+            _sample["ele_code"][atom_id]
+        counts[i:i + block] = np.bincount(
+            flat, minlength=len(dist) * num_shells * num_types).reshape(
+                [len(dist), num_shells, num_types])
+
+    return counts
+
+
+def sample_shells(rmc6f_config, cents, shell_thickness, num_shells,
+                  processes=None):
+    '''
+    Statistics of shells of equal thickness around many centers
+
+    :param rmc6f_config: RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param cents: Fractional coordinates of centers.
+    :type cents: numpy.array, (K, 3)
+    :param shell_thickness: Shell thickness.
+    :type shell_thickness: float
+    :param num_shells: Number of shells.
+    :type num_shells: int
+    :param processes: Number of worker processes, number of CPUs if None.
+    :type processes: int
+
+    :return: Number of atoms of each element (`counts`, (K, shells, \
+             elements)), and mean and standard error over centers of number \
+             of atoms, number density and fraction of each element in each \
+             shell, with shell limits (`edges`).
+    :rtype: dict
+    '''
+    if len(cents) < 1:
+        print("\nAt least one center is needed for sampling shells!")
+        sys.exit()
+
+    edges = np.array([i * shell_thickness for i in range(num_shells + 1)])
+    cents_int = 2.0 * np.asarray(cents, dtype=np.float64) - 1.0
+    init_args = (2.0 * np.asarray(rmc6f_config.atomsCoordArr) - 1.0,
+                 rmc6f_config.vectors, rmc6f_config.atomsEleCode,
+                 len(rmc6f_config.atomsEleTypes), edges)
+
+    if processes == 1:
+        _init_sample(*init_args)
+        counts = _sample_cents(cents_int)
+    else:
+        num_chunks = min(len(cents_int), (processes or os.cpu_count()) * 4)
+        with multiprocessing.Pool(processes, initializer=_init_sample,
+                                  initargs=init_args) as pool:
+            counts = np.concatenate(
+                pool.map(_sample_cents,
+                         np.array_split(cents_int, num_chunks)))
+
+    volumes = 4.0 / 3.0 * np.pi * (edges[1:] ** 3 - edges[:-1] ** 3)
+    total = counts.sum(axis=2)
+    density = total / volumes
+    fraction = np.zeros(counts.shape)
+    np.divide(counts, total[..., None], out=fraction,
+              where=total[..., None] > 0)
+
+    num_cents = len(cents_int)
+    result = {"edges": edges, "counts": counts}
+    for name, item in [("total", total), ("density", density),
+                       ("fraction", fraction)]:
+        result[name + "_mean"] = item.mean(axis=0)
+        if num_cents > 1:
+            result[name + "_sem"] = item.std(axis=0, ddof=1) / \
+                np.sqrt(num_cents)
+        else:
+            result[name + "_sem"] = np.zeros(item.shape[1:])
+
+    return result
+
 
 class BulkStuff(object):
     """RMC6F bulk configuration processing class.
@@ -30,7 +157,7 @@ class BulkStuff(object):
         self.shellThickness = 0.0
 
     # Method for generating shells from a random center.
-    def bulk_to_shells(self, rmc6f_config):
+    def bulk_to_shells(self, rmc6f_config, compact=False):
         """Method for grabbing shells from bulk RMC6F configuration.
 
         Provided bulk RMC6F configuration, this method can extract shells from it. \
@@ -40,59 +167,120 @@ class BulkStuff(object):
         Arguments:
             rmc6f_config {Object} -- Instance of `RMC6FReader` class
 
+        Keyword Arguments:
+            compact {bool} -- Whether to save all shells in one `.npz` file (see \
+            `shell_stuff.save_shells`) instead of an RMC6F file for each shell \
+            (default: {False})
+
         Output:
             shell_X.rmc6f -- RMC6F configuration for generated shells.
 
             np_shell_gen.log -- Log information about shells generation.
+
+            With `compact=True`, X_np_shells_N.npz and X_np_shells_N.log instead.
         """
         print("\n****************************************************")
-        print("1->by thickness, 2->by number of atoms")
+        print("1->by thickness, 2->by number of atoms, 3->by exact number of atoms")
         print("****************************************************")
         div_scheme = int(input("Please select a way to divide particle into shells: "))
 
-        while div_scheme != 1 and div_scheme != 2:
-            print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-            print("!!!!'1' and '2' are only accepted inputs!!!!")
-            print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+        while div_scheme not in [1, 2, 3]:
+            print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+            print("!!!!'1', '2' and '3' are only accepted inputs!!!!")
+            print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
 
             print("\n****************************************************")
-            print("1->by thickness, 2->by number of atoms")
+            print("1->by thickness, 2->by number of atoms, 3->by exact number of atoms")
             print("****************************************************")
             div_scheme = int(input("Please select a way to divide particle into shells: "))
 
+        shell_thickness = None
+        focus = None
+        min_num_in_shell = None
         if div_scheme == 1:
-
-            self.shellThickness = float(input("\nPlease input shell thickness for the analysis: "))
+            shell_thickness = float(input("\nPlease input shell thickness for the analysis: "))
+            num_shells = int(input("\nPlease input number of shells to configure: "))
+        else:
             num_shells = int(input("\nPlease input number of shells to configure: "))
 
-            start = timeit.default_timer()
+            print("\n*************************************************")
+            for i in range(rmc6f_config.numTypeAtom):
+                print(str(i+1) + "->" + rmc6f_config.atomTypes[i] + " ", end='', flush=True)
+            print("\n*************************************************")
+            at_to_focus = int(input("Please input an atom type to focus on: "))
+            focus = rmc6f_config.atomTypes[at_to_focus - 1]
 
-            print("\nDividing particle to various shells...")
+            print("\n------------------------------------------")
+            print("Total number of atoms selected: {0:10d}".
+                  format(rmc6f_config.numAtomEachType[at_to_focus - 1]))
+            print("------------------------------------------")
 
-            atoms_include = [i * 0 for i in range(rmc6f_config.numAtoms)]
-            atoms_to_check = [i for i, x in enumerate(atoms_include) if x == 0]
+            min_num_in_shell = int(input("Please input minimum number of " +
+                                         focus + " atoms in shell: "))
 
-            shell_atoms = []
+        shells = self.divide_shells(rmc6f_config, div_scheme, num_shells,
+                                    shell_thickness=shell_thickness, focus=focus,
+                                    min_num_in_shell=min_num_in_shell)
+        self.write_shells(rmc6f_config, shells, compact=compact)
+
+    def divide_shells(self, rmc6f_config, div_scheme, num_shells, shell_thickness=None,
+                      focus=None, min_num_in_shell=None):
+        """
+        Method for dividing bulk RMC6F configuration into shells, with parameters as arguments.
+
+        Non-interactive version of `bulk_to_shells`, taking the parameters otherwise \
+        asked for on screen as arguments and returning the shells instead of writing \
+        them out (see `write_shells`).
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+            div_scheme {int} -- 1->by thickness, 2->by number of atoms, 3->by exact \
+            number of atoms
+            num_shells {int} -- Number of shells to configure
+
+        Keyword Arguments:
+            shell_thickness {float} -- Shell thickness, for scheme 1 (default: {None})
+            focus {str} -- Element to focus on, for schemes 2 and 3 (default: {None})
+            min_num_in_shell {int} -- Minimum number of atoms of the focused element \
+            in shell, for schemes 2 and 3 (default: {None})
+
+        Returns:
+            dict -- Shells, with index of atoms in each shell (`shell_atoms`), shell \
+            label of each atom (`shell_id`, -1 for atoms in no shell), lower and upper \
+            limit of each shell (`low_lim` and `hi_lim`), number of shells and the \
+            parameters used
+        """
+        if div_scheme not in [1, 2, 3]:
+            print("Shell division scheme should be 1, 2 or 3!")
+            sys.exit()
+        if div_scheme == 1 and shell_thickness is None:
+            print("Shell thickness needs to be provided for dividing by thickness!")
+            sys.exit()
+        if div_scheme != 1 and (focus not in rmc6f_config.atomTypes or
+                                min_num_in_shell is None):
+            print("Element to focus on (one of " + " ".join(rmc6f_config.atomTypes) + ") and")
+            print("minimum number of its atoms in shell need to be provided for dividing")
+            print("by number of atoms!")
+            sys.exit()
+
+        if div_scheme == 1:
+
+            self.shellThickness = shell_thickness
+
+            start = timeit.default_timer()
+
+            print("\nDividing particle to various shells...")
 
             print("\nShells to configure: ", end='', flush=True)
             for i in range(num_shells + 1):
                 print("*", end='', flush=True)
 
-            print("\nShells configured:   ", end='', flush=True)
-            for i in range(num_shells):
-                shell_atoms.append([])
-                low_lim = i * self.shellThickness
-                hi_lim = (i + 1) * self.shellThickness
-                for ii in atoms_to_check:
-                    dist_temp = dist_calc_coord(self.centPosInt, rmc6f_config.atomsCoordInt[ii],
-                                                rmc6f_config.vectors)
-                    if low_lim <= dist_temp < hi_lim:
-                        shell_atoms[i].append(ii)
-                        atoms_include[ii] = 1
-                atoms_to_check = [i for i, x in enumerate(atoms_include) if x == 0]
-                print(".", end='', flush=True)
+            dist = shell_stuff.cent_dist(rmc6f_config, self.centPosInt)
+            shell_atoms = shell_stuff.thickness_shells(dist, self.shellThickness,
+                                                       num_shells)
+
+            print("\nShells configured:   " + "." * num_shells, end='', flush=True)
 
-            shell_atoms.append(atoms_to_check)
             num_shells += 1
             print(".")
 
@@ -104,22 +292,6 @@ class BulkStuff(object):
             print("--------------------------------------------")
         elif div_scheme == 2:
 
-            num_shells = int(input("\nPlease input number of shells to configure: "))
-
-            print("\n*************************************************")
-            for i in range(rmc6f_config.numTypeAtom):
-                print(str(i+1) + "->" + rmc6f_config.atomTypes[i] + " ", end='', flush=True)
-            print("\n*************************************************")
-            at_to_focus = int(input("Please input an atom type to focus on: "))
-
-            print("\n------------------------------------------")
-            print("Total number of atoms selected: {0:10d}".
-                  format(rmc6f_config.numAtomEachType[at_to_focus - 1]))
-            print("------------------------------------------")
-
-            min_num_in_shell = int(input("Please input minimum number of " +
-                                         rmc6f_config.atomTypes[at_to_focus - 1] + " atoms in shell: "))
-
             start = timeit.default_timer()
 
             print("\nDividing particle to various shells...")
@@ -154,7 +326,7 @@ class BulkStuff(object):
                     space_left = min_num_in_shell - natoms_focus
                     to_eat = 0
                     for item in list_temp:
-                        if rmc6f_config.atomsEle[item] == rmc6f_config.atomTypes[at_to_focus - 1]:
+                        if rmc6f_config.atomsEle[item] == focus:
                             to_eat += 1
                     if space_left < int(0.1 * float(min_num_in_shell)) and \
                        to_eat > int(0.15 * float(min_num_in_shell)):
@@ -163,7 +335,7 @@ class BulkStuff(object):
                         shell_atoms[shell_processed].extend(list_temp)
                         for item in list_temp:
                             atoms_include[item] = 1
-                            if rmc6f_config.atomsEle[item] == rmc6f_config.atomTypes[at_to_focus - 1]:
+                            if rmc6f_config.atomsEle[item] == focus:
                                 natoms_focus += 1
                     else:
                         hi_lim -= check_step
@@ -189,60 +361,107 @@ class BulkStuff(object):
             print("Time taken:{0:11.3F} s".format(stop - start))
             print("--------------------------------------------")
 
-        dir_exist = True
-        i = 1
-        while dir_exist:
-            dir_check = rmc6f_config.fileName.split(".")[0] + "_np_shells_" + str(i)
-            if not os.path.exists(dir_check):
-                dir_exist = False
-                dir_use = dir_check
-            i += 1
+        elif div_scheme == 3:
+
+            start = timeit.default_timer()
+
+            print("\nDividing particle to various shells...")
+
+            print("\nShells to configure: ", end='', flush=True)
+            for i in range(num_shells):
+                print("*", end='', flush=True)
+
+            code_focus = rmc6f_config.atomsEleTypes.index(focus)
+            dist = shell_stuff.cent_dist(rmc6f_config, self.centPosInt)
+            pop_shells = shell_stuff.PopulationShells(dist, np.asarray(rmc6f_config.atomsEleCode) == code_focus)
+
+            low_lim_out = []
+            hi_lim_out = []
+            shell_atoms = []
+            print("\nShells configured:   ", end='', flush=True)
+            for i in range(num_shells):
+                atoms_temp, low_lim, hi_lim = pop_shells.next_shell(min_num_in_shell)
+                shell_atoms.append(atoms_temp)
+                low_lim_out.append(low_lim)
+                hi_lim_out.append(hi_lim)
+                print(".", end='', flush=True)
+
+            stop = timeit.default_timer()
 
-        os.mkdir(dir_use)
+            print("\n--------------------------------------------")
+            print("Particle successfully divided to " + str(num_shells) + " shells.")
+            print("Time taken:{0:11.3F} s".format(stop - start))
+            print("--------------------------------------------")
 
+        shell_atoms = shell_atoms[:num_shells]
+        shell_id = np.full(rmc6f_config.numAtoms, -1, dtype=np.int32)
         for i in range(num_shells):
-            atoms_ele = []
-            atoms_line = []
-            line_num = 0
-            for item in shell_atoms[i]:
-                line_num += 1
-                atoms_ele.append(rmc6f_config.atomsEle[item])
-                line_temp = rmc6f_config.atomsLine[item]
-                line_new = str(line_num) + " " + " ".join(line_temp.split()[1:]) + "\n"
-                atoms_line.append(line_new)
-
-            atoms_ele_uniq = sorted(set(atoms_ele), key=atoms_ele.index)
-
-            num_each_type = []
-            for j in range(len(atoms_ele_uniq)):
-                num_each_type.append(str(atoms_ele.count(atoms_ele_uniq[j])))
-
-            num_rho_new = rmc6f_config.initNumRho * \
-                float(len(shell_atoms[i])) / \
-                float(rmc6f_config.numAtoms)
-
-            header = rmc6f_config.header.copy()
-            for j in range(len(header)):
-                if "Number of atoms:" in header[j]:
-                    header[j] = "Number of atoms: " + str(len(shell_atoms[i])) + "\n"
-                if "Atom types present:" in header[j]:
-                    header[j] = "Atom types present: " + " ".join(atoms_ele_uniq) + "\n"
-                if "Number of types of atoms:" in header[j]:
-                    header[j] = "Number of types of atoms: " + str(len(atoms_ele_uniq)) + "\n"
-                if "Number of each atom type:" in header[j]:
-                    header[j] = "Number of each atom type: " + " ".join(num_each_type) + "\n"
-                if "Number density (Ang^-3):" in header[j]:
-                    header[j] = "Number density (Ang^-3):" + " {0:.6f}".format(num_rho_new) + "\n"
-
-            file_out = open(os.path.join(dir_use, "shell_" + str(i)) + ".rmc6f", "w")
-            for item in header:
-                file_out.write(item)
-            for item in atoms_line:
-                file_out.write(item)
-            file_out.close()
+            shell_id[np.asarray(shell_atoms[i], dtype=np.int64)] = i
+        if div_scheme == 1:
+            low_lim_out = [i * self.shellThickness for i in range(num_shells)]
+            hi_lim_out = [(i + 1) * self.shellThickness for i in range(num_shells - 1)]
+            hi_lim_out.append(float("inf"))
+
+        shells = {"div_scheme": div_scheme,
+                  "num_shells": num_shells,
+                  "shell_atoms": shell_atoms,
+                  "shell_id": shell_id,
+                  "low_lim": low_lim_out,
+                  "hi_lim": hi_lim_out,
+                  "shell_thickness": shell_thickness,
+                  "focus": focus,
+                  "min_num_in_shell": min_num_in_shell}
+
+        return shells
+
+    def write_shells(self, rmc6f_config, shells, compact=False):
+        """
+        Method for writing out shells, as returned by `divide_shells`.
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+            shells {dict} -- Shells, as returned by `divide_shells`
+
+        Keyword Arguments:
+            compact {bool} -- Whether to save all shells in one `.npz` file (see \
+            `shell_stuff.save_shells`) instead of an RMC6F file for each shell \
+            (default: {False})
+
+        Output:
+            shell_X.rmc6f -- RMC6F configuration for generated shells.
+
+            np_shell_gen.log -- Log information about shells generation.
+
+            With `compact=True`, X_np_shells_N.npz and X_np_shells_N.log instead.
+
+        Returns:
+            str -- Output directory, or `.npz` file with `compact=True`
+        """
+        div_scheme = shells["div_scheme"]
+        num_shells = shells["num_shells"]
+        shell_atoms = shells["shell_atoms"]
+        low_lim_out = shells["low_lim"]
+        hi_lim_out = shells["hi_lim"]
+        focus = shells["focus"]
+        min_num_in_shell = shells["min_num_in_shell"]
+
+        prefix = config_stem(rmc6f_config.fileName) + "_np_shells_"
+        if compact:
+            dir_use = shell_stuff.claim_name(prefix, ".npz", also=[""])
+            shell_stuff.save_shells(dir_use + ".npz", rmc6f_config, shell_atoms,
+                                    low_lim_out, hi_lim_out, self.centPos)
+            log_name = dir_use + ".log"
+        else:
+            dir_use = shell_stuff.claim_name(prefix, directory=True, also=[".npz"])
+
+            rmc6f_writer = RMC6FWriter(rmc6f_config)
+            for i in range(num_shells):
+                rmc6f_writer.write(os.path.join(dir_use, "shell_" + str(i)) + ".rmc6f",
+                                   index=shell_atoms[i])
+            log_name = os.path.join(dir_use, "np_shell_gen.log")
 
         now = datetime.datetime.now()
-        log_file = open(os.path.join(dir_use, "np_shell_gen.log"), "w")
+        log_file = open(log_name, "w")
         log_file.write("==================================\n")
         log_file.write("Log file for np_to_shells routine.\n")
         log_file.write("==================================\n")
@@ -250,15 +469,18 @@ class BulkStuff(object):
         if div_scheme == 1:
             log_file.write("================================================\n")
             log_file.write("Particle divided into shells by equal thickness.\n")
-            log_file.write("Shell thickness used: {0:10.1F}\n".format(self.shellThickness))
+            log_file.write("Shell thickness used: {0:10.1F}\n".format(shells["shell_thickness"]))
             log_file.write("Number of shells generated: {0:10d}\n".format(num_shells))
             log_file.write("================================================")
         else:
             log_file.write("================================================================\n")
-            log_file.write("Particle divided into shells by equal (roughly) number of atoms.\n")
-            log_file.write("Atom type focused: {0:2s}\n".format(rmc6f_config.atomTypes[at_to_focus - 1]))
+            if div_scheme == 2:
+                log_file.write("Particle divided into shells by equal (roughly) number of atoms.\n")
+            else:
+                log_file.write("Particle divided into shells by equal number of atoms, exactly.\n")
+            log_file.write("Atom type focused: {0:2s}\n".format(focus))
             log_file.write("Minimum number of {0:2s} atom in each shell: {1:10d}\n".
-                           format(rmc6f_config.atomTypes[at_to_focus - 1], min_num_in_shell))
+                           format(focus, min_num_in_shell))
             log_file.write("Number of shells generated: {0:10d}\n".format(num_shells))
             log_file.write("================================================================\n")
             log_file.write("Lower and upper limit of each shell:\n")
@@ -269,8 +491,128 @@ class BulkStuff(object):
             log_file.write("================================================================")
         log_file.close()
 
+        if compact:
+            print("\n--------------------------------------------")
+            print("Shells output to file:")
+            print("--------------------------------------------")
+            print(dir_use + ".npz")
+            print("--------------------------------------------")
+        else:
+            print("\n--------------------------------------------")
+            print("RMC6F configs of shells output to directory:")
+            print("--------------------------------------------")
+            print(dir_use)
+            print("--------------------------------------------")
+
+        if compact:
+            return dir_use + ".npz"
+
+        return dir_use
+
+    # Method for sampling shells around many random centers.
+    def bulk_sample_shells(self, rmc6f_config, processes=None):
+        """Method for shell statistics over many random centers in bulk RMC6F configuration.
+
+        Instead of writing out shells around a single random center, this method \
+        places a number of random centers (with a seed, for reproducibility) in the \
+        bulk configuration, divides atoms around each of them into shells of equal \
+        thickness, in batches spread over worker processes, and reports the mean and \
+        standard error over centers of the number of atoms, number density and \
+        fraction of each element in each shell. Shells are limited to half of the \
+        box width, beyond which they are truncated by the minimum image convention.
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+
+        Keyword Arguments:
+            processes {int} -- Number of worker processes, number of CPUs if `None` \
+            (default: {None})
+
+        Output:
+            X_shell_sample_N.log -- Statistics of shells.
+
+        Returns:
+            dict -- Output of `sample_shells`
+        """
+        self.shellThickness = float(input("\nPlease input shell thickness for the analysis: "))
+        num_shells = int(input("\nPlease input number of shells to configure: "))
+        num_cents = int(input("\nPlease input number of random centers: "))
+        seed = int(input("\nPlease input random seed: "))
+
+        start = timeit.default_timer()
+
+        print("\nSampling shells around random centers...")
+
+        vec = np.asarray(rmc6f_config.vectors, dtype=np.float64)
+        volume = abs(np.linalg.det(vec))
+        width = min(volume / np.linalg.norm(np.cross(vec[(i + 1) % 3], vec[(i + 2) % 3]))
+                    for i in range(3))
+        # Distances are minimum image, i.e. never beyond half of the box width, so
+        # shells reaching further out are truncated, with too few atoms.
+        max_shells = int(width / (2.0 * self.shellThickness))
+        if max_shells < 1:
+            print("\nShell thickness goes beyond half of the box width ({0:.2F})!".format(width))
+            sys.exit()
+        if num_shells > max_shells:
+            print("\nWarning: outer shells go beyond half of the box width ({0:.2F}),".format(width))
+            print("where they are truncated and counts and densities are biased low.")
+            print("Number of shells limited to {0:d}.".format(max_shells))
+            num_shells = max_shells
+
+        cents = np.random.default_rng(seed).random([num_cents, 3])
+        result = sample_shells(rmc6f_config, cents, self.shellThickness, num_shells,
+                               processes=processes)
+
+        stop = timeit.default_timer()
+
+        print("\n--------------------------------------------")
+        print("Shells sampled around " + str(num_cents) + " centers.")
+        print("Time taken:{0:11.3F} s".format(stop - start))
+        print("--------------------------------------------")
+
+        file_use = shell_stuff.claim_name(config_stem(rmc6f_config.fileName) + "_shell_sample_",
+                                          ".log") + ".log"
+
+        ele_types = rmc6f_config.atomsEleTypes
+        edges = result["edges"]
+        now = datetime.datetime.now()
+        log_file = open(file_use, "w")
+        log_file.write("=========================================\n")
+        log_file.write("Log file for bulk_sample_shells routine.\n")
+        log_file.write("=========================================\n")
+        log_file.write("Time stamp: " + str(now)[:19] + "\n")
+        log_file.write("================================================\n")
+        log_file.write("Shells of equal thickness around random centers.\n")
+        log_file.write("Shell thickness used: {0:10.1F}\n".format(self.shellThickness))
+        log_file.write("Number of shells: {0:10d}\n".format(num_shells))
+        log_file.write("Number of centers: {0:10d}\n".format(num_cents))
+        log_file.write("Random seed: {0:10d}\n".format(seed))
+        log_file.write("================================================\n")
+        log_file.write("Mean and standard error over centers of number\n")
+        log_file.write("of atoms, number density (Ang^-3) and fraction\n")
+        log_file.write("of each element in each shell:\n")
+        log_file.write("================================================\n")
+        log_file.write("{0:>10s}{1:>10s}{2:>12s}{3:>10s}{4:>12s}{5:>12s}".
+                       format("R_min", "R_max", "N", "N_err", "Rho", "Rho_err"))
+        for item in ele_types:
+            log_file.write("{0:>10s}{1:>10s}".format(item, item + "_err"))
+        log_file.write("\n")
+        for i in range(num_shells):
+            log_file.write("{0:10.2F}{1:10.2F}{2:12.2F}{3:10.2F}{4:12.6F}{5:12.6F}".
+                           format(edges[i], edges[i + 1],
+                                  result["total_mean"][i], result["total_sem"][i],
+                                  result["density_mean"][i], result["density_sem"][i]))
+            for j in range(len(ele_types)):
+                log_file.write("{0:10.4F}{1:10.4F}".format(result["fraction_mean"][i][j],
+                                                          result["fraction_sem"][i][j]))
+            log_file.write("\n")
+        log_file.write("================================================")
+        log_file.close()
+
         print("\n--------------------------------------------")
-        print("RMC6F configs of shells output to directory:")
+        print("Statistics of shells output to file:")
         print("--------------------------------------------")
-        print(dir_use)
+        print(file_use)
         print("--------------------------------------------")
+
+        return result
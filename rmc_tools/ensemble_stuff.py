@@ -0,0 +1,191 @@
+"""
+Ensemble of RMC6F configurations
+================================
+
+This modules holds stuff relevant to ensembles of RMC6F configurations, e.g.
+from independent RMC fits of the same data, loaded and analysed in parallel.
+
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader
+from rmc_tools.traj_stuff import RMC6FTrajectory
+import glob
+import multiprocessing
+import numpy as np
+import os
+import sys
+import timeit
+
+# Ensemble, analysis function and original stdout of current worker process.
+_worker = {}
+
+
+def _init_worker(ensemble, func, quiet):
+    '''
+    Set up worker process of the pool
+
+    :param ensemble: Ensemble, pickled without coordinates - those are memory
+                     mapped again from the file of the ensemble.
+    :type ensemble: RMC6FEnsemble
+    :param func: Analysis function to map over frames, or None for loading.
+    :type func: function
+    :param quiet: Whether to suppress screen output of the worker.
+    :type quiet: bool
+    '''
+    _worker["ensemble"] = ensemble
+    _worker["func"] = func
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+
+
+def _load_frame(frame_i):
+    '''
+    Read in a frame, in worker process, straight into the shared coordinates
+
+    :param frame_i: Index of frame.
+    :type frame_i: int
+
+    :return: Index of frame and whether it shares the ensemble topology.
+    :rtype: tuple
+    '''
+    ensemble = _worker["ensemble"]
+    config = RMC6FReader(ensemble.fileNames[frame_i], cache=ensemble.cache,
+                         lazy=True)
+    if config.numAtoms != ensemble.numAtoms:
+        return frame_i, False
+    config._load_atoms()
+    if not ensemble._same_topology(config):
+        return frame_i, False
+    ensemble.atomsCoordArr[frame_i] = config.atomsCoordArr
+    ensemble.atomsCoordArr.flush()
+
+    return frame_i, True
+
+
+def _map_frame(frame_i):
+    '''
+    Run the analysis function on a frame, in worker process
+
+    :param frame_i: Index of frame.
+    :type frame_i: int
+
+    :return: Result of the analysis function.
+    :rtype: object
+    '''
+    ensemble = _worker["ensemble"]
+
+    return _worker["func"](ensemble.frame(frame_i))
+
+
+class RMC6FEnsemble(RMC6FTrajectory):
+    """Ensemble of RMC6F configurations
+
+    Given a glob pattern (or a list) of RMC6F configuration files as input, \
+    when declaring instance to this class, it will read in all the \
+    configurations with a pool of processes. As for `RMC6FTrajectory`, \
+    which this class is built upon, all configurations should share the same \
+    topology, and coordinates of all of them are kept in one memory mapped \
+    array. Worker processes write coordinates straight into the memory \
+    mapped file, so coordinates are never pickled between processes.
+
+    Analyses then run over the ensemble in parallel with `self.map(func)`, \
+    where `func` takes a configuration (instance of `RMC6FReader`) and \
+    should be defined at module level, so that it can be sent to workers.
+
+    Arguments:
+        file_names {str or list} -- Glob pattern or full path of RMC6F files
+
+    Keyword Arguments:
+        processes {int} -- Number of worker processes, number of CPUs if \
+        `None` (default: {None})
+        traj_file {str} -- `.npy` file for the coordinates, see \
+        `RMC6FTrajectory` (default: {None})
+        cache {bool} -- Whether to use the binary sidecar cache of \
+        `RMC6FReader` for each configuration (default: {False})
+    """
+
+    def __init__(self, file_names, processes=None, traj_file=None,
+                 cache=False):
+
+        if isinstance(file_names, str):
+            file_names = sorted(glob.glob(file_names))
+
+        RMC6FTrajectory.__init__(self, file_names, traj_file=traj_file,
+                                 cache=cache)
+        self.processes = processes
+
+        self.load_all()
+
+    def _pool(self, func=None, quiet=True):
+        """
+        Pool of worker processes, each holding a copy of the ensemble.
+
+        Keyword Arguments:
+            func {function} -- Analysis function for `self.map` \
+            (default: {None})
+            quiet {bool} -- Whether to suppress screen output of workers \
+            (default: {True})
+
+        Returns:
+            multiprocessing.Pool -- Pool of worker processes
+        """
+        self.atomsCoordArr.flush()
+
+        return multiprocessing.Pool(self.processes, initializer=_init_worker,
+                                    initargs=(self, func, quiet))
+
+    def load_all(self):
+        """
+        Read in all configurations not read in yet, in parallel.
+        """
+        frames = np.flatnonzero(~self.frameLoaded).tolist()
+        if len(frames) == 0:
+            return
+
+        start = timeit.default_timer()
+
+        print("\nReading in the RMC6F ensemble in parallel...")
+
+        with self._pool() as pool:
+            for frame_i, same in pool.imap_unordered(_load_frame, frames):
+                if not same:
+                    pool.terminate()
+                    print("\nAtoms in " + self.fileNames[frame_i])
+                    print("differ from those in " + self.fileNames[0] + "!")
+                    print("All configurations of an ensemble should share "
+                          "the same topology.")
+                    self.close()
+                    sys.exit()
+                self.frameLoaded[frame_i] = True
+
+        stop = timeit.default_timer()
+
+        print("\n------------------------------------------")
+        print("RMC6F ensemble successfully read in.")
+        print("Number of configurations: {0:d}".format(self.numFrames))
+        print("Time taken:{0:11.3F} s".format(stop - start))
+        print("------------------------------------------")
+
+    def map(self, func, quiet=True):
+        """
+        Run an analysis function on each configuration, in parallel.
+
+        Arguments:
+            func {function} -- Analysis function, taking an instance of \
+            `RMC6FReader`, defined at module level
+
+        Keyword Arguments:
+            quiet {bool} -- Whether to suppress screen output of workers \
+            (default: {True})
+
+        Returns:
+            list -- Result of `func` for each configuration, in order
+        """
+        self.load_all()
+
+        with self._pool(func, quiet) as pool:
+            results = pool.map(_map_frame, range(self.numFrames))
+
+        return results
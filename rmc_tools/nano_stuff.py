@@ -9,8 +9,11 @@ This modules holds stuff relevant to processing nano RMC6F configurations.
 # -*- coding: utf-8 -*-
 #
 from rmc_tools import rmc6f_stuff
+from rmc_tools import shell_stuff
 from math import floor
+import numpy as np
 import os
+import sys
 import timeit
 import datetime
 
@@ -28,7 +31,39 @@ class NanoStuff(object):
         self.NPRadius = 0
         self.shellThickness = 0
 
-    def cent_r_rad_config(self, log_file, rmc6f_config):
+    def rad_from_cent(self, rmc6f_config, percentile=None, check_step=0.02):
+        """
+        Method for figuring out the radius of nanoparticle, given the center.
+
+        Distances of all atoms to the center `centPosInt` are worked out in one go, \
+        and the radius is the smallest multiple of `check_step` no smaller than the \
+        largest distance, or than the given percentile of distances, to leave out \
+        stray atoms on the surface.
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+
+        Keyword Arguments:
+            percentile {float} -- Percentile of distances to use, e.g. 99.9, \
+            instead of the largest distance (default: {None})
+            check_step {float} -- Step of radius (default: {0.02})
+
+        Returns:
+            float -- Radius of nanoparticle
+        """
+        dist = shell_stuff.cent_dist(rmc6f_config, self.centPosInt)
+        if percentile is None:
+            rad_max = dist.max()
+        else:
+            rad_max = np.percentile(dist, percentile)
+
+        check_rad = check_step
+        while rad_max > check_rad:
+            check_rad += check_step
+
+        return check_rad
+
+    def cent_r_rad_config(self, log_file, rmc6f_config, percentile=None):
 
         check_step = 0.02
 
@@ -40,21 +75,7 @@ class NanoStuff(object):
         line = file_i.readline()
         self.centPos = [float(x) for x in line.split()[2:]]
         self.centPosInt = [2 * x - 1.0 for x in self.centPos]
-        none_beyond = False
-        check_rad = check_step
-        while not none_beyond:
-            some_beyond = False
-            for atom in rmc6f_config.atomsCoordInt:
-                dist_temp = rmc6f_stuff.dist_calc_coord(self.centPosInt, atom, rmc6f_config.vectors)
-                if dist_temp > check_rad:
-                    some_beyond = True
-                    break
-            if some_beyond:
-                check_rad += check_step
-            else:
-                none_beyond = True
-
-        self.NPRadius = check_rad
+        self.NPRadius = self.rad_from_cent(rmc6f_config, percentile, check_step)
 
         stop = timeit.default_timer()
 
@@ -66,7 +87,7 @@ class NanoStuff(object):
         print("--------------------------------------------------")
 
     # Method for figuring out the center and radius of input nanoparticle.
-    def cent_rad_config(self, rmc6f_config):
+    def cent_rad_config(self, rmc6f_config, percentile=None, periodic=False):
         """
         Method for figuring out the center and radius of the input RMC6F nano configuration.
 
@@ -76,6 +97,13 @@ class NanoStuff(object):
         Arguments:
             rmc6f_config {Object} -- Instance of `RMC6FReader` class
 
+        Keyword Arguments:
+            percentile {float} -- Percentile of distances to the center for the \
+            radius, see `rad_from_cent` (default: {None})
+            periodic {bool} -- Whether to take the center as the periodic (circular) \
+            mean of fractional coordinates, for particles across the boundary of \
+            the box (default: {False})
+
         Output:
            The center and radius of input nanoparticle configuration can be accessed \
            from instance variable `centPos` and `NPRadius`.
@@ -86,31 +114,23 @@ class NanoStuff(object):
 
         print("\nConfiguring particle center and radius...")
 
-        x_temp = [p[0] for p in rmc6f_config.atomsCoord]
-        y_temp = [p[1] for p in rmc6f_config.atomsCoord]
-        z_temp = [p[2] for p in rmc6f_config.atomsCoord]
+        coords = np.asarray(rmc6f_config.atomsCoordArr)
+        if periodic:
+            angle = 2.0 * np.pi * coords
+            angle = np.arctan2(np.sin(angle).mean(axis=0), np.cos(angle).mean(axis=0))
+            self.centPos = (angle / (2.0 * np.pi) % 1.0).tolist()
+        else:
+            x_temp = coords[:, 0].tolist()
+            y_temp = coords[:, 1].tolist()
+            z_temp = coords[:, 2].tolist()
 
-        self.centPos = [sum(x_temp) / rmc6f_config.numAtoms,
-                        sum(y_temp) / rmc6f_config.numAtoms,
-                        sum(z_temp) / rmc6f_config.numAtoms]
+            self.centPos = [sum(x_temp) / rmc6f_config.numAtoms,
+                            sum(y_temp) / rmc6f_config.numAtoms,
+                            sum(z_temp) / rmc6f_config.numAtoms]
 
         self.centPosInt = [2 * x - 1.0 for x in self.centPos]
 
-        none_beyond = False
-        check_rad = check_step
-        while not none_beyond:
-            some_beyond = False
-            for atom in rmc6f_config.atomsCoordInt:
-                dist_temp = rmc6f_stuff.dist_calc_coord(self.centPosInt, atom, rmc6f_config.vectors)
-                if dist_temp > check_rad:
-                    some_beyond = True
-                    break
-            if some_beyond:
-                check_rad += check_step
-            else:
-                none_beyond = True
-
-        self.NPRadius = check_rad
+        self.NPRadius = self.rad_from_cent(rmc6f_config, percentile, check_step)
 
         stop = timeit.default_timer()
 
@@ -122,7 +142,7 @@ class NanoStuff(object):
         print("--------------------------------------------------")
 
     # Method for dividing nanoparticle into various shells.
-    def np_to_shells(self, rmc6f_config):
+    def np_to_shells(self, rmc6f_config, compact=False):
         """
         Method for grabbing shells from nano RMC6F configuration.
 
@@ -132,59 +152,124 @@ class NanoStuff(object):
         Arguments:
             rmc6f_config {Object} -- Instance of `RMC6FReader` class
 
+        Keyword Arguments:
+            compact {bool} -- Whether to save all shells in one `.npz` file (see \
+            `shell_stuff.save_shells`) instead of an RMC6F file for each shell \
+            (default: {False})
+
         Output:
             shell_X.rmc6f -- RMC6F configuration for generated shells.
 
             np_shell_gen.log -- Log information about shells generation.
+
+            With `compact=True`, X_np_shells_N.npz and X_np_shells_N.log instead.
         """
         print("\n****************************************************")
-        print("1->by thickness, 2->by number of atoms")
+        print("1->by thickness, 2->by number of atoms, 3->by exact number of atoms")
         print("****************************************************")
         div_scheme = int(input("Please select a way to divide particle into shells: "))
 
-        while div_scheme != 1 and div_scheme != 2:
-            print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
-            print("!!!!'1' and '2' are only accepted inputs!!!!")
-            print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+        while div_scheme not in [1, 2, 3]:
+            print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
+            print("!!!!'1', '2' and '3' are only accepted inputs!!!!")
+            print("!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
 
             print("\n****************************************************")
-            print("1->by thickness, 2->by number of atoms")
+            print("1->by thickness, 2->by number of atoms, 3->by exact number of atoms")
             print("****************************************************")
             div_scheme = int(input("Please select a way to divide particle into shells: "))
 
+        shell_thickness = None
+        focus = None
+        min_num_in_shell = None
+        surf_layer_thkness = None
         if div_scheme == 1:
+            shell_thickness = float(input("\nPlease input shell thickness for the analysis: "))
+        else:
+            print("\n*************************************************")
+            for i in range(rmc6f_config.numTypeAtom):
+                print(str(i+1) + "->" + rmc6f_config.atomTypes[i] + " ", end='', flush=True)
+            print("\n*************************************************")
+            at_to_focus = int(input("Please input an atom type to focus on: "))
+            focus = rmc6f_config.atomTypes[at_to_focus - 1]
 
-            self.shellThickness = float(input("\nPlease input shell thickness for the analysis: "))
+            print("\n------------------------------------------")
+            print("Total number of atoms selected: {0:10d}".
+                  format(rmc6f_config.numAtomEachType[at_to_focus - 1]))
+            print("------------------------------------------")
+
+            surf_layer_thkness = float(input("\nPlease input an estimated surface layer thickness: "))
+            min_num_in_shell = int(input("Please input minimum number of " +
+                                         focus + " atoms in shell: "))
+
+        shells = self.divide_shells(rmc6f_config, div_scheme, shell_thickness=shell_thickness,
+                                    focus=focus, min_num_in_shell=min_num_in_shell,
+                                    surf_layer_thkness=surf_layer_thkness)
+        self.write_shells(rmc6f_config, shells, compact=compact)
+
+    def divide_shells(self, rmc6f_config, div_scheme, shell_thickness=None, focus=None,
+                      min_num_in_shell=None, surf_layer_thkness=None):
+        """
+        Method for dividing nanoparticle into shells, with parameters as arguments.
+
+        Non-interactive version of `np_to_shells`, taking the parameters otherwise \
+        asked for on screen as arguments and returning the shells instead of writing \
+        them out (see `write_shells`). The center and radius of the nanoparticle \
+        should be configured beforehand, e.g. with `cent_rad_config`.
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+            div_scheme {int} -- 1->by thickness, 2->by number of atoms, 3->by exact \
+            number of atoms
+
+        Keyword Arguments:
+            shell_thickness {float} -- Shell thickness, for scheme 1 (default: {None})
+            focus {str} -- Element to focus on, for schemes 2 and 3 (default: {None})
+            min_num_in_shell {int} -- Minimum number of atoms of the focused element \
+            in shell, for schemes 2 and 3 (default: {None})
+            surf_layer_thkness {float} -- Estimated surface layer thickness, for \
+            schemes 2 and 3 (default: {None})
+
+        Returns:
+            dict -- Shells, with index of atoms in each shell (`shell_atoms`), shell \
+            label of each atom (`shell_id`, -1 for atoms in no shell), lower and upper \
+            limit of each shell (`low_lim` and `hi_lim`), number of shells and the \
+            parameters used
+        """
+        if div_scheme not in [1, 2, 3]:
+            print("Shell division scheme should be 1, 2 or 3!")
+            sys.exit()
+        if div_scheme == 1 and shell_thickness is None:
+            print("Shell thickness needs to be provided for dividing by thickness!")
+            sys.exit()
+        if div_scheme != 1 and (focus not in rmc6f_config.atomTypes or
+                                min_num_in_shell is None or
+                                surf_layer_thkness is None):
+            print("Element to focus on (one of " + " ".join(rmc6f_config.atomTypes) + "),")
+            print("minimum number of its atoms in shell and estimated surface layer")
+            print("thickness need to be provided for dividing by number of atoms!")
+            sys.exit()
+
+        if div_scheme == 1:
+
+            self.shellThickness = shell_thickness
 
             start = timeit.default_timer()
 
             print("\nDividing particle to various shells...")
 
-            atoms_include = [i * 0 for i in range(rmc6f_config.numAtoms)]
-            atoms_to_check = [i for i, x in enumerate(atoms_include) if x == 0]
-
             num_shells = floor(self.NPRadius / self.shellThickness)
-            shell_atoms = []
 
             print("\nShells to configure: ", end='', flush=True)
             for i in range(num_shells + 1):
                 print("*", end='', flush=True)
 
-            print("\nShells configured:   ", end='', flush=True)
-            for i in range(num_shells):
-                shell_atoms.append([])
-                low_lim = i * self.shellThickness
-                hi_lim = (i + 1) * self.shellThickness
-                for ii in atoms_to_check:
-                    dist_temp = rmc6f_stuff.dist_calc_coord(self.centPosInt, rmc6f_config.atomsCoordInt[ii],
-                                                rmc6f_config.vectors)
-                    if low_lim <= dist_temp < hi_lim:
-                        shell_atoms[i].append(ii)
-                        atoms_include[ii] = 1
-                atoms_to_check = [i for i, x in enumerate(atoms_include) if x == 0]
-                print(".", end='', flush=True)
+            dist = shell_stuff.cent_dist(rmc6f_config, self.centPosInt)
+            shell_atoms = shell_stuff.thickness_shells(dist, self.shellThickness,
+                                                       num_shells)
+
+            print("\nShells configured:   " + "." * num_shells, end='', flush=True)
 
-            shell_atoms.append(atoms_to_check)
             num_shells += 1
             print(".")
 
@@ -196,21 +281,6 @@ class NanoStuff(object):
             print("--------------------------------------------")
         elif div_scheme == 2:
 
-            print("\n*************************************************")
-            for i in range(rmc6f_config.numTypeAtom):
-                print(str(i+1) + "->" + rmc6f_config.atomTypes[i] + " ", end='', flush=True)
-            print("\n*************************************************")
-            at_to_focus = int(input("Please input an atom type to focus on: "))
-
-            print("\n------------------------------------------")
-            print("Total number of atoms selected: {0:10d}".
-                  format(rmc6f_config.numAtomEachType[at_to_focus - 1]))
-            print("------------------------------------------")
-
-            surf_layer_thkness = float(input("\nPlease input an estimated surface layer thickness: "))
-            min_num_in_shell = int(input("Please input minimum number of " +
-                                         rmc6f_config.atomTypes[at_to_focus - 1] + " atoms in shell: "))
-
             start = timeit.default_timer()
 
             print("\nDividing particle to various shells...")
@@ -242,7 +312,7 @@ class NanoStuff(object):
                     space_left = min_num_in_shell - natoms_focus
                     to_eat = 0
                     for item in list_temp:
-                        if rmc6f_config.atomsEle[item] == rmc6f_config.atomTypes[at_to_focus - 1]:
+                        if rmc6f_config.atomsEle[item] == focus:
                             to_eat += 1
                     if space_left < int(0.1 * float(min_num_in_shell)) and \
                        to_eat > int(0.15 * float(min_num_in_shell)):
@@ -251,7 +321,7 @@ class NanoStuff(object):
                         shell_atoms[shell_processed].extend(list_temp)
                         for item in list_temp:
                             atoms_include[item] = 1
-                            if rmc6f_config.atomsEle[item] == rmc6f_config.atomTypes[at_to_focus - 1]:
+                            if rmc6f_config.atomsEle[item] == focus:
                                 natoms_focus += 1
                     else:
                         hi_lim -= check_step
@@ -267,7 +337,7 @@ class NanoStuff(object):
 
                 atoms_left = 0
                 for i in range(rmc6f_config.numAtoms):
-                    if rmc6f_config.atomsEle[i] == rmc6f_config.atomTypes[at_to_focus - 1] and \
+                    if rmc6f_config.atomsEle[i] == focus and \
                        atoms_include[i] == 0:
                         atoms_left += 1
                 if atoms_left < 2 * min_num_in_shell:
@@ -291,60 +361,120 @@ class NanoStuff(object):
             print("Time taken:{0:11.3F} s".format(stop - start))
             print("--------------------------------------------")
 
-        dir_exist = True
-        i = 1
-        while dir_exist:
-            dir_check = rmc6f_config.fileName.split(".")[0] + "_np_shells_" + str(i)
-            if not os.path.exists(dir_check):
-                dir_exist = False
-                dir_use = dir_check
-            i += 1
+        elif div_scheme == 3:
+
+            start = timeit.default_timer()
+
+            print("\nDividing particle to various shells...")
 
-        os.mkdir(dir_use)
+            code_focus = rmc6f_config.atomsEleTypes.index(focus)
+            dist = shell_stuff.cent_dist(rmc6f_config, self.centPosInt)
+            pop_shells = shell_stuff.PopulationShells(dist, np.asarray(rmc6f_config.atomsEleCode) == code_focus)
+
+            hi_lim = 0
+            low_lim_out = []
+            hi_lim_out = []
+            shell_atoms = []
+            shell_processed = 0
+            enough_left = True
+            print("Shells configured (represented by '.'): ", end='', flush=True)
+            while (hi_lim < self.NPRadius - surf_layer_thkness) and enough_left:
+                atoms_temp, low_lim, hi_lim = pop_shells.next_shell(min_num_in_shell)
+                shell_atoms.append(atoms_temp)
+                low_lim_out.append(low_lim)
+                hi_lim_out.append(hi_lim)
+
+                shell_processed += 1
+
+                if pop_shells.focusLeft < 2 * min_num_in_shell:
+                    enough_left = False
+
+                print(".", end='', flush=True)
+
+            shell_atoms.append(pop_shells.atoms_left())
+            hi_lim_out[shell_processed - 1] = self.NPRadius
+            print(".")
+
+            num_shells = shell_processed
+
+            stop = timeit.default_timer()
 
+            print("\n--------------------------------------------")
+            print("Particle successfully divided to " + str(num_shells) + " shells.")
+            print("Time taken:{0:11.3F} s".format(stop - start))
+            print("--------------------------------------------")
+
+        shell_atoms = shell_atoms[:num_shells]
+        shell_id = np.full(rmc6f_config.numAtoms, -1, dtype=np.int32)
         for i in range(num_shells):
-            atoms_ele = []
-            atoms_line = []
-            line_num = 0
-            for item in shell_atoms[i]:
-                line_num += 1
-                atoms_ele.append(rmc6f_config.atomsEle[item])
-                line_temp = rmc6f_config.atomsLine[item]
-                line_new = str(line_num) + " " + " ".join(line_temp.split()[1:]) + "\n"
-                atoms_line.append(line_new)
-
-            atoms_ele_uniq = sorted(set(atoms_ele), key=atoms_ele.index)
-
-            num_each_type = []
-            for j in range(len(atoms_ele_uniq)):
-                num_each_type.append(str(atoms_ele.count(atoms_ele_uniq[j])))
-
-            num_rho_new = rmc6f_config.initNumRho * \
-                float(len(shell_atoms[i])) / \
-                float(rmc6f_config.numAtoms)
-
-            header = rmc6f_config.header.copy()
-            for j in range(len(header)):
-                if "Number of atoms:" in header[j]:
-                    header[j] = "Number of atoms: " + str(len(shell_atoms[i])) + "\n"
-                if "Atom types present:" in header[j]:
-                    header[j] = "Atom types present: " + " ".join(atoms_ele_uniq) + "\n"
-                if "Number of types of atoms:" in header[j]:
-                    header[j] = "Number of types of atoms: " + str(len(atoms_ele_uniq)) + "\n"
-                if "Number of each atom type:" in header[j]:
-                    header[j] = "Number of each atom type: " + " ".join(num_each_type) + "\n"
-                if "Number density (Ang^-3):" in header[j]:
-                    header[j] = "Number density (Ang^-3):" + " {0:.6f}".format(num_rho_new) + "\n"
-
-            file_out = open(os.path.join(dir_use, "shell_" + str(i)) + ".rmc6f", "w")
-            for item in header:
-                file_out.write(item)
-            for item in atoms_line:
-                file_out.write(item)
-            file_out.close()
+            shell_id[np.asarray(shell_atoms[i], dtype=np.int64)] = i
+        if div_scheme == 1:
+            low_lim_out = [i * self.shellThickness for i in range(num_shells)]
+            hi_lim_out = [(i + 1) * self.shellThickness for i in range(num_shells - 1)]
+            hi_lim_out.append(float("inf"))
+
+        shells = {"div_scheme": div_scheme,
+                  "num_shells": num_shells,
+                  "shell_atoms": shell_atoms,
+                  "shell_id": shell_id,
+                  "low_lim": low_lim_out,
+                  "hi_lim": hi_lim_out,
+                  "shell_thickness": shell_thickness,
+                  "focus": focus,
+                  "min_num_in_shell": min_num_in_shell,
+                  "surf_layer_thkness": surf_layer_thkness}
+
+        return shells
+
+    def write_shells(self, rmc6f_config, shells, compact=False):
+        """
+        Method for writing out shells, as returned by `divide_shells`.
+
+        Arguments:
+            rmc6f_config {Object} -- Instance of `RMC6FReader` class
+            shells {dict} -- Shells, as returned by `divide_shells`
+
+        Keyword Arguments:
+            compact {bool} -- Whether to save all shells in one `.npz` file (see \
+            `shell_stuff.save_shells`) instead of an RMC6F file for each shell \
+            (default: {False})
+
+        Output:
+            shell_X.rmc6f -- RMC6F configuration for generated shells.
+
+            np_shell_gen.log -- Log information about shells generation.
+
+            With `compact=True`, X_np_shells_N.npz and X_np_shells_N.log instead.
+
+        Returns:
+            str -- Output directory, or `.npz` file with `compact=True`
+        """
+        div_scheme = shells["div_scheme"]
+        num_shells = shells["num_shells"]
+        shell_atoms = shells["shell_atoms"]
+        low_lim_out = shells["low_lim"]
+        hi_lim_out = shells["hi_lim"]
+        focus = shells["focus"]
+        min_num_in_shell = shells["min_num_in_shell"]
+        surf_layer_thkness = shells["surf_layer_thkness"]
+
+        prefix = rmc6f_stuff.config_stem(rmc6f_config.fileName) + "_np_shells_"
+        if compact:
+            dir_use = shell_stuff.claim_name(prefix, ".npz", also=[""])
+            shell_stuff.save_shells(dir_use + ".npz", rmc6f_config, shell_atoms,
+                                    low_lim_out, hi_lim_out, self.centPos)
+            log_name = dir_use + ".log"
+        else:
+            dir_use = shell_stuff.claim_name(prefix, directory=True, also=[".npz"])
+
+            rmc6f_writer = rmc6f_stuff.RMC6FWriter(rmc6f_config)
+            for i in range(num_shells):
+                rmc6f_writer.write(os.path.join(dir_use, "shell_" + str(i)) + ".rmc6f",
+                                   index=shell_atoms[i])
+            log_name = os.path.join(dir_use, "np_shell_gen.log")
 
         now = datetime.datetime.now()
-        log_file = open(os.path.join(dir_use, "np_shell_gen.log"), "w")
+        log_file = open(log_name, "w")
         log_file.write("==================================\n")
         log_file.write("Log file for np_to_shells routine.\n")
         log_file.write("==================================\n")
@@ -352,16 +482,19 @@ class NanoStuff(object):
         if div_scheme == 1:
             log_file.write("================================================\n")
             log_file.write("Particle divided into shells by equal thickness.\n")
-            log_file.write("Shell thickness used: {0:10.1F}\n".format(self.shellThickness))
+            log_file.write("Shell thickness used: {0:10.1F}\n".format(shells["shell_thickness"]))
             log_file.write("Number of shells generated: {0:10d}\n".format(num_shells))
             log_file.write("================================================")
         else:
             log_file.write("================================================================\n")
-            log_file.write("Particle divided into shells by equal (roughly) number of atoms.\n")
+            if div_scheme == 2:
+                log_file.write("Particle divided into shells by equal (roughly) number of atoms.\n")
+            else:
+                log_file.write("Particle divided into shells by equal number of atoms, exactly.\n")
             log_file.write("Estimated surface shell thickness: {0:10.1F}\n".format(surf_layer_thkness))
-            log_file.write("Atom type focused: {0:2s}\n".format(rmc6f_config.atomTypes[at_to_focus - 1]))
+            log_file.write("Atom type focused: {0:2s}\n".format(focus))
             log_file.write("Minimum number of {0:2s} atom in each shell: {1:10d}\n".
-                           format(rmc6f_config.atomTypes[at_to_focus - 1], min_num_in_shell))
+                           format(focus, min_num_in_shell))
             log_file.write("Number of shells generated: {0:10d}\n".format(num_shells))
             log_file.write("================================================================\n")
             log_file.write("Lower and upper limit of each shell:\n")
@@ -372,8 +505,20 @@ class NanoStuff(object):
             log_file.write("================================================================")
         log_file.close()
 
-        print("\n--------------------------------------------")
-        print("RMC6F configs of shells output to directory:")
-        print("--------------------------------------------")
-        print(dir_use)
-        print("--------------------------------------------")
+        if compact:
+            print("\n--------------------------------------------")
+            print("Shells output to file:")
+            print("--------------------------------------------")
+            print(dir_use + ".npz")
+            print("--------------------------------------------")
+        else:
+            print("\n--------------------------------------------")
+            print("RMC6F configs of shells output to directory:")
+            print("--------------------------------------------")
+            print(dir_use)
+            print("--------------------------------------------")
+
+        if compact:
+            return dir_use + ".npz"
+
+        return dir_use
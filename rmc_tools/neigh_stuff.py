@@ -0,0 +1,275 @@
+"""
+Neighbour search for RMC6F configurations
+=========================================
+
+This modules holds stuff relevant to finding neighbours of atoms in RMC6F
+configurations, with a linked-cell grid over the (triclinic) supercell.
+
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import DistCalc, DIST_BLOCK
+import numpy as np
+import timeit
+
+
+def cell_list_pairs(coords, vectors, r_cut, ele_code=None, allowed=None):
+    '''
+    Neighbour pairs within cutoff, found with linked-cell grid
+
+    The supercell is divided into a grid of bins, with the bin width along \
+    each axis no smaller than the cutoff, so that all neighbours of an atom \
+    sit in the same or adjacent (periodic) bins. Distances follow the same \
+    minimum image convention as `rmc6f_stuff.dist_calc_coord`.
+
+    :param coords: Fractional coordinates of atoms.
+    :type coords: numpy.array, (N, 3)
+    :param vectors: Lattice vectors - x, y and z, respectively.
+    :type vectors: 2D list or numpy.array
+    :param r_cut: Cutoff - pairs with distance smaller than it are kept.
+    :type r_cut: float
+    :param ele_code: Element code of atoms, only needed with `allowed`.
+    :type ele_code: numpy.array, (N,)
+    :param allowed: Element code pairs to keep, `allowed[code_i, code_j]`.
+    :type allowed: 2D numpy.array of bool
+
+    :return: Index of first and second atom of each pair (both directions \
+             included, sorted by first then second atom), distances and \
+             minimum image difference of internal coordinates (second atom \
+             minus first atom).
+    :rtype: tuple of numpy.array
+    '''
+    coords = np.asarray(coords, dtype=np.float64)
+    coords_int = 2.0 * coords - 1.0
+    num_atoms = len(coords)
+    dist_calc = DistCalc(vectors)
+
+    # Perpendicular widths of the supercell give the number of bins.
+    vec = np.asarray(vectors, dtype=np.float64)
+    volume = abs(np.linalg.det(vec))
+    widths = [volume / np.linalg.norm(np.cross(vec[(i + 1) % 3],
+                                               vec[(i + 2) % 3]))
+              for i in range(3)]
+    num_bins = np.array([max(int(x / r_cut), 1) for x in widths])
+
+    bin_3d = np.floor((coords - np.floor(coords)) * num_bins).astype(np.int64)
+    bin_3d = np.minimum(bin_3d, num_bins - 1)
+    bin_id = (bin_3d[:, 0] * num_bins[1] + bin_3d[:, 1]) * num_bins[2] + \
+        bin_3d[:, 2]
+    order = np.argsort(bin_id, kind="stable")
+    bin_count = np.bincount(bin_id, minlength=int(np.prod(num_bins)))
+    bin_start = np.cumsum(bin_count) - bin_count
+
+    # With less than three bins along an axis, adjacent bins coincide.
+    offsets = [sorted(set(x % n for x in [-1, 0, 1])) for n in num_bins]
+    offsets = [(x, y, z) for x in offsets[0] for y in offsets[1]
+               for z in offsets[2]]
+
+    per_atom = len(offsets) * max(num_atoms // len(bin_count), 1)
+    block = max(DIST_BLOCK // per_atom, 1)
+
+    pair_i = []
+    pair_j = []
+    pair_dist = []
+    pair_diff = []
+    for start in range(0, num_atoms, block):
+        atom_i = np.arange(start, min(start + block, num_atoms))
+        for off in offsets:
+            nbin = (bin_3d[atom_i] + off) % num_bins
+            nbin = (nbin[:, 0] * num_bins[1] + nbin[:, 1]) * num_bins[2] + \
+                nbin[:, 2]
+            count = bin_count[nbin]
+            cand_i = np.repeat(atom_i, count)
+            pos = np.arange(len(cand_i)) - np.repeat(np.cumsum(count) - count,
+                                                     count)
+            cand_j = order[pos + np.repeat(bin_start[nbin], count)]
+
+            keep = cand_i != cand_j
+            if allowed is not None:
+                keep &= allowed[ele_code[cand_i], ele_code[cand_j]]
+            cand_i = cand_i[keep]
+            cand_j = cand_j[keep]
+
+            # Lower index always goes first, as in looping over i < j.
+            low = np.minimum(cand_i, cand_j)
+            high = np.maximum(cand_i, cand_j)
+            diff = dist_calc.min_image(coords_int[low], coords_int[high])
+            dist = dist_calc.dist_from_diff(diff)
+            keep = dist < r_cut
+            diff = diff[keep]
+            diff[cand_i[keep] == low[keep]] *= -1.0
+
+            pair_i.append(cand_i[keep])
+            pair_j.append(cand_j[keep])
+            pair_dist.append(dist[keep])
+            pair_diff.append(diff)
+
+    pair_i = np.concatenate(pair_i) if pair_i else np.zeros(0, np.int64)
+    pair_j = np.concatenate(pair_j) if pair_j else np.zeros(0, np.int64)
+    pair_dist = np.concatenate(pair_dist) if pair_dist else np.zeros(0)
+    pair_diff = np.concatenate(pair_diff) if pair_diff else np.zeros([0, 3])
+
+    sort_i = np.lexsort((pair_j, pair_i))
+
+    return pair_i[sort_i], pair_j[sort_i], pair_dist[sort_i], pair_diff[sort_i]
+
+
+class NeighList(object):
+    """Neighbour list for RMC6F configuration
+
+    Given RMC6F configuration (instance of `RMC6FReader`) and the cutoff as \
+    inputs, when declaring instance to this class, it will figure out all \
+    neighbours within the cutoff, in O(N) with linked-cell grid. Neighbours \
+    of atom `i` are `self.indices[self.offsets[i]:self.offsets[i + 1]]`, \
+    i.e. the neighbour list is in CSR style, as detailed below,
+
+    +------------------------+---------------------------------+--------+
+    | Variable name          | Property                        | Type   |
+    +========================+=================================+========+
+    | self.offsets           | Start of neighbours of each     | int64  |
+    |                        | atom, (N + 1,)                  |        |
+    +------------------------+---------------------------------+--------+
+    | self.indices           | Index of neighbours             | int32  |
+    +------------------------+---------------------------------+--------+
+    | self.distances         | Distance to neighbours          | float64|
+    +------------------------+---------------------------------+--------+
+    | self.vecs              | Displacement vectors (in Ang)   | float64|
+    |                        | to neighbours, (P, 3), only if  |        |
+    |                        | `with_vec=True`                 |        |
+    +------------------------+---------------------------------+--------+
+    | self.rCut              | Cutoff                          | float  |
+    +------------------------+---------------------------------+--------+
+
+    Arguments:
+        rmc6f_config {Object} -- Instance of `RMC6FReader` class
+        r_cut {float} -- Cutoff for neighbours (exclusive)
+
+    Keyword Arguments:
+        ele_pairs {list} -- Element pairs to keep, e.g. `[("Li", "Li"), \
+        ("Li", "O")]`, in either order. All pairs kept if `None`. \
+        (default: {None})
+        with_vec {bool} -- Whether to keep displacement vectors \
+        (default: {False})
+    """
+
+    def __init__(self, rmc6f_config, r_cut, ele_pairs=None, with_vec=False):
+
+        start = timeit.default_timer()
+
+        print("\nFiguring out neighbours of atoms...")
+
+        self.rCut = r_cut
+        num_atoms = rmc6f_config.numAtoms
+
+        allowed = None
+        if ele_pairs is not None:
+            ele_types = rmc6f_config.atomsEleTypes
+            allowed = np.zeros([len(ele_types), len(ele_types)], dtype=bool)
+            for ele_1, ele_2 in ele_pairs:
+                if ele_1 in ele_types and ele_2 in ele_types:
+                    code_1 = ele_types.index(ele_1)
+                    code_2 = ele_types.index(ele_2)
+                    allowed[code_1, code_2] = True
+                    allowed[code_2, code_1] = True
+
+        pair_i, pair_j, dist, diff = cell_list_pairs(
+            rmc6f_config.atomsCoordArr, rmc6f_config.vectors, r_cut,
+            ele_code=rmc6f_config.atomsEleCode, allowed=allowed)
+
+        self.offsets = np.zeros(num_atoms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_i, minlength=num_atoms),
+                  out=self.offsets[1:])
+        self.indices = pair_j.astype(np.int32)
+        self.distances = dist
+        if with_vec:
+            self.vecs = np.matmul(diff / 2.0,
+                                  np.asarray(rmc6f_config.vectors,
+                                             dtype=np.float64))
+        else:
+            self.vecs = None
+
+        stop = timeit.default_timer()
+
+        print("\n--------------------------------------------")
+        print("Neighbours of atoms successfully configured.")
+        print("Number of neighbour pairs: {0:d}".format(len(self.indices)))
+        print("Time taken:{0:11.3F} s".format(stop - start))
+        print("--------------------------------------------")
+
+    def neighbours(self, atom_i):
+        """
+        Neighbours of an atom.
+
+        Arguments:
+            atom_i {int} -- Index of atom (starting from 0)
+
+        Returns:
+            tuple -- Index of neighbours and distances to them
+        """
+        start = self.offsets[atom_i]
+        stop = self.offsets[atom_i + 1]
+
+        return self.indices[start:stop], self.distances[start:stop]
+
+    def pairs(self):
+        """
+        Flat neighbour pairs.
+
+        Returns:
+            tuple -- Index of first and second atom of each pair
+        """
+        pair_i = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32),
+                           np.diff(self.offsets))
+
+        return pair_i, self.indices
+
+    def dist_shells(self, tol=1E-3):
+        """
+        Group neighbours of each atom into shells of the same distance.
+
+        Neighbours of each atom are sorted by distance once and split where \
+        the distance goes up by `tol` or more from the first (smallest) \
+        distance of the current shell, so that a shell never spans `tol` or \
+        more.
+
+        Keyword Arguments:
+            tol {float} -- Distances closer than this go to the same shell \
+            (default: {1E-3})
+
+        Returns:
+            tuple -- Index of shell (starting from 0 for the nearest shell of \
+            each atom) and distance of shell (the smallest distance in it), \
+            for each neighbour pair, in the order of `self.indices`
+        """
+        pair_i, _ = self.pairs()
+        order = np.lexsort((self.distances, pair_i))
+        dist_sorted = self.distances[order]
+
+        new_shell = np.ones(len(order), dtype=bool)
+        new_shell[1:] = (pair_i[order][1:] != pair_i[order][:-1]) | \
+            (np.diff(dist_sorted) >= tol)
+        # Runs of close distances spanning `tol` or more get split, starting a
+        # new shell at the first distance `tol` beyond the start of the shell,
+        # until no shell spans `tol`.
+        position = np.arange(len(order))
+        while True:
+            start_of = np.maximum.accumulate(np.where(new_shell, position, 0))
+            beyond = dist_sorted - dist_sorted[start_of] >= tol
+            beyond[1:] &= ~beyond[:-1]
+            if not beyond.any():
+                break
+            new_shell |= beyond
+        shell_of = np.cumsum(new_shell) - 1
+        shell_start = np.flatnonzero(new_shell)
+
+        # Atoms keep their block of pairs in the sorted order, so the first
+        # shell of each atom sits at its offset.
+        shell_index = np.zeros(len(order), dtype=np.int32)
+        shell_dist = np.zeros(len(order))
+        if len(order) > 0:
+            first_shell = shell_of[self.offsets[pair_i[order]]]
+            shell_index[order] = shell_of - first_shell
+            shell_dist[order] = dist_sorted[shell_start[shell_of]]
+
+        return shell_index, shell_dist
@@ -8,11 +8,43 @@ This modules holds stuff relevant to processing RMC6F configurations in general.
 #
 # -*- coding: utf-8 -*-
 #
+from collections import namedtuple
 from math import ceil
+from itertools import chain, islice
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
 import numpy as np
+import os
+import queue
+import shutil
 import sys
+import threading
 import timeit
 
+# Number of atom lines parsed in one go by the columnar reader.
+CHUNK_SIZE = 100000
+
+# Compressed configuration files, told by extension.
+COMPRESSED = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+# Size of blocks of lines read ahead in background thread.
+READ_AHEAD_BLOCK = 1 << 22
+
+# Maximum number of distances worked out in one go by `DistCalc`.
+DIST_BLOCK = 1 << 22
+
+# Binary sidecar cache - arrays stored, one `.npy` file each, in the
+# `<config>.cache` directory next to the RMC6F file.
+CACHE_EXT = ".cache"
+CACHE_ARRAYS = ["atomsCoordArr", "atomsEleCode", "atomsTag",
+                "atomsSite", "atomsCell"]
+# Size of blocks of the RMC6F file going into the content hash.
+HASH_BLOCK = 1 << 20
+# Number of atom lines looked at for the number of decimals of coordinates.
+DECIMALS_SAMPLE = 1000
+
 
 # Distance calculator.
 def dist_calc_coord(coord1, coord2, vectors):
@@ -61,57 +93,387 @@ def dist_calc_coord(coord1, coord2, vectors):
     return dist_result
 
 
-# Does what the name says.
-class RMC6FReader(object):
-    """RMC6F configuration reader
+def open_config(file_name, mode="r"):
+    '''
+    Open configuration file, compressed or not, in text mode
 
-    Given the full path of RMC6F configuration file as input, when declaring \
-    instance to this class, it will read in read in the RMC6F configuration. \
-    Several instance variables will be made available, as detailed below,
+    :param file_name: Full path of the file. Files with extension `.gz`, \
+                      `.bz2` or `.xz` are (de)compressed on the fly.
+    :type file_name: str
+    :param mode: "r", "w" or "a".
+    :type mode: str
 
-    +------------------------+---------------------------------+--------+
-    | Variable name          | Property                        | Type   |
-    +========================+=================================+========+
-    | self.atomsCoord        | Atomic coordinates for all      | list   |
-    +------------------------+---------------------------------+--------+
-    | self.atomsCoordInt     | RMC Internal atomic coordinates | list   |
-    +------------------------+---------------------------------+--------+
-    | self.atomsEle          | Element symbol for all atoms    | list   |
-    +------------------------+---------------------------------+--------+
-    | self.atomsLine         | All atom lines                  | list   |
-    +------------------------+---------------------------------+--------+
-    | self.atomTypes         | Atom types present              | list   |
-    +------------------------+---------------------------------+--------+
-    | self.fileName          | The input RMC6F file name       | string |
-    +------------------------+---------------------------------+--------+
-    | self.header            | Head lines of RMC6F file        | string |
-    +------------------------+---------------------------------+--------+
-    | self.initNumRho        | Number density                  | float  |
-    +------------------------+---------------------------------+--------+
-    | self.lattPara          | Lattice parameters              | list   |
-    +------------------------+---------------------------------+--------+
-    | self.numAtoms          | Number of atoms                 | int    |
-    +------------------------+---------------------------------+--------+
-    | self.numAtomEachType   | Number of each atom type        | list   |
-    +------------------------+---------------------------------+--------+
-    | self.numTypeAtom       | Number of types of atoms        | int    |
-    +------------------------+---------------------------------+--------+
-    | self.scDim             | Supercell dimensions            | list   |
-    +------------------------+---------------------------------+--------+
-    | self.uniq_ref          | Compressed info for all atoms   | dict   |
-    +------------------------+---------------------------------+--------+
-    | self.vectors           | Lattice vectors                 | list   |
-    +------------------------+---------------------------------+--------+
+    :return: File object.
+    :rtype: file
+    '''
+    ext = os.path.splitext(file_name)[1].lower()
+    if ext in COMPRESSED:
+        return COMPRESSED[ext](file_name, mode + "t")
+
+    return open(file_name, mode)
+
+
+def config_stem(file_name):
+    '''
+    Full path of configuration file without extension, compressed or not
+
+    :param file_name: Full path of the file, e.g. `x.rmc6f` or `x.rmc6f.gz`.
+    :type file_name: str
+
+    :return: Full path without extension, `x` for both examples above.
+    :rtype: str
+    '''
+    stem, ext = os.path.splitext(file_name)
+    if ext.lower() in COMPRESSED:
+        stem = os.path.splitext(stem)[0]
+
+    return stem
+
+
+def config_compression(file_name):
+    '''
+    Compression extension of configuration file
+
+    :param file_name: Full path of the file.
+    :type file_name: str
+
+    :return: `.gz`, `.bz2` or `.xz` (as in `file_name`), or empty string if \
+             not compressed.
+    :rtype: str
+    '''
+    ext = os.path.splitext(file_name)[1]
+    if ext.lower() in COMPRESSED:
+        return ext
+
+    return ""
+
+
+def read_ahead(file_in, block_size=READ_AHEAD_BLOCK, depth=4):
+    '''
+    Lines of file, read (and decompressed) ahead in background thread
+
+    Reading, and especially decompressing, the next blocks of lines then \
+    overlaps with parsing of the current one.
+
+    :param file_in: File opened for reading, e.g. with `open_config`.
+    :type file_in: file
+    :param block_size: Approximate size of each block of lines, in bytes.
+    :type block_size: int
+    :param depth: Maximum number of blocks read ahead.
+    :type depth: int
+
+    :return: Generator of lines. Close it (or run it to the end) before \
+             closing the file.
+    :rtype: generator
+    '''
+    blocks = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def work():
+        try:
+            lines = [None]
+            while lines and not stop.is_set():
+                lines = file_in.readlines(block_size)
+                put(lines)
+        except Exception as err:
+            put(err)
+
+    worker = threading.Thread(target=work)
+    worker.daemon = True
+    worker.start()
+    try:
+        while True:
+            lines = blocks.get()
+            if isinstance(lines, Exception):
+                raise lines
+            if not lines:
+                break
+            for line in lines:
+                yield line
+    finally:
+        stop.set()
+        worker.join()
+
+
+def metric_calc(vectors):
+    '''
+    Metric tensor for RMC internal coordinates
+
+    :param vectors: Lattice vectors - x, y and z, respectively.
+    :type vectors: 2D list or numpy.array
+
+    :return: Metric tensor, with the off-diagonal terms doubled, in the same \
+             way as used in `dist_calc_coord`.
+    :rtype: numpy.array
+    '''
+    vectors_temp = [[float(y) / 2.0 for y in x] for x in vectors]
+    metric = np.zeros([3, 3])
+    for ii in range(3):
+        for jj in range(3):
+            for kk in range(3):
+                metric[ii][jj] += (vectors_temp[ii][kk] * vectors_temp[jj][kk])
+    for ii, jj in [(0, 1), (0, 2), (1, 2)]:
+        metric[ii][jj] *= 2.0
+
+    return metric
+
+
+class DistCalc(object):
+    """Batch distance calculator
+
+    Vectorized version of `dist_calc_coord`. The metric tensor is worked \
+    out once, when declaring instance to this class with the lattice vectors \
+    of the configuration, and distances are then returned as numpy arrays, \
+    following the same RMC internal coordinates (in [-1, 1]) and minimum \
+    image convention as `dist_calc_coord`.
+
+    Arguments:
+        vectors {list} -- Lattice vectors - x, y and z, respectively
+
+    Keyword Arguments:
+        dtype {numpy.dtype} -- Data type of output distances, e.g. \
+        `numpy.float32` to halve the memory (default: {numpy.float64})
     """
 
-    def __init__(self, file_name):
+    def __init__(self, vectors, dtype=np.float64):
+        self.metric = metric_calc(vectors)
+        self.dtype = dtype
 
-        start = timeit.default_timer()
+    @staticmethod
+    def min_image(coord1, coord2):
+        """
+        Minimum image difference between internal coordinates.
 
-        print("\nReading in the RMC6F configuration...")
+        Arguments:
+            coord1 {numpy.array} -- Internal coordinates, (..., 3)
+            coord2 {numpy.array} -- Internal coordinates, (..., 3)
 
-        self.fileName = file_name
-        rmc6f_config = open(self.fileName, "r")
+        Returns:
+            numpy.array -- Difference `coord1 - coord2`, in [-1, 1)
+        """
+        diff = (np.asarray(coord1) + 3.0) - np.asarray(coord2)
+
+        return diff - 2.0 * np.trunc(diff * 0.5) - 1.0
+
+    def dist_from_diff(self, diff):
+        """
+        Distances from minimum image differences of internal coordinates.
+
+        Arguments:
+            diff {numpy.array} -- Output of `min_image`, (..., 3)
+
+        Returns:
+            numpy.array -- Distances
+        """
+        x = diff[..., 0]
+        y = diff[..., 1]
+        z = diff[..., 2]
+        dist = self.metric[0][0] * x * x
+        dist += self.metric[1][1] * y * y
+        dist += self.metric[2][2] * z * z
+        dist += self.metric[0][1] * x * y
+        dist += self.metric[0][2] * x * z
+        dist += self.metric[1][2] * y * z
+
+        return np.sqrt(dist).astype(self.dtype, copy=False)
+
+    def one_to_many(self, coord, coords):
+        """
+        Distances between one point and N atoms.
+
+        Arguments:
+            coord {list} -- Internal coordinates of the point
+            coords {numpy.array} -- Internal coordinates of atoms, (N, 3)
+
+        Returns:
+            numpy.array -- Distances, (N,)
+        """
+        coord = np.asarray(coord, dtype=np.float64)
+        coords = np.asarray(coords)
+        dist = np.empty(len(coords), dtype=self.dtype)
+        for i in range(0, len(coords), DIST_BLOCK):
+            dist[i:i + DIST_BLOCK] = self.dist_from_diff(
+                self.min_image(coord, coords[i:i + DIST_BLOCK]))
+
+        return dist
+
+    def many_to_many(self, coords1, coords2):
+        """
+        Distances between N atoms and M atoms.
+
+        Arguments:
+            coords1 {numpy.array} -- Internal coordinates, (N, 3)
+            coords2 {numpy.array} -- Internal coordinates, (M, 3)
+
+        Returns:
+            numpy.array -- Distances, (N, M)
+        """
+        coords1 = np.asarray(coords1)
+        coords2 = np.asarray(coords2)
+        dist = np.empty([len(coords1), len(coords2)], dtype=self.dtype)
+        block = max(DIST_BLOCK // max(len(coords2), 1), 1)
+        for i in range(0, len(coords1), block):
+            dist[i:i + block] = self.dist_from_diff(
+                self.min_image(coords1[i:i + block, None, :],
+                               coords2[None, :, :]))
+
+        return dist
+
+    def pairs(self, coords, index_i, index_j):
+        """
+        Distances between pairs of atoms given by index.
+
+        Arguments:
+            coords {numpy.array} -- Internal coordinates of atoms, (N, 3)
+            index_i {numpy.array} -- Index of first atom of pairs, (P,)
+            index_j {numpy.array} -- Index of second atom of pairs, (P,)
+
+        Returns:
+            numpy.array -- Distances, (P,)
+        """
+        coords = np.asarray(coords)
+        index_i = np.asarray(index_i)
+        index_j = np.asarray(index_j)
+        dist = np.empty(len(index_i), dtype=self.dtype)
+        for i in range(0, len(index_i), DIST_BLOCK):
+            dist[i:i + DIST_BLOCK] = self.dist_from_diff(
+                self.min_image(coords[index_i[i:i + DIST_BLOCK]],
+                               coords[index_j[i:i + DIST_BLOCK]]))
+
+        return dist
+
+
+def file_key(file_name):
+    '''
+    Key identifying the content of a configuration file
+
+    The content hash is taken over the first, middle and last blocks of the \
+    file, which together with the file size and modification time is enough \
+    to tell whether a multi-GB configuration has changed, without reading it \
+    all in.
+
+    :param file_name: Full path of the file.
+    :type file_name: str
+
+    :return: File size, modification time and content hash.
+    :rtype: dict
+    '''
+    f_stat = os.stat(file_name)
+    f_hash = hashlib.sha1()
+    f_in = open(file_name, "rb")
+    for pos in [0, f_stat.st_size // 2, f_stat.st_size - HASH_BLOCK]:
+        f_in.seek(max(pos, 0))
+        f_hash.update(f_in.read(HASH_BLOCK))
+    f_in.close()
+
+    return {"size": f_stat.st_size, "mtime": f_stat.st_mtime,
+            "hash": f_hash.hexdigest()}
+
+
+class _lazy_atoms(object):
+    """
+    Attribute of the atoms block computed on first access.
+
+    The wrapped method is called once and its result stored in the instance
+    dictionary, so that later accesses (and plain assignments, as done by the
+    list based reader) never come back here.
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.__doc__ = builder.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.builder(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def _parse_atom_chunk(lines, ele_types):
+    '''
+    Parse a chunk of RMC6F atom lines into columns
+
+    :param lines: Atom lines, as read from the RMC6F file.
+    :type lines: list
+    :param ele_types: Element symbols known so far - the position in the list
+                      is the element code. New symbols are appended in place.
+    :type ele_types: list
+
+    :return: Coordinates, element codes, tags, site and cell indices.
+    :rtype: tuple of numpy.array
+    '''
+    num_lines = len(lines)
+    lines_s = [line.split() for line in lines]
+    num_cols = len(lines_s[0])
+    # Strided columns only if every line has the same number of entries, not
+    # just the total number of entries adding up.
+    if all(len(line_s) == num_cols for line_s in lines_s):
+        tokens = list(chain.from_iterable(lines_s))
+        coord = np.empty([num_lines, 3], dtype=np.float64)
+        cell = np.empty([num_lines, 3], dtype=np.int32)
+        for i in range(3):
+            coord[:, i] = np.array(tokens[3 + i::num_cols], dtype=np.float64)
+            cell[:, i] = np.array(tokens[num_cols - 3 + i::num_cols],
+                                  dtype=np.int32)
+        site = np.array(tokens[num_cols - 4::num_cols], dtype=np.int32)
+        ele = tokens[1::num_cols]
+        tag = tokens[2::num_cols]
+    else:
+        # Lines with different number of entries - go through them one by one.
+        coord = np.empty([num_lines, 3], dtype=np.float64)
+        cell = np.empty([num_lines, 3], dtype=np.int32)
+        site = np.empty(num_lines, dtype=np.int32)
+        ele = []
+        tag = []
+        for i, line_s in enumerate(lines_s):
+            ele.append(line_s[1])
+            tag.append(line_s[2])
+            coord[i] = [float(x) for x in line_s[3:6]]
+            site[i] = int(line_s[-4])
+            cell[i] = [int(x) for x in line_s[-3:]]
+
+    ele_uniq, ele_inv = np.unique(np.asarray(ele), return_inverse=True)
+    ele_lookup = []
+    for item in ele_uniq.tolist():
+        if item not in ele_types:
+            ele_types.append(item)
+        ele_lookup.append(ele_types.index(item))
+    ele_dtype = np.int8 if len(ele_types) < 128 else np.int16
+    ele_code = np.asarray(ele_lookup, dtype=ele_dtype)[ele_inv.ravel()]
+
+    tag = np.array([x.strip("[]") for x in tag], dtype=np.int32)
+
+    return coord, ele_code, tag, site, cell
+
+
+class _RMC6FHeader(object):
+    """
+    Reading of RMC6F header lines, shared by the RMC6F readers.
+    """
+
+    def _read_header(self, rmc6f_config):
+        """
+        Read header lines, up to and including the `Atoms:` line.
+
+        Arguments:
+            rmc6f_config {file} -- RMC6F file, opened for reading
+
+        Returns:
+            bool -- Whether atom types info is present in the header
+        """
         self.header = []
         line = rmc6f_config.readline()
         self.header.append(line)
@@ -164,6 +526,165 @@ class RMC6FReader(object):
             print("number of atoms, number density and lattice parameters.")
             sys.exit()
 
+        return nta_line_exist and atp_line_exist and neat_line_exist
+
+
+# Chunk of atoms yielded by `RMC6FChunkReader` - `start` is the index of the
+# first atom in the chunk, the rest are as returned by `_parse_atom_chunk`.
+AtomChunk = namedtuple("AtomChunk",
+                       ["start", "coord", "ele_code", "tag", "site", "cell"])
+
+
+def _iter_atom_chunks(rmc6f_config, num_atoms, ele_types, chunk_size):
+    '''
+    Parse atom lines chunk by chunk
+
+    :param rmc6f_config: RMC6F file positioned right after the `Atoms:` line.
+    :type rmc6f_config: file
+    :param num_atoms: Number of atoms to read.
+    :type num_atoms: int
+    :param ele_types: Element symbols - see `_parse_atom_chunk`.
+    :type ele_types: list
+    :param chunk_size: Number of atoms in each chunk.
+    :type chunk_size: int
+
+    :return: Generator of `AtomChunk`.
+    :rtype: generator
+    '''
+    num_read = 0
+    while num_read < num_atoms:
+        lines = list(islice(rmc6f_config,
+                            min(chunk_size, num_atoms - num_read)))
+        lines = [x for x in lines if x.strip()]
+        if len(lines) == 0:
+            print("\nNumber of atom lines in the input RMC6F config file")
+            print("is smaller than the number of atoms in the header!")
+            sys.exit()
+        yield AtomChunk(num_read, *_parse_atom_chunk(lines, ele_types))
+        num_read += len(lines)
+
+
+# Does what the name says.
+class RMC6FReader(_RMC6FHeader):
+    """RMC6F configuration reader
+
+    Given the full path of RMC6F configuration file as input, when declaring \
+    instance to this class, it will read in read in the RMC6F configuration. \
+    Several instance variables will be made available, as detailed below,
+
+    With `columnar=True`, the atoms block is parsed in chunks straight into \
+    numpy arrays (see the second table) and the list variables above are only \
+    built, from those arrays, the first time they are accessed. With the \
+    default list based reading, the arrays are built from the lists on first \
+    access instead, so both sets of variables are always available.
+
+    With `lazy=True` (which implies `columnar=True`), only the header lines \
+    are read in when declaring instance to this class. The atoms block is \
+    then read in, from the recorded position of the `Atoms:` line, the first \
+    time any atom variable is accessed, so that header variables (`scDim`, \
+    `vectors`, `numAtomEachType`, `initNumRho`, etc.) are available at once \
+    even for very large configurations.
+
+    RMC6F files ending with `.gz`, `.bz2` or `.xz` are decompressed on the \
+    fly, with the atoms block read and decompressed in a background thread \
+    while parsing.
+
+    With `cache=True` (which implies `columnar=True`), the arrays are saved to \
+    a binary sidecar directory `<file_name>.cache` after parsing, and loaded \
+    from there, memory mapped, whenever the RMC6F file is found unchanged \
+    (same size, modification time and content hash) on later reads.
+
+    +------------------------+---------------------------------+--------+
+    | Variable name          | Property                        | Type   |
+    +========================+=================================+========+
+    | self.atomsCoord        | Atomic coordinates for all      | list   |
+    +------------------------+---------------------------------+--------+
+    | self.atomsCoordInt     | RMC Internal atomic coordinates | list   |
+    +------------------------+---------------------------------+--------+
+    | self.atomsEle          | Element symbol for all atoms    | list   |
+    +------------------------+---------------------------------+--------+
+    | self.atomsLine         | All atom lines                  | list   |
+    +------------------------+---------------------------------+--------+
+    | self.atomTypes         | Atom types present              | list   |
+    +------------------------+---------------------------------+--------+
+    | self.fileName          | The input RMC6F file name       | string |
+    +------------------------+---------------------------------+--------+
+    | self.header            | Head lines of RMC6F file        | string |
+    +------------------------+---------------------------------+--------+
+    | self.initNumRho        | Number density                  | float  |
+    +------------------------+---------------------------------+--------+
+    | self.lattPara          | Lattice parameters              | list   |
+    +------------------------+---------------------------------+--------+
+    | self.numAtoms          | Number of atoms                 | int    |
+    +------------------------+---------------------------------+--------+
+    | self.numAtomEachType   | Number of each atom type        | list   |
+    +------------------------+---------------------------------+--------+
+    | self.numTypeAtom       | Number of types of atoms        | int    |
+    +------------------------+---------------------------------+--------+
+    | self.scDim             | Supercell dimensions            | list   |
+    +------------------------+---------------------------------+--------+
+    | self.uniq_ref          | Compressed info for all atoms   | dict   |
+    +------------------------+---------------------------------+--------+
+    | self.vectors           | Lattice vectors                 | list   |
+    +------------------------+---------------------------------+--------+
+
+    +------------------------+---------------------------------+--------+
+    | Variable name          | Property                        | dtype  |
+    +========================+=================================+========+
+    | self.atomsCoordArr     | Atomic coordinates, (N, 3)      | float64|
+    +------------------------+---------------------------------+--------+
+    | self.atomsEleCode      | Element code, index into        | int8/16|
+    |                        | self.atomsEleTypes              |        |
+    +------------------------+---------------------------------+--------+
+    | self.atomsEleTypes     | Element symbol for each code    | list   |
+    +------------------------+---------------------------------+--------+
+    | self.atomsTag          | Number in brackets of atom line | int32  |
+    +------------------------+---------------------------------+--------+
+    | self.atomsSite         | Site index in unit cell         | int32  |
+    +------------------------+---------------------------------+--------+
+    | self.atomsCell         | Unit cell index, (N, 3)         | int32  |
+    +------------------------+---------------------------------+--------+
+    | self.atom_index        | Atom index at each unit cell    | int32  |
+    |                        | and site, `[cx, cy, cz, site]`, |        |
+    |                        | -1 for vacancies                |        |
+    +------------------------+---------------------------------+--------+
+
+    `self.atomsSite` and `self.atomsCell` are the inverse of `self.atom_index`, \
+    i.e. `self.atom_index[cx, cy, cz, site]` with `cx, cy, cz = \
+    self.atomsCell[i]` and `site = self.atomsSite[i]` gives back `i`. As the \
+    first three axes of `self.atom_index` run over the supercell, atoms in the \
+    neighbouring cells for all atoms at once come from `np.roll`, e.g. \
+    `np.roll(self.atom_index, -1, axis=0)` for the neighbour along +a.
+    """
+
+    def __init__(self, file_name, columnar=False, cache=False, lazy=False):
+
+        start = timeit.default_timer()
+
+        print("\nReading in the RMC6F configuration...")
+
+        self.fileName = file_name
+        rmc6f_config = open_config(self.fileName, "r")
+        header_types = self._read_header(rmc6f_config)
+        self._header_types = header_types
+        self._atoms_pos = rmc6f_config.tell()
+
+        self.columnar = columnar or cache or lazy
+        self.cache = cache
+        if self.columnar:
+            rmc6f_config.close()
+            if lazy:
+                print("Header read in. Atoms to be read in when needed.")
+            else:
+                self._load_atoms()
+            stop = timeit.default_timer()
+
+            print("\n------------------------------------------")
+            print("RMC6F configuration successfully read in.")
+            print("Time taken:{0:11.3F} s".format(stop - start))
+            print("------------------------------------------")
+            return
+
         self.atomsLine = []
         self.atomsEle = []
         self.atomsCoord = []
@@ -203,7 +724,7 @@ class RMC6FReader(object):
 
         # Configure header lines.
         self.atomsOfType = []
-        if nta_line_exist and atp_line_exist and neat_line_exist:
+        if header_types:
             for i in range(self.numTypeAtom):
                 if i == 0:
                     self.atomsOfType.append([x for x in
@@ -232,3 +753,483 @@ class RMC6FReader(object):
         print("RMC6F configuration successfully read in.")
         print("Time taken:{0:11.3F} s".format(stop - start))
         print("------------------------------------------")
+
+    def _load_atoms(self):
+        """
+        Load the atoms block into numpy arrays, from cache if possible.
+        """
+        if not (self.cache and self._load_cache()):
+            rmc6f_config = open_config(self.fileName, "r")
+            rmc6f_config.seek(self._atoms_pos)
+            lines = read_ahead(rmc6f_config)
+            self._read_atoms_columnar(lines)
+            lines.close()
+            rmc6f_config.close()
+            if self.cache:
+                self._save_cache()
+        self._config_types(self._header_types)
+
+    def _read_atoms_columnar(self, rmc6f_config):
+        """
+        Read the atoms block chunk by chunk into numpy arrays.
+
+        Arguments:
+            rmc6f_config {file} -- RMC6F file (or lines of it) positioned \
+            right after the `Atoms:` line
+        """
+        if self._header_types:
+            self.atomsEleTypes = list(self.atomTypes)
+        else:
+            self.atomsEleTypes = []
+        self.atomsCoordArr = np.empty([self.numAtoms, 3], dtype=np.float64)
+        self.atomsCell = np.empty([self.numAtoms, 3], dtype=np.int32)
+        self.atomsSite = np.empty(self.numAtoms, dtype=np.int32)
+        self.atomsTag = np.empty(self.numAtoms, dtype=np.int32)
+        ele_code = []
+
+        print("Progress: ")
+        for chunk in _iter_atom_chunks(rmc6f_config, self.numAtoms,
+                                       self.atomsEleTypes, CHUNK_SIZE):
+            end = chunk.start + len(chunk.site)
+            self.atomsCoordArr[chunk.start:end] = chunk.coord
+            self.atomsTag[chunk.start:end] = chunk.tag
+            self.atomsSite[chunk.start:end] = chunk.site
+            self.atomsCell[chunk.start:end] = chunk.cell
+            ele_code.append(chunk.ele_code)
+            print(str(ceil(end * 100.0 / self.numAtoms)) + "%",
+                  end=' ', flush=True)
+
+        ele_dtype = np.int8 if len(self.atomsEleTypes) < 128 else np.int16
+        self.atomsEleCode = np.concatenate(ele_code).astype(ele_dtype)
+
+    def _load_cache(self):
+        """
+        Load the atoms arrays from the binary sidecar cache, if still valid.
+
+        Returns:
+            bool -- Whether the arrays were loaded from the cache
+        """
+        cache_dir = self.fileName + CACHE_EXT
+        meta_file = os.path.join(cache_dir, "meta.json")
+        if not os.path.exists(meta_file):
+            return False
+        with open(meta_file, "r") as f_in:
+            meta = json.load(f_in)
+        if meta["key"] != file_key(self.fileName) or \
+                meta["header"] != self.header or \
+                meta["numAtoms"] != self.numAtoms:
+            return False
+
+        for item in CACHE_ARRAYS:
+            setattr(self, item, np.load(os.path.join(cache_dir, item + ".npy"),
+                                        mmap_mode="r"))
+        self.atomsEleTypes = meta["atomsEleTypes"]
+        print("Atoms loaded from cache: " + cache_dir)
+
+        return True
+
+    def _save_cache(self):
+        """
+        Save the atoms arrays to the binary sidecar cache.
+        """
+        cache_dir = self.fileName + CACHE_EXT
+        cache_tmp = cache_dir + ".tmp" + str(os.getpid())
+        meta = {"key": file_key(self.fileName),
+                "header": self.header,
+                "numAtoms": self.numAtoms,
+                "atomsEleTypes": self.atomsEleTypes}
+        try:
+            os.mkdir(cache_tmp)
+            for item in CACHE_ARRAYS:
+                np.save(os.path.join(cache_tmp, item + ".npy"),
+                        getattr(self, item))
+            with open(os.path.join(cache_tmp, "meta.json"), "w") as f_out:
+                json.dump(meta, f_out)
+            if os.path.exists(cache_dir):
+                shutil.rmtree(cache_dir)
+            os.rename(cache_tmp, cache_dir)
+        except OSError as err:
+            shutil.rmtree(cache_tmp, ignore_errors=True)
+            print("\nWarning: cache not written - " + str(err))
+
+    def _config_types(self, header_types):
+        """
+        Configure atom types related variables for the columnar reader.
+
+        Arguments:
+            header_types {bool} -- Whether atom types info is in the header
+        """
+        if not header_types:
+            num_each = np.bincount(self.atomsEleCode.astype(np.int64),
+                                   minlength=len(self.atomsEleTypes))
+            self.atomTypes = [self.atomsEleTypes[i] for i in
+                              range(len(self.atomsEleTypes)) if num_each[i] > 0]
+            self.numTypeAtom = len(self.atomTypes)
+            self.numAtomEachType = [int(x) for x in num_each if x > 0]
+
+    def _read_atom_lines(self):
+        """
+        Read the raw atom lines again from the RMC6F file.
+
+        Returns:
+            list -- All atom lines
+        """
+        rmc6f_config = open_config(self.fileName, "r")
+        rmc6f_config.seek(self._atoms_pos)
+        atoms_line = []
+        while len(atoms_line) < self.numAtoms:
+            line = rmc6f_config.readline()
+            if not line:
+                break
+            if line.strip():
+                atoms_line.append(line)
+        rmc6f_config.close()
+
+        return atoms_line
+
+    # Compatibility views for the columnar reader.
+    @_lazy_atoms
+    def atomsCoord(self):
+        return self.atomsCoordArr.tolist()
+
+    @_lazy_atoms
+    def atomsCoordInt(self):
+        return (2.0 * self.atomsCoordArr - 1.0).tolist()
+
+    @_lazy_atoms
+    def atomsEle(self):
+        return np.asarray(self.atomsEleTypes)[self.atomsEleCode].tolist()
+
+    @_lazy_atoms
+    def atomsLine(self):
+        return self._read_atom_lines()
+
+    @_lazy_atoms
+    def uniq_ref(self):
+        uniq_ref = {}
+        keys = zip(self.atomsSite.tolist(), self.atomsCell.tolist())
+        for i, (site_num, cell) in enumerate(keys):
+            key_temp = "-".join(str(x) for x in [site_num] + cell)
+            uniq_ref[key_temp] = [self.atomsEle[i], self.atomsCoord[i],
+                                  self.atomsCoordInt[i]]
+
+        return uniq_ref
+
+    @_lazy_atoms
+    def atom_index(self):
+        cell = self.atomsCell
+        site = self.atomsSite
+        if self.numAtoms == 0:
+            return np.full(list(self.scDim) + [0], -1, dtype=np.int32)
+        shape = [max(int(self.scDim[i]), int(cell[:, i].max()) + 1)
+                 for i in range(3)]
+        shape.append(int(site.max()) + 1)
+        atom_index = np.full(shape, -1, dtype=np.int32)
+        atom_index[cell[:, 0], cell[:, 1], cell[:, 2], site] = \
+            np.arange(self.numAtoms, dtype=np.int32)
+
+        return atom_index
+
+    def atom_lookup(self, site, cell, shift=(0, 0, 0)):
+        """
+        Index of atoms at given sites and unit cells, with periodic boundary.
+
+        Arguments:
+            site {int or numpy.array} -- Site index in unit cell
+            cell {list or numpy.array} -- Unit cell index, (3,) or (M, 3)
+
+        Keyword Arguments:
+            shift {tuple} -- Shift of unit cell index (default: {(0, 0, 0)})
+
+        Returns:
+            int or numpy.array -- Index of atoms, -1 for vacancies
+        """
+        cell = np.asarray(cell) + np.asarray(shift)
+        dims = self.atom_index.shape[:3]
+        cell_x = cell[..., 0] % dims[0]
+        cell_y = cell[..., 1] % dims[1]
+        cell_z = cell[..., 2] % dims[2]
+
+        return self.atom_index[cell_x, cell_y, cell_z, site]
+
+    @_lazy_atoms
+    def atomsOfType(self):
+        atoms_of_type = []
+        if self._header_types:
+            for i in range(self.numTypeAtom):
+                start = sum(self.numAtomEachType[0:i])
+                atoms_of_type.append(list(range(start, start +
+                                                self.numAtomEachType[i])))
+        else:
+            for item in self.atomTypes:
+                code = self.atomsEleTypes.index(item)
+                atoms_of_type.append(
+                    np.flatnonzero(self.atomsEleCode == code).tolist())
+
+        return atoms_of_type
+
+    def _loaded(self, name):
+        """
+        Variable set by loading the atoms block of the lazy reader.
+
+        Arguments:
+            name {str} -- Name of the variable
+
+        Returns:
+            object -- Value of the variable
+        """
+        self._load_atoms()
+
+        return self.__dict__[name]
+
+    # Header variables only known after reading atoms, for the lazy reader
+    # with atom types missing from the header.
+    @_lazy_atoms
+    def atomTypes(self):
+        return self._loaded("atomTypes")
+
+    @_lazy_atoms
+    def numTypeAtom(self):
+        return self._loaded("numTypeAtom")
+
+    @_lazy_atoms
+    def numAtomEachType(self):
+        return self._loaded("numAtomEachType")
+
+    # Array views for the list based reader, or loading of the atoms block for
+    # the lazy reader.
+    @_lazy_atoms
+    def atomsCoordArr(self):
+        if self.columnar:
+            return self._loaded("atomsCoordArr")
+        return np.asarray(self.atomsCoord, dtype=np.float64)
+
+    @_lazy_atoms
+    def atomsEleTypes(self):
+        if self.columnar:
+            return self._loaded("atomsEleTypes")
+        ele_types = list(self.atomTypes)
+        for item in self.atomsEle:
+            if item not in ele_types:
+                ele_types.append(item)
+
+        return ele_types
+
+    @_lazy_atoms
+    def atomsEleCode(self):
+        if self.columnar:
+            return self._loaded("atomsEleCode")
+        ele_lookup = {x: i for i, x in enumerate(self.atomsEleTypes)}
+        ele_dtype = np.int8 if len(self.atomsEleTypes) < 128 else np.int16
+
+        return np.asarray([ele_lookup[x] for x in self.atomsEle],
+                          dtype=ele_dtype)
+
+    @_lazy_atoms
+    def atomsTag(self):
+        if self.columnar:
+            return self._loaded("atomsTag")
+        return np.asarray([int(x.split()[2].strip("[]"))
+                           for x in self.atomsLine], dtype=np.int32)
+
+    @_lazy_atoms
+    def atomsSite(self):
+        if self.columnar:
+            return self._loaded("atomsSite")
+        return np.asarray([int(x.split()[-4]) for x in self.atomsLine],
+                          dtype=np.int32)
+
+    @_lazy_atoms
+    def atomsCell(self):
+        if self.columnar:
+            return self._loaded("atomsCell")
+        return np.asarray([[int(y) for y in x.split()[-3:]]
+                           for x in self.atomsLine], dtype=np.int32)
+
+
+class RMC6FChunkReader(_RMC6FHeader):
+    """Streaming RMC6F configuration reader
+
+    Given the full path of RMC6F configuration file as input, when declaring \
+    instance to this class, it will read in the header lines only, making \
+    available the same header variables as `RMC6FReader` (`numAtoms`, \
+    `scDim`, `vectors`, etc.). Iterating over the instance then reads the \
+    atoms block, yielding `AtomChunk` of at most `chunk_size` atoms, so that \
+    one-pass analyses run in constant memory, e.g.,
+
+    .. code-block:: python
+
+        config = RMC6FChunkReader(file_name)
+        num_each = np.zeros(128, dtype=np.int64)
+        for chunk in config:
+            num_each += np.bincount(chunk.ele_code, minlength=128)
+
+    Element codes are indices into `self.atomsEleTypes`, which starts from \
+    the atom types in the header and is extended as new elements show up.
+
+    Arguments:
+        file_name {str} -- Full path of RMC6F configuration file
+
+    Keyword Arguments:
+        chunk_size {int} -- Number of atoms in each chunk \
+        (default: {CHUNK_SIZE})
+    """
+
+    def __init__(self, file_name, chunk_size=CHUNK_SIZE):
+        self.fileName = file_name
+        self.chunkSize = chunk_size
+        rmc6f_config = open_config(self.fileName, "r")
+        self._header_types = self._read_header(rmc6f_config)
+        self._atoms_pos = rmc6f_config.tell()
+        rmc6f_config.close()
+        if self._header_types:
+            self.atomsEleTypes = list(self.atomTypes)
+        else:
+            self.atomsEleTypes = []
+
+    def __iter__(self):
+        rmc6f_config = open_config(self.fileName, "r")
+        rmc6f_config.seek(self._atoms_pos)
+        lines = read_ahead(rmc6f_config)
+        try:
+            for chunk in _iter_atom_chunks(lines, self.numAtoms,
+                                           self.atomsEleTypes,
+                                           self.chunkSize):
+                yield chunk
+        finally:
+            lines.close()
+            rmc6f_config.close()
+
+
+class RMC6FWriter(object):
+    """RMC6F configuration writer
+
+    Given the source RMC6F configuration (instance of `RMC6FReader`) as \
+    input, when declaring instance to this class, it will prepare for \
+    writing out RMC6F configurations made of (re-ordered, and/or moved) \
+    atoms of the source configuration. Header lines are taken from the \
+    source configuration, with the number of atoms, atom types, number of \
+    each atom type and number density updated for the atoms written. The \
+    atoms block is formatted chunk by chunk from the atom arrays, so writing \
+    millions of atoms, or many subsets of atoms, is limited by I/O. Output \
+    files ending with `.gz`, `.bz2` or `.xz` are compressed on the fly.
+
+    Arguments:
+        rmc6f_config {Object} -- Instance of `RMC6FReader` class
+
+    Keyword Arguments:
+        decimals {int} -- Number of decimals for atomic coordinates. The \
+        most found in the source RMC6F file (at least 6) if `None`. \
+        (default: {None})
+    """
+
+    def __init__(self, rmc6f_config, decimals=None):
+        self.config = rmc6f_config
+        if decimals is None:
+            decimals = self._source_decimals()
+        self.decimals = decimals
+        coord_fmt = "%." + str(decimals) + "f"
+        self.lineFmt = "%d %s [%d] " + " ".join([coord_fmt] * 3) + \
+            " %d %d %d %d\n"
+
+    def _source_decimals(self):
+        """
+        Number of decimals for atomic coordinates in the source RMC6F file.
+
+        The largest number of decimals over all three coordinates of the \
+        first `DECIMALS_SAMPLE` atom lines is taken, and never less than 6, \
+        so that coordinates are not cut short by a few short tokens.
+
+        Returns:
+            int -- Number of decimals
+        """
+        decimals = 6
+        rmc6f_config = open_config(self.config.fileName, "r")
+        rmc6f_config.seek(self.config._atoms_pos)
+        for line in islice(rmc6f_config, DECIMALS_SAMPLE):
+            for coord_str in line.split()[3:6]:
+                if "." in coord_str:
+                    decimals = max(decimals, len(coord_str.split(".")[1]))
+        rmc6f_config.close()
+
+        return decimals
+
+    def header_lines(self, ele_code):
+        """
+        Header lines for the atoms to write.
+
+        Arguments:
+            ele_code {numpy.array} -- Element code of atoms to write
+
+        Returns:
+            list -- Header lines
+        """
+        num_atoms = len(ele_code)
+        ele_uniq, ele_first = np.unique(ele_code, return_index=True)
+        ele_uniq = ele_uniq[np.argsort(ele_first)]
+        num_each = np.bincount(ele_code.astype(np.int64),
+                               minlength=len(self.config.atomsEleTypes))
+        atoms_ele_uniq = [self.config.atomsEleTypes[x] for x in ele_uniq]
+        num_each_type = [str(num_each[x]) for x in ele_uniq]
+
+        num_rho_new = self.config.initNumRho * float(num_atoms) / \
+            float(self.config.numAtoms)
+
+        header = self.config.header.copy()
+        for j in range(len(header)):
+            if "Number of atoms:" in header[j]:
+                header[j] = "Number of atoms: " + str(num_atoms) + "\n"
+            if "Atom types present:" in header[j]:
+                header[j] = "Atom types present: " + \
+                    " ".join(atoms_ele_uniq) + "\n"
+            if "Number of types of atoms:" in header[j]:
+                header[j] = "Number of types of atoms: " + \
+                    str(len(atoms_ele_uniq)) + "\n"
+            if "Number of each atom type:" in header[j]:
+                header[j] = "Number of each atom type: " + \
+                    " ".join(num_each_type) + "\n"
+            if "Number density (Ang^-3):" in header[j]:
+                header[j] = "Number density (Ang^-3):" + \
+                    " {0:.6f}".format(num_rho_new) + "\n"
+
+        return header
+
+    def write(self, file_name, index=None, coords=None):
+        """
+        Write out RMC6F configuration.
+
+        Arguments:
+            file_name {str} -- Full path of output RMC6F file
+
+        Keyword Arguments:
+            index {numpy.array} -- Index of atoms of the source configuration \
+            to write, in the order given. All atoms if `None`. \
+            (default: {None})
+            coords {numpy.array} -- Fractional coordinates, (N, 3), of atoms \
+            to write. Those of the source configuration if `None`. \
+            (default: {None})
+        """
+        if index is None:
+            index = np.arange(self.config.numAtoms)
+        index = np.asarray(index, dtype=np.int64)
+        if coords is None:
+            coords = self.config.atomsCoordArr[index]
+        coords = np.asarray(coords, dtype=np.float64)
+        ele_code = np.asarray(self.config.atomsEleCode)[index]
+        ele_name = np.asarray(self.config.atomsEleTypes)
+
+        file_out = open_config(file_name, "w")
+        file_out.write("".join(self.header_lines(ele_code)))
+        for start in range(0, len(index), CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, len(index))
+            chunk = index[start:stop]
+            rows = zip(range(start + 1, stop + 1),
+                       ele_name[ele_code[start:stop]].tolist(),
+                       np.asarray(self.config.atomsTag)[chunk].tolist(),
+                       coords[start:stop, 0].tolist(),
+                       coords[start:stop, 1].tolist(),
+                       coords[start:stop, 2].tolist(),
+                       np.asarray(self.config.atomsSite)[chunk].tolist(),
+                       *np.asarray(self.config.atomsCell)[chunk].T.tolist())
+            file_out.write("".join([self.lineFmt % x for x in rows]))
+        file_out.close()
@@ -0,0 +1,284 @@
+"""
+Shells of RMC6F configurations
+==============================
+
+This modules holds stuff relevant to dividing RMC6F configurations into shells
+around a center, shared by the bulk and nano configuration processing.
+
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import DistCalc, RMC6FReader, RMC6FWriter, file_key
+import json
+import numpy as np
+import os
+import sys
+
+
+def cent_dist(rmc6f_config, cent_pos_int):
+    '''
+    Distance of all atoms to the center, in one go
+
+    :param rmc6f_config: RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param cent_pos_int: RMC internal coordinates of the center.
+    :type cent_pos_int: 1D list or numpy.array with 3 entries.
+
+    :return: Distance of each atom to the center, identical to calling \
+             `rmc6f_stuff.dist_calc_coord` atom by atom.
+    :rtype: numpy.array, (N,)
+    '''
+    coords_int = 2.0 * np.asarray(rmc6f_config.atomsCoordArr) - 1.0
+
+    return DistCalc(rmc6f_config.vectors).one_to_many(cent_pos_int, coords_int)
+
+
+def claim_name(prefix, ext="", directory=False, also=()):
+    '''
+    Claim the first free output name `prefixN` + `ext`, N = 1, 2, ...
+
+    The name is claimed atomically, by creating the directory or an empty \
+    file, so that parallel workers writing next to the same configuration \
+    never pick the same name.
+
+    :param prefix: Output name without the counter.
+    :type prefix: str
+    :param ext: Extension of the claimed file or directory.
+    :type ext: str
+    :param directory: Claim a directory instead of a file.
+    :type directory: bool
+    :param also: Other extensions that `prefixN` must not exist with.
+    :type also: list of str
+
+    :return: Claimed name, `prefixN`, without `ext`.
+    :rtype: str
+    '''
+    i = 1
+    while True:
+        name = prefix + str(i)
+        i += 1
+        if any(os.path.exists(name + item) for item in also):
+            continue
+        try:
+            if directory:
+                os.mkdir(name + ext)
+            else:
+                os.close(os.open(name + ext, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue
+
+        return name
+
+
+def save_shells(file_name, rmc6f_config, shell_atoms, low_lim, hi_lim,
+                cent_pos):
+    '''
+    Save shells in one compact `.npz` file
+
+    Instead of an RMC6F file for each shell, the shell label of each atom is \
+    saved (-1 for atoms in no shell), together with the shell limits, center \
+    and the source RMC6F configuration (full path and content key, see \
+    `rmc6f_stuff.file_key`). Shells are written out as RMC6F, when needed, \
+    with `extract_shell`.
+
+    :param file_name: Output `.npz` file.
+    :type file_name: str
+    :param rmc6f_config: Source RMC6F configuration.
+    :type rmc6f_config: RMC6FReader
+    :param shell_atoms: Index of atoms in each shell.
+    :type shell_atoms: 2D list
+    :param low_lim: Lower limit of each shell.
+    :type low_lim: list
+    :param hi_lim: Upper limit of each shell.
+    :type hi_lim: list
+    :param cent_pos: Fractional coordinates of the center.
+    :type cent_pos: list
+    '''
+    shell_id = np.full(rmc6f_config.numAtoms, -1, dtype=np.int32)
+    for i, item in enumerate(shell_atoms):
+        shell_id[np.asarray(item, dtype=np.int64)] = i
+
+    source = os.path.abspath(rmc6f_config.fileName)
+    np.savez_compressed(file_name, shell_id=shell_id,
+                        low_lim=np.asarray(low_lim, dtype=np.float64),
+                        hi_lim=np.asarray(hi_lim, dtype=np.float64),
+                        cent_pos=np.asarray(cent_pos, dtype=np.float64),
+                        source=np.array(source),
+                        source_key=np.array(json.dumps(file_key(source))))
+
+
+def extract_shell(shell_file, shell_i, file_name=None, rmc6f_config=None):
+    '''
+    Write out a shell saved by `save_shells` as RMC6F configuration
+
+    :param shell_file: The `.npz` file of shells.
+    :type shell_file: str
+    :param shell_i: Index of shell (starting from 0).
+    :type shell_i: int
+    :param file_name: Output RMC6F file, `<shell_file>_shell_<i>.rmc6f` if \
+                      None.
+    :type file_name: str
+    :param rmc6f_config: Source RMC6F configuration, if already read in - \
+                         read in from the saved full path if None.
+    :type rmc6f_config: RMC6FReader
+
+    :return: Output RMC6F file.
+    :rtype: str
+    '''
+    with np.load(shell_file) as shells:
+        shell_id = shells["shell_id"]
+        num_shells = len(shells["low_lim"])
+        source = str(shells["source"])
+        source_key = json.loads(str(shells["source_key"]))
+
+    if not 0 <= shell_i < num_shells:
+        print("Shell {0:d} not found - {1:d} shells in {2:s}.".
+              format(shell_i, num_shells, shell_file))
+        sys.exit()
+
+    if rmc6f_config is None:
+        if not os.path.exists(source):
+            print("Source RMC6F configuration not found: " + source)
+            sys.exit()
+        if file_key(source) != source_key:
+            print("\nWarning: source RMC6F configuration changed since shells")
+            print("were saved: " + source)
+        rmc6f_config = RMC6FReader(source, columnar=True)
+    if rmc6f_config.numAtoms != len(shell_id):
+        print("Number of atoms in RMC6F configuration does not match shells.")
+        sys.exit()
+
+    if file_name is None:
+        file_name = os.path.splitext(shell_file)[0] + "_shell_" + \
+            str(shell_i) + ".rmc6f"
+    RMC6FWriter(rmc6f_config).write(file_name,
+                                    index=np.flatnonzero(shell_id == shell_i))
+
+    return file_name
+
+
+def thickness_shells(dist, shell_thickness, num_shells):
+    '''
+    Divide atoms into shells of equal thickness
+
+    Shell `i` holds atoms with `i * shell_thickness <= dist < (i + 1) * \
+    shell_thickness`, and atoms beyond the last shell go to an extra shell at \
+    the end. Atoms in each shell are in ascending order.
+
+    :param dist: Distance of each atom to the center.
+    :type dist: numpy.array, (N,)
+    :param shell_thickness: Shell thickness.
+    :type shell_thickness: float
+    :param num_shells: Number of shells, not counting the extra shell.
+    :type num_shells: int
+
+    :return: Index of atoms in each shell, `num_shells + 1` shells in total.
+    :rtype: 2D list
+    '''
+    edges = np.array([i * shell_thickness for i in range(num_shells + 1)])
+    shell_id = np.digitize(dist, edges) - 1
+    shell_id[(shell_id < 0) | (shell_id >= num_shells)] = num_shells
+    order = np.argsort(shell_id, kind="stable")
+    bounds = np.cumsum(np.bincount(shell_id, minlength=num_shells + 1))
+
+    return [x.tolist() for x in np.split(order, bounds[:-1])]
+
+
+class PopulationShells(object):
+    """Shells of equal population of a focused element
+
+    Given the distance of each atom to the center and which atoms are of the \
+    focused element as inputs, when declaring instance to this class, atoms \
+    are sorted by distance once. Shells are then taken, going outwards, with \
+    `self.next_shell`, each one closing right after the atom at which the \
+    number of focused atoms reaches the target. Atoms at the same distance \
+    (within `tie`) always go to the same shell, and the 'burst' rule of the \
+    step-wise builder is kept - if less than 10% of the target is left and \
+    the next group of atoms at the same distance would bring in more than \
+    15% of the target, the shell is closed without them.
+
+    Arguments:
+        dist {numpy.array} -- Distance of each atom to the center, (N,)
+        focus {numpy.array} -- Whether each atom is of the focused element
+
+    Keyword Arguments:
+        tie {float} -- Distances closer than this are taken as the same \
+        (default: {1E-6})
+    """
+
+    def __init__(self, dist, focus, tie=1E-6):
+        dist = np.asarray(dist)
+        self.order = np.argsort(dist, kind="stable")
+        self.distSorted = dist[self.order]
+        focus_sorted = np.asarray(focus, dtype=np.int64)[self.order]
+
+        num_atoms = len(dist)
+        if num_atoms > 0:
+            self.groupStart = np.flatnonzero(
+                np.r_[True, np.diff(self.distSorted) > tie])
+            group_focus = np.add.reduceat(focus_sorted, self.groupStart)
+        else:
+            self.groupStart = np.zeros(0, dtype=np.int64)
+            group_focus = np.zeros(0, dtype=np.int64)
+        self.groupEnd = np.r_[self.groupStart[1:], num_atoms].astype(np.int64)
+        self.groupFocus = group_focus
+        self.cumFocus = np.cumsum(group_focus)
+
+        self.nextGroup = 0
+        self.lowLim = 0.0
+        self.focusLeft = int(self.cumFocus[-1]) if num_atoms > 0 else 0
+
+    def next_shell(self, min_num_in_shell):
+        """
+        Take the next shell going outwards.
+
+        Arguments:
+            min_num_in_shell {int} -- Target number of focused atoms in shell
+
+        Returns:
+            tuple -- Index of atoms in shell (ascending), lower and upper \
+            limit of shell, i.e. `low_lim <= dist < hi_lim` for atoms in it
+        """
+        num_groups = len(self.groupStart)
+        first = self.nextGroup
+        low_lim = self.lowLim
+        if first >= num_groups:
+            return [], low_lim, low_lim
+
+        base = self.cumFocus[first - 1] if first > 0 else 0
+        last = int(np.searchsorted(self.cumFocus, base + min_num_in_shell))
+        last = max(last, first)
+        if last >= num_groups:
+            last = num_groups - 1
+        elif last > first:
+            space_left = min_num_in_shell - (self.cumFocus[last - 1] - base)
+            to_eat = self.groupFocus[last]
+            if space_left < int(0.1 * float(min_num_in_shell)) and \
+               to_eat > int(0.15 * float(min_num_in_shell)):
+                last -= 1
+
+        start = self.groupStart[first]
+        stop = self.groupEnd[last]
+        if last + 1 < num_groups:
+            hi_lim = float(self.distSorted[stop])
+        else:
+            hi_lim = float(np.nextafter(self.distSorted[-1], np.inf))
+
+        self.nextGroup = last + 1
+        self.lowLim = hi_lim
+        self.focusLeft -= int(self.cumFocus[last] - base)
+
+        return np.sort(self.order[start:stop]).tolist(), low_lim, hi_lim
+
+    def atoms_left(self):
+        """
+        Atoms not taken into any shell yet.
+
+        Returns:
+            list -- Index of atoms left (ascending)
+        """
+        if self.nextGroup >= len(self.groupStart):
+            return []
+
+        return np.sort(self.order[self.groupStart[self.nextGroup]:]).tolist()
@@ -0,0 +1,256 @@
+"""
+Trajectory of RMC6F configurations
+==================================
+
+This modules holds stuff relevant to sequences of RMC6F configurations sharing
+the same topology, e.g. snapshots saved during an RMCProfile run.
+
+"""
+#
+# -*- coding: utf-8 -*-
+#
+from rmc_tools.rmc6f_stuff import RMC6FReader
+import numpy as np
+import os
+import sys
+import tempfile
+import timeit
+import weakref
+
+# Per atom variables identical for all frames of a trajectory.
+TOPOLOGY = ["atomsEleTypes", "atomsEleCode", "atomsTag", "atomsSite",
+            "atomsCell"]
+# Header variables only known after reading atoms, if missing from header.
+TOPOLOGY_TYPES = ["atomTypes", "numTypeAtom", "numAtomEachType"]
+
+
+def _remove_temp(file_name, pid):
+    # Only the process creating the temporary file removes it, not forked
+    # workers holding a copy of the trajectory.
+    if os.getpid() == pid and os.path.exists(file_name):
+        os.remove(file_name)
+
+
+class RMC6FTrajectory(object):
+    """Trajectory of RMC6F configurations
+
+    Given the full path of RMC6F configuration files (in order of frames) as \
+    input, when declaring instance to this class, it will read in the first \
+    configuration as the topology (element, tag, site and cell of atoms) \
+    shared by all frames. Coordinates of all frames are kept in one memory \
+    mapped array, and each frame is only read in the first time it is \
+    needed. Several instance variables will be made available, as detailed \
+    below,
+
+    +------------------------+---------------------------------+--------+
+    | Variable name          | Property                        | Type   |
+    +========================+=================================+========+
+    | self.fileNames         | RMC6F files, one for each frame | list   |
+    +------------------------+---------------------------------+--------+
+    | self.numFrames         | Number of frames                | int    |
+    +------------------------+---------------------------------+--------+
+    | self.numAtoms          | Number of atoms                 | int    |
+    +------------------------+---------------------------------+--------+
+    | self.topology          | First frame, instance of        | object |
+    |                        | `RMC6FReader`                   |        |
+    +------------------------+---------------------------------+--------+
+    | self.atomsCoordArr     | Atomic coordinates of all       | memmap |
+    |                        | frames, (frames, atoms, 3)      |        |
+    +------------------------+---------------------------------+--------+
+    | self.frameLoaded       | Whether each frame is read in   | numpy  |
+    +------------------------+---------------------------------+--------+
+    | self.trajFile          | File behind `self.atomsCoordArr`| string |
+    +------------------------+---------------------------------+--------+
+
+    The topology arrays (`atomsEleTypes`, `atomsEleCode`, `atomsTag`, \
+    `atomsSite` and `atomsCell`, see `RMC6FReader`) are also available as \
+    instance variables. Frames are obtained with `self.frame(i)` (or `self[i]` \
+    and iterating over the trajectory), as instances of `RMC6FReader` sharing \
+    the topology arrays and with coordinates being a view into \
+    `self.atomsCoordArr`, so that existing analyses taking a configuration \
+    run on each frame without duplicating per atom data.
+
+    Arguments:
+        file_names {list} -- Full path of RMC6F files, in order of frames
+
+    Keyword Arguments:
+        traj_file {str} -- `.npy` file for the coordinates of all frames. A \
+        temporary file, removed by `self.close()`, is used if `None`. \
+        (default: {None})
+        cache {bool} -- Whether to use the binary sidecar cache of \
+        `RMC6FReader` for each frame (default: {False})
+    """
+
+    def __init__(self, file_names, traj_file=None, cache=False):
+
+        start = timeit.default_timer()
+
+        print("\nSetting up the RMC6F trajectory...")
+
+        self.fileNames = list(file_names)
+        self.numFrames = len(self.fileNames)
+        if self.numFrames == 0:
+            print("No RMC6F configuration given for the trajectory!")
+            sys.exit()
+        self.cache = cache
+
+        self.topology = RMC6FReader(self.fileNames[0], columnar=True,
+                                    cache=cache)
+        self.numAtoms = self.topology.numAtoms
+        for item in TOPOLOGY + TOPOLOGY_TYPES:
+            setattr(self, item, getattr(self.topology, item))
+
+        self._temp_file = traj_file is None
+        self._cleanup = None
+        if self._temp_file:
+            f_id, traj_file = tempfile.mkstemp(suffix=".npy")
+            os.close(f_id)
+            # Removed on `self.close()`, garbage collection or exit, even
+            # when leaving with `sys.exit()` before closing.
+            self._cleanup = weakref.finalize(self, _remove_temp, traj_file,
+                                             os.getpid())
+        self.trajFile = traj_file
+        self.atomsCoordArr = np.lib.format.open_memmap(
+            self.trajFile, mode="w+", dtype=np.float64,
+            shape=(self.numFrames, self.numAtoms, 3))
+        self.frameLoaded = np.zeros(self.numFrames, dtype=bool)
+
+        self.atomsCoordArr[0] = self.topology.atomsCoordArr
+        self.frameLoaded[0] = True
+        self.topology.atomsCoordArr = self.atomsCoordArr[0]
+
+        stop = timeit.default_timer()
+
+        print("\n------------------------------------------")
+        print("RMC6F trajectory successfully set up.")
+        print("Number of frames: {0:d}".format(self.numFrames))
+        print("Time taken:{0:11.3F} s".format(stop - start))
+        print("------------------------------------------")
+
+    def __len__(self):
+        return self.numFrames
+
+    def __getitem__(self, frame_i):
+        return self.frame(frame_i)
+
+    def __iter__(self):
+        for frame_i in range(self.numFrames):
+            yield self.frame(frame_i)
+
+    def __getstate__(self):
+        # Coordinates stay in `self.trajFile`, never pickled.
+        state = self.__dict__.copy()
+        state["atomsCoordArr"] = None
+        state["topology"] = None
+        state["_temp_file"] = False
+        state["_cleanup"] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.atomsCoordArr = np.load(self.trajFile, mmap_mode="r+")
+
+    def _same_topology(self, config):
+        """
+        Compare the atoms of a frame with the topology of the trajectory.
+
+        Arguments:
+            config {Object} -- Frame, instance of `RMC6FReader`
+
+        Returns:
+            bool -- Whether the frame shares the topology
+        """
+        same = config.numAtoms == self.numAtoms
+        if same and config.atomsEleTypes == self.atomsEleTypes:
+            same = np.array_equal(config.atomsEleCode, self.atomsEleCode)
+        elif same:
+            same = np.array_equal(
+                np.asarray(config.atomsEleTypes)[config.atomsEleCode],
+                np.asarray(self.atomsEleTypes)[self.atomsEleCode])
+        for item in ["atomsTag", "atomsSite", "atomsCell"]:
+            same = same and np.array_equal(getattr(config, item),
+                                           getattr(self, item))
+
+        return same
+
+    def _check_topology(self, config):
+        """
+        Check the atoms of a frame against the topology of the trajectory.
+
+        Arguments:
+            config {Object} -- Frame, instance of `RMC6FReader`
+        """
+        if not self._same_topology(config):
+            print("\nAtoms in " + config.fileName)
+            print("differ from those in " + self.fileNames[0] + "!")
+            print("All frames of a trajectory should share the same topology.")
+            self.close()
+            sys.exit()
+
+    def coords(self, frame_i):
+        """
+        Atomic coordinates of a frame, read in if not yet.
+
+        Arguments:
+            frame_i {int} -- Index of frame (starting from 0)
+
+        Returns:
+            numpy.memmap -- Atomic coordinates, (atoms, 3)
+        """
+        if not self.frameLoaded[frame_i]:
+            self.frame(frame_i)
+
+        return self.atomsCoordArr[frame_i]
+
+    def frame(self, frame_i):
+        """
+        A frame of the trajectory, read in if not yet.
+
+        Arguments:
+            frame_i {int} -- Index of frame (starting from 0)
+
+        Returns:
+            Object -- Instance of `RMC6FReader`, sharing the topology arrays \
+            and with coordinates in `self.atomsCoordArr`
+        """
+        frame_i = range(self.numFrames)[frame_i]
+        if frame_i == 0 and self.topology is not None:
+            return self.topology
+
+        config = RMC6FReader(self.fileNames[frame_i], cache=self.cache,
+                             lazy=True)
+        if config.numAtoms != self.numAtoms:
+            self._check_topology(config)
+        if not self.frameLoaded[frame_i]:
+            config._load_atoms()
+            self._check_topology(config)
+            self.atomsCoordArr[frame_i] = config.atomsCoordArr
+            self.frameLoaded[frame_i] = True
+
+        for item in TOPOLOGY:
+            config.__dict__[item] = getattr(self, item)
+        for item in TOPOLOGY_TYPES:
+            if item not in config.__dict__:
+                config.__dict__[item] = getattr(self, item)
+        config.atomsCoordArr = self.atomsCoordArr[frame_i]
+
+        return config
+
+    def load_all(self):
+        """
+        Read in all frames not read in yet.
+        """
+        for frame_i in np.flatnonzero(~self.frameLoaded):
+            self.frame(int(frame_i))
+
+    def close(self):
+        """
+        Release the coordinates, removing the temporary file if used.
+        """
+        self.atomsCoordArr.flush()
+        self.atomsCoordArr = None
+        if self.topology is not None:
+            self.topology.__dict__.pop("atomsCoordArr", None)
+        if self._cleanup is not None:
+            self._cleanup()